@@ -28,6 +28,7 @@ bl_info = {
 }
 
 import bpy
+import atexit
 
 from bpy.app.handlers   import persistent
 from bpy.props          import PointerProperty
@@ -138,6 +139,9 @@ from .utils.seut_ot_issue_display               import SEUT_OT_IssueDisplay
 from .utils.seut_ot_issue_display               import SEUT_OT_DeleteIssue
 from .utils.seut_ot_issue_display               import SEUT_OT_ClearIssues
 from .utils.seut_ot_issue_display               import SEUT_OT_ExportLog
+from .utils.seut_wine                           import shutdown_wine_session
+from .utils.seut_tool_utils                     import kill_running_tools
+from .export.havok.seut_havok_hkt               import clear_hko_files, clear_stale_hko_dirs
 
 from .seut_preferences                  import SEUT_AddonPreferences
 from .seut_preferences                  import SEUT_OT_SetDevPaths
@@ -332,8 +336,17 @@ def register():
 
     load_icons()
 
+    # Blender does not unregister addons when it quits.
+    clear_stale_hko_dirs()
+    atexit.register(clear_hko_files)
+
 
 def unregister():
+    kill_running_tools()
+    shutdown_wine_session()
+    clear_hko_files()
+    atexit.unregister(clear_hko_files)
+
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
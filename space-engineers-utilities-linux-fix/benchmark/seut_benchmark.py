@@ -0,0 +1,453 @@
+"""Measures the performance of the export with synthetic scenes, e.g. to catch regressions between SEUT releases:
+
+    blender -b --python <SEUT directory>/seut_benchmark.py -- [options]
+
+Builds scenes with the configured numbers of objects, LODs, build stages, subpart empties, materials and polygons, saves them
+to a BLEND file in the work directory and exports them with the regular export. The Windows tools are replaced by the
+stand-ins in seut_standin_tool.py, so no Wine or Space Engineers installation is needed. The wall time of every export stage
+is printed and optionally written to a JSON report. If a previous report is passed as baseline, the exit code is 1 if any
+stage got slower by more than the tolerance."""
+
+import bpy
+import os
+import sys
+import json
+import math
+import time
+import stat
+import bmesh
+import shutil
+import argparse
+import tempfile
+import importlib
+import traceback
+
+from concurrent.futures             import Future, wait
+from contextlib                     import contextmanager
+
+from ..export.seut_ot_export        import export_steps
+from ..export.seut_batch_export     import collect_issues
+from ..seut_collections             import get_collections, create_seut_collection, get_cols_by_type
+from ..seut_utils                   import get_preferences
+from ..utils.seut_tool_utils        import reset_tool_cancellation
+
+
+SUMMARY_PREFIX = "SEUT_BENCHMARK_SUMMARY "
+
+EXIT_SUCCESS = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+STANDIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seut_standin_tool.py')
+STANDIN_TOOLS = ['FBXImporter.exe', 'hctStandAloneFilterManager.exe', 'MwmBuilder.exe']
+
+# Differences below this many seconds are considered noise when comparing to a baseline.
+NOISE_FLOOR = 0.05
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="seut_benchmark.py", description="Benchmarks the SEUT export with synthetic scenes and stand-in tools.")
+    parser.add_argument('--scenes', type=int, default=1, help="Number of main scenes.")
+    parser.add_argument('--objects', type=int, default=4, help="Number of mesh objects per collection.")
+    parser.add_argument('--polygons', type=int, default=20000, help="Number of polygons of the Main collection. Other collections get fewer.")
+    parser.add_argument('--lods', type=int, default=3, help="Number of LOD collections.")
+    parser.add_argument('--build-stages', type=int, default=3, help="Number of build stage collections.")
+    parser.add_argument('--subparts', type=int, default=2, help="Number of subpart empties. Each links to a subpart scene of its own.")
+    parser.add_argument('--materials', type=int, default=4, help="Number of materials.")
+    parser.add_argument('--collision', type=int, default=2, help="Number of collision objects.")
+    parser.add_argument('--repeat', type=int, default=3, help="Number of times each scene is exported.")
+    parser.add_argument('--incremental', action='store_true', help="Use the incremental export, so repeated exports measure unchanged scenes.")
+    parser.add_argument('--delay', type=float, default=0.2, help="Seconds every stand-in tool call takes at least.")
+    parser.add_argument('--delay-per-mb', type=float, default=0.5, help="Additional seconds a stand-in tool call takes per MB of input.")
+    parser.add_argument('--work-dir', help="Directory to build the mod in. Defaults to a temporary directory, which is deleted afterwards.")
+    parser.add_argument('--report', help="Path of a JSON file to write the results to.")
+    parser.add_argument('--baseline', help="Path of a previous report to compare the results to.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Fraction by which a stage may be slower than in the baseline. Defaults to 0.2.")
+
+    return parser
+
+
+def create_standin_tools(tool_dir: str):
+    """Creates the stand-ins for the Windows tools SEUT calls."""
+
+    os.makedirs(tool_dir, exist_ok=True)
+    for name in STANDIN_TOOLS:
+        path = os.path.join(tool_dir, name)
+        shutil.copyfile(STANDIN_SCRIPT, path)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+
+@contextmanager
+def standin_tools(tool_dir: str, asset_dir: str, args):
+    """Points SEUT to the stand-in tools for the duration of the block. The user's preferences are left as they were."""
+
+    addon = __package__[:__package__.find(".")]
+    seut_wine = importlib.import_module(f"{addon}.utils.seut_wine")
+    preferences = get_preferences()
+
+    # The preferences are set as ID properties, which skips their update callbacks: Setting the asset path would reset the
+    # MWM Builder path, relocate the user's asset library and save the preferences to disk.
+    settings = {
+        'mwmb_path': os.path.join(tool_dir, 'MwmBuilder.exe'),
+        'havok_path': os.path.join(tool_dir, 'hctStandAloneFilterManager.exe'),
+        'asset_path': asset_dir,
+        # There is no Wine server to keep alive and the stand-ins do not need a prefix of their own.
+        'wine_idle_timeout': 0,
+        'wine_prefix_count': 1,
+    }
+    previous = {name: preferences.get(name) for name in settings}
+    previous_wine = seut_wine.WINE
+    previous_env = {name: os.environ.get(name) for name in ['SEUT_TOOL_DIR', 'SEUT_STANDIN_DELAY', 'SEUT_STANDIN_DELAY_PER_MB']}
+
+    # The stand-ins are Python scripts named like the tools, so they are run by Python where Wine would run the tools.
+    seut_wine.WINE = sys.executable
+    os.environ['SEUT_TOOL_DIR'] = tool_dir
+    os.environ['SEUT_STANDIN_DELAY'] = str(args.delay)
+    os.environ['SEUT_STANDIN_DELAY_PER_MB'] = str(args.delay_per_mb)
+
+    try:
+        for name, value in settings.items():
+            preferences[name] = value
+        seut_wine.update_wine_settings(preferences, bpy.context)
+        yield
+
+    finally:
+        seut_wine.WINE = previous_wine
+        for name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        for name, value in previous.items():
+            if value is not None:
+                preferences[name] = value
+            elif name in preferences.keys():
+                del preferences[name]
+        seut_wine.update_wine_settings(preferences, bpy.context)
+
+
+def create_materials(count: int) -> list:
+    materials = []
+    for idx in range(max(1, count)):
+        mat = bpy.data.materials.new(f"Benchmark_Material_{idx}")
+        mat.use_nodes = True
+        materials.append(mat)
+
+    return materials
+
+
+def create_mesh_object(name: str, polygons: int, materials: list, location: tuple):
+    """Creates a UV mapped grid with about the given number of polygons, which are spread across the materials."""
+
+    side = max(1, round(math.sqrt(polygons)))
+
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bm.loops.layers.uv.new("UVMap")
+    bmesh.ops.create_grid(bm, x_segments=side, y_segments=side, size=1.0, calc_uvs=True)
+
+    for idx, face in enumerate(bm.faces):
+        face.material_index = idx % len(materials)
+
+    bm.to_mesh(mesh)
+    bm.free()
+
+    for mat in materials:
+        mesh.materials.append(mat)
+
+    obj = bpy.data.objects.new(name, mesh)
+    obj.location = location
+
+    return obj
+
+
+def fill_collection(collection, prefix: str, object_count: int, polygons: int, materials: list) -> list:
+    """Adds mesh objects to the collection. All are parented to the first one, as only one may be unparented."""
+
+    objects = []
+    per_object = max(1, polygons // max(1, object_count))
+
+    for idx in range(max(1, object_count)):
+        obj = create_mesh_object(f"{prefix}_{idx}", per_object, materials, (idx * 2.5, 0.0, 0.0))
+        collection.objects.link(obj)
+        if objects != []:
+            obj.parent = objects[0]
+        objects.append(obj)
+
+    return objects
+
+
+def set_collection_count(scene, col_type: str, count: int, ref_col=None):
+    """Adds or removes collections of a type until there are exactly count of them."""
+
+    cols = get_cols_by_type(scene, col_type, ref_col)
+
+    for idx in sorted(cols.keys()):
+        if idx > count:
+            for col in [c for c in bpy.data.collections if c.seut.ref_col == cols[idx]]:
+                bpy.data.collections.remove(col)
+            bpy.data.collections.remove(cols[idx])
+
+    for idx in range(len(cols) + 1, count + 1):
+        create_seut_collection(scene, col_type, idx, ref_col)
+
+
+def create_scene(name: str, scene_type: str):
+    """Creates a scene with the SEUT collections of its type."""
+
+    scene = bpy.data.scenes.new(name)
+
+    with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):
+        scene.seut.sceneType = scene_type
+        bpy.ops.scene.recreate_collections()
+        scene.seut.linkSubpartInstances = False
+
+    return scene
+
+
+def build_scenes(args, mod_dir: str) -> list:
+    """Builds the synthetic scenes and returns all of them, subpart scenes first."""
+
+    materials = create_materials(args.materials)
+    scenes = []
+
+    subpart_scenes = []
+    for idx in range(max(0, args.subparts)):
+        scene = create_scene(f"Benchmark_Subpart_{idx}", 'subpart')
+        collections = get_collections(scene)
+        fill_collection(collections['main'][0], f"{scene.name}_Main", 1, max(1, args.polygons // 10), materials)
+        subpart_scenes.append(scene)
+
+    for idx in range(max(1, args.scenes)):
+        scene = create_scene(f"Benchmark_{idx}", 'mainScene')
+        collections = get_collections(scene)
+        main_col = collections['main'][0]
+
+        set_collection_count(scene, 'bs', max(0, args.build_stages))
+        set_collection_count(scene, 'lod', max(0, args.lods), main_col)
+
+        main_objects = fill_collection(main_col, f"{scene.name}_Main", args.objects, args.polygons, materials)
+
+        for lod_idx, col in get_cols_by_type(scene, 'lod', main_col).items():
+            fill_collection(col, f"{scene.name}_LOD{lod_idx}", args.objects, args.polygons // (2 ** lod_idx), materials)
+
+        for bs_idx, col in get_cols_by_type(scene, 'bs').items():
+            fill_collection(col, f"{scene.name}_BS{bs_idx}", args.objects, args.polygons // 2, materials)
+            for lod_idx, lod_col in get_cols_by_type(scene, 'lod', col).items():
+                fill_collection(lod_col, f"{scene.name}_BS{bs_idx}_LOD{lod_idx}", args.objects, args.polygons // (2 ** (lod_idx + 1)), materials)
+
+        hkt_col = [col for col in collections['hkt'] if col.seut.ref_col == main_col][0]
+        for col_idx in range(max(0, min(args.collision, 10))):
+            mesh = bpy.data.meshes.new(f"{scene.name}_Collision_{col_idx}")
+            bm = bmesh.new()
+            bmesh.ops.create_cube(bm, size=2.0)
+            bm.to_mesh(mesh)
+            bm.free()
+            obj = bpy.data.objects.new(mesh.name, mesh)
+            obj.location = (col_idx * 2.5, 0.0, 0.0)
+            hkt_col.objects.link(obj)
+
+        with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers['SEUT']):
+            for sp_idx, subpart_scene in enumerate(subpart_scenes):
+                empty = bpy.data.objects.new(f"subpart_{sp_idx}", None)
+                empty.empty_display_type = 'ARROWS'
+                empty.parent = main_objects[0]
+                empty['file'] = ""
+                main_col.objects.link(empty)
+                bpy.context.view_layer.objects.active = empty
+                empty.seut.linkedScene = subpart_scene
+
+        scenes.append(scene)
+
+    for scene in subpart_scenes + scenes:
+        with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers['SEUT']):
+            scene.seut.mod_path = mod_dir
+            scene.seut.export_incremental = args.incremental
+
+    return subpart_scenes + scenes
+
+
+def get_scene_stats(scene) -> dict:
+    collections = [c for c in bpy.data.collections if c.seut.scene is scene and c.seut.col_type not in ['none', 'seut']]
+    objects = set(obj for c in collections for obj in c.objects)
+
+    return {
+        'collections': len(collections),
+        'objects': len(objects),
+        'polygons': sum(len(obj.data.polygons) for obj in objects if obj.type == 'MESH'),
+    }
+
+
+def run_timed_steps(steps) -> tuple:
+    """Runs export steps to completion like run_steps. Returns their result and the seconds spent in each stage."""
+
+    timings = {}
+    stage = "Setup"
+    start = time.perf_counter()
+
+    while True:
+        try:
+            item = next(steps)
+        except StopIteration as e:
+            result = e.value
+            break
+
+        if isinstance(item, Future):
+            wait([item])
+
+        elif isinstance(item, str):
+            now = time.perf_counter()
+            timings[stage] = timings.get(stage, 0.0) + now - start
+            stage = item
+            start = now
+
+    timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+    return result, timings
+
+
+def export_scene(scene) -> dict:
+    """Exports a scene once and returns the wall time of each stage."""
+
+    entry = {'scene': scene.name, 'success': False}
+
+    with collect_issues() as issues, bpy.context.temp_override(scene=scene, view_layer=scene.view_layers['SEUT']):
+        reset_tool_cancellation()
+
+        start = time.perf_counter()
+        try:
+            result, timings = run_timed_steps(export_steps(None, bpy.context, True, None))
+            entry['success'] = result == {'FINISHED'}
+            entry['stages'] = timings
+
+        except Exception as e:
+            traceback.print_exc()
+            entry['error'] = str(e)
+            entry['stages'] = {}
+
+        entry['total'] = time.perf_counter() - start
+
+    entry['issues'] = [i for i in issues if i['type'] == 'ERROR']
+
+    return entry
+
+
+def summarize(runs: list) -> dict:
+    """Returns the minimum, mean and maximum seconds of each stage and of the total across all runs."""
+
+    samples = {}
+    for run in runs:
+        for stage, seconds in run['stages'].items():
+            samples.setdefault(stage, []).append(seconds)
+        samples.setdefault('Total', []).append(run['total'])
+
+    return {
+        stage: {
+            'min': round(min(values), 4),
+            'mean': round(sum(values) / len(values), 4),
+            'max': round(max(values), 4),
+            'runs': len(values),
+        }
+        for stage, values in samples.items()
+    }
+
+
+def compare_to_baseline(stages: dict, baseline: dict, tolerance: float) -> list:
+    """Returns the stages that got slower than the baseline by more than the tolerance."""
+
+    regressions = []
+    for stage, values in stages.items():
+        if stage not in baseline:
+            continue
+
+        before = baseline[stage]['mean']
+        after = values['mean']
+        if after > before * (1 + tolerance) and after - before > NOISE_FLOOR:
+            regressions.append({'stage': stage, 'baseline': before, 'mean': after, 'change': round(after / max(before, 0.0001) - 1, 3)})
+
+    return regressions
+
+
+def print_results(summary: dict):
+    print(f"\n{'Stage':<24}{'Min (s)':>10}{'Mean (s)':>10}{'Max (s)':>10}")
+    for stage, values in summary['stages'].items():
+        print(f"{stage:<24}{values['min']:>10.3f}{values['mean']:>10.3f}{values['max']:>10.3f}")
+
+    for regression in summary.get('regressions', []):
+        print(f"SEUT Benchmark: Stage '{regression['stage']}' regressed by {round(regression['change'] * 100)}%: {regression['baseline']}s -> {regression['mean']}s.")
+
+
+def main(argv: list = None) -> int:
+    """Runs the benchmark and returns its exit code."""
+
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+    parser = get_argument_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit:
+        return EXIT_USAGE
+
+    if sys.platform == "win32":
+        print("SEUT Benchmark: The stand-in tools are run in place of Wine, so the benchmark only runs on Linux and macOS.")
+        return EXIT_USAGE
+
+    baseline = None
+    if args.baseline is not None:
+        try:
+            with open(args.baseline, 'r') as baseline_file:
+                baseline = json.load(baseline_file)['stages']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"SEUT Benchmark: Baseline '{args.baseline}' could not be read: {e}")
+            return EXIT_USAGE
+
+    work_dir = args.work_dir if args.work_dir is not None else tempfile.mkdtemp(prefix="seut_benchmark_")
+    work_dir = os.path.abspath(work_dir)
+    mod_dir = os.path.join(work_dir, 'Mod')
+    os.makedirs(mod_dir, exist_ok=True)
+
+    try:
+        create_standin_tools(os.path.join(work_dir, 'Tools'))
+
+        with standin_tools(os.path.join(work_dir, 'Tools'), os.path.join(work_dir, 'Assets'), args):
+            bpy.ops.wm.read_homefile(use_empty=True)
+            scenes = build_scenes(args, mod_dir)
+            # The export requires the BLEND file to be saved.
+            bpy.ops.wm.save_as_mainfile(filepath=os.path.join(work_dir, 'benchmark.blend'))
+
+            runs = []
+            for iteration in range(max(1, args.repeat)):
+                for scene in scenes:
+                    print(f"SEUT Benchmark: Exporting scene '{scene.name}' ({iteration + 1}/{args.repeat}).")
+                    run = export_scene(scene)
+                    run['iteration'] = iteration
+                    runs.append(run)
+
+            stats = {scene.name: get_scene_stats(scene) for scene in scenes}
+
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = {
+        'success': all(run['success'] for run in runs),
+        'blender': bpy.app.version_string,
+        'options': vars(args),
+        'scenes': stats,
+        'stages': summarize(runs),
+        'runs': runs,
+    }
+
+    if baseline is not None:
+        summary['regressions'] = compare_to_baseline(summary['stages'], baseline, args.tolerance)
+        summary['success'] = summary['success'] and summary['regressions'] == []
+
+    if args.report is not None:
+        with open(args.report, 'w') as report_file:
+            json.dump(summary, report_file, indent=4)
+
+    print_results(summary)
+    print(SUMMARY_PREFIX + json.dumps({k: v for k, v in summary.items() if k != 'runs'}))
+
+    return EXIT_SUCCESS if summary['success'] else EXIT_FAILED
@@ -0,0 +1,151 @@
+"""Stand-in for the Windows tools SEUT calls during export, so the export can be benchmarked without them.
+
+The benchmark copies this script to FBXImporter.exe, hctStandAloneFilterManager.exe and MwmBuilder.exe and runs them with
+Python in place of Wine. Each copy behaves like the tool it is named after: it reads the inputs and writes plausible outputs
+after a delay. The delay can be configured through the environment:
+
+    SEUT_STANDIN_DELAY              Seconds every call takes at least. Defaults to 0.2.
+    SEUT_STANDIN_DELAY_PER_MB       Additional seconds per MB of input. Defaults to 0.5.
+    SEUT_STANDIN_<TOOL>_DELAY       Overrides SEUT_STANDIN_DELAY for one tool, e.g. SEUT_STANDIN_MWMBUILDER_DELAY.
+
+Does not depend on Blender."""
+
+import os
+import sys
+import glob
+import time
+
+
+def to_local_path(path: str) -> str:
+    """Converts a Wine path back to a path of the host."""
+
+    if len(path) > 2 and path[1] == ':' and path[0] in 'Zz':
+        return path[2:].replace('\\', '/')
+
+    return path
+
+
+def get_delay(tool: str, input_size: int) -> float:
+    base = float(os.environ.get(f"SEUT_STANDIN_{tool.upper()}_DELAY", os.environ.get('SEUT_STANDIN_DELAY', "0.2")))
+    per_mb = float(os.environ.get('SEUT_STANDIN_DELAY_PER_MB', "0.5"))
+
+    return base + per_mb * input_size / (1024 * 1024)
+
+
+def read_inputs(paths: list) -> int:
+    """Reads the input files like the tool would and returns their total size."""
+
+    size = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            size += len(f.read())
+
+    return size
+
+
+def write_output(path: str, header: bytes, inputs: list):
+    with open(path, 'wb') as f:
+        f.write(header)
+        for i in inputs:
+            f.write(f"\n{os.path.basename(i)}: {os.path.getsize(i)}".encode('utf-8'))
+
+
+def fbx_importer(args: list) -> int:
+    """FBXImporter.exe <source FBX> <target HKT>"""
+
+    if len(args) != 2:
+        print("Usage: FBXImporter.exe <source> <target>")
+        return 1
+
+    source, target = [to_local_path(a) for a in args]
+    if not os.path.isfile(source):
+        print(f"FBXImporter: ERROR: Could not find '{source}'.")
+        return 1
+
+    time.sleep(get_delay('fbximporter', read_inputs([source])))
+    write_output(target, b"HKTFBX stand-in", [source])
+    print(f"FBXImporter: Converted '{source}' to '{target}'.")
+
+    return 0
+
+
+def havok_filter(args: list) -> int:
+    """hctStandAloneFilterManager.exe -t -s <HKO> -p <target HKT> <source HKT>"""
+
+    hko = None
+    target = None
+    sources = []
+
+    idx = 0
+    while idx < len(args):
+        if args[idx] == '-s' and idx + 1 < len(args):
+            hko = to_local_path(args[idx + 1])
+            idx += 1
+        elif args[idx] == '-p' and idx + 1 < len(args):
+            target = to_local_path(args[idx + 1])
+            idx += 1
+        elif not args[idx].startswith('-'):
+            sources.append(to_local_path(args[idx]))
+        idx += 1
+
+    if hko is None or target is None or len(sources) != 1 or not os.path.isfile(sources[0]):
+        print("Filter Manager: Invalid arguments.")
+        return 2
+
+    time.sleep(get_delay('hctstandalonefiltermanager', read_inputs([hko, sources[0]])))
+    write_output(target, b"HKT stand-in", [hko, sources[0]])
+    print(f"Filter Manager: Processed '{sources[0]}' with filter set '{hko}'.")
+
+    return 0
+
+
+def mwm_builder(args: list) -> int:
+    """MwmBuilder.exe /f /s:<source dir> /m:<file mask> /o:<output dir> /x:<materials dir>"""
+
+    options = {}
+    for arg in args:
+        if arg.startswith('/') and len(arg) > 2 and arg[2] == ':':
+            options[arg[1]] = to_local_path(arg[3:])
+
+    if 's' not in options or 'm' not in options:
+        print("MwmBuilder: ERROR: Source and file mask must be set.")
+        return 1
+
+    source_dir = options['s']
+    output_dir = options.get('o', source_dir)
+
+    fbx_files = sorted(glob.glob(os.path.join(glob.escape(source_dir), options['m'])))
+    if fbx_files == []:
+        print(f"MwmBuilder: WARNING: No files match '{options['m']}' in '{source_dir}'.")
+        return 0
+
+    for fbx in fbx_files:
+        name = os.path.splitext(os.path.basename(fbx))[0]
+        inputs = [f for f in [fbx, os.path.join(source_dir, name + '.xml'), os.path.join(source_dir, name + '.hkt')] if os.path.isfile(f)]
+
+        print(f"MwmBuilder: INFO: Processing '{fbx}'.")
+        time.sleep(get_delay('mwmbuilder', read_inputs(inputs)))
+        write_output(os.path.join(output_dir, name + '.mwm'), b"MWM stand-in", inputs)
+        print(f"MwmBuilder: INFO: Written '{name}.mwm'.")
+
+    return 0
+
+
+TOOLS = {
+    'fbximporter': fbx_importer,
+    'hctstandalonefiltermanager': havok_filter,
+    'mwmbuilder': mwm_builder,
+}
+
+
+def main() -> int:
+    tool = os.path.splitext(os.path.basename(sys.argv[0]))[0].lower()
+    if tool not in TOOLS:
+        print(f"SEUT stand-in: Unknown tool '{tool}'. Copy this script to one of: {', '.join(TOOLS.keys())}.")
+        return 1
+
+    return TOOLS[tool](sys.argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import bpy
+import os
+import shutil
+import hashlib
+
+from ..seut_export_cache    import hash_value, hash_matrix, hash_mesh
+from ...seut_utils          import get_addon, get_preferences
+
+
+# Converted HKT files are kept in the user's cache directory under a key of everything that goes into them. As the key
+# does not depend on the scene or export folder, collision that is shared or unchanged is only ever converted once.
+
+HKT_CACHE_VERSION = 1
+
+
+def get_hkt_cache_dir() -> str:
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'seut', 'hkt')
+
+
+def is_hkt_cache_enabled() -> bool:
+    try:
+        return get_preferences().hkt_cache
+    except Exception:
+        return False
+
+
+def get_collision_key(context, collection, rescale_factor: float, havok_options: str) -> str:
+    """Returns a key of the collision's geometry and rigid bodies, the scale it is exported with and the Havok options."""
+
+    scene = context.scene
+    depsgraph = context.evaluated_depsgraph_get()
+    hasher = hashlib.sha1()
+
+    bl_info = get_addon().bl_info
+    hash_value(hasher, (HKT_CACHE_VERSION, bl_info['version'], bl_info['dev_version'], get_preferences().havok_path))
+    hash_value(hasher, (scene.seut.sceneType, rescale_factor))
+    hash_value(hasher, havok_options)
+
+    for obj in sorted(collection.objects, key=lambda o: o.name):
+        hash_value(hasher, (obj.name, obj.type, obj.parent.name if obj.parent is not None else None))
+        hash_matrix(hasher, obj.matrix_world)
+        hash_matrix(hasher, obj.matrix_local)
+
+        if obj.type == 'MESH':
+            hash_mesh(hasher, obj, depsgraph)
+
+        if obj.rigid_body is not None:
+            rbo = obj.rigid_body
+            hash_value(hasher, (rbo.collision_shape, rbo.mass, rbo.friction, rbo.restitution, rbo.use_margin, rbo.collision_margin))
+
+    return hasher.hexdigest()
+
+
+def get_cached_hkt_path(key: str) -> str:
+    return os.path.join(get_hkt_cache_dir(), key[:2], f"{key}.hkt")
+
+
+def restore_cached_hkt(key: str, target: str) -> bool:
+    """Copies the cached HKT of the key to the target. Returns False if there is none."""
+
+    path = get_cached_hkt_path(key)
+    if not os.path.isfile(path):
+        return False
+
+    try:
+        shutil.copyfile(path, target)
+        return True
+    except OSError:
+        return False
+
+
+def store_cached_hkt(key: str, source: str):
+    """Adds a converted HKT to the cache."""
+
+    path = get_cached_hkt_path(key)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, path)
+
+    except OSError as e:
+        print(f"SEUT: HKT '{source}' could not be cached: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -1,70 +1,219 @@
 import bpy
 import os
-import tempfile
+import sys
+import time
+import shutil
+import traceback
+import hashlib
+import subprocess
 
 from ..seut_export_utils        import ExportSettings
+from ..seut_export_steps        import run_in_background, wait_for
+from ..seut_export_trace        import get_trace, hold_trace, use_trace
 from ...utils.called_tool_type  import ToolType
 from ...utils.seut_xml_utils    import update_subelement, format_entry
 from ...seut_errors             import seut_report
-from ...seut_utils              import linux_path_to_wine_path
+from .seut_havok_cache          import store_cached_hkt
 
-def convert_fbx_to_fbxi_hkt(context, settings: ExportSettings, source: str, target: str):
-    """Converts the FBX created by export to FBXImporter FBX for HKT creation."""
 
-    settings.callTool(
-        context,
-        [settings.fbximporter, source, target],
-        ToolType(1),
-        logfile=f"{target}.convert.log"
-    )
+# The HKO template is read once and each distinct set of options is rendered and written to a file once. The files are
+# kept in a folder of the Blender session until the addon is unregistered or Blender exits, see clear_hko_files. Folders
+# left behind by sessions that crashed are removed on the next register, see clear_stale_hko_dirs.
+HKO_STALE_AGE = 24 * 60 * 60
 
-def convert_fbxi_hkt_to_hkt(self, context, settings: ExportSettings, source: str, target: str, adjustments: dict = None):
-    """Converts the HKT created by FBXImporter to the final HKT."""
+hko_template = None
+hko_contents = {}
+hko_files = {}
 
-    havok_options = get_hko_content(adjustments)
 
-    hko = tempfile.NamedTemporaryFile(mode='wt', prefix='space_engineers_', suffix=".hko", delete=False) # wt mode is write plus text mode.
-    try:
-        with hko.file as tempfile_to_process:
-            tempfile_to_process.write(havok_options)
-        
-        # Convert paths for Wine compatibility on Linux
-        hko_wine_path: str = linux_path_to_wine_path(hko.name)
-        target_wine_path: str = linux_path_to_wine_path(target)
-        source_wine_path: str = linux_path_to_wine_path(source)
-        logfile_wine_path: str = linux_path_to_wine_path(target + ".filter.log")
-
-        # -t is for standard ouput, -s designates a filter set (hko created above), -p designates path.
-        # Above referenced from running "hctStandAloneFilterManager.exe -h"
-        result = settings.callTool(
-            context,
-            [settings.havokfilter, '-t', '-s', hko_wine_path, '-p', target_wine_path, source_wine_path],
-            ToolType(2),
-            logfile=logfile_wine_path,
-            successfulExitCodes=[0,1]
+class HavokConversionJob:
+    """Converts a collision FBX to HKT with FBXImporter and the Havok filter. Captures everything it needs from the scene so
+    it can run in the background while the export moves on to the next collection."""
+
+    def __init__(self, context, settings: ExportSettings, source: str, target: str, havok_options: str, cache_key: str = None):
+        self.settings = settings
+        self.source = source
+        self.target = target
+
+        self.hko_path = get_hko_file(havok_options)
+        self.cache_key = cache_key
+
+        self.outputs = []
+        self.error = None
+        self.trace = get_trace()
+        self.future = None
+
+
+    def run(self):
+        """Runs both tools. The Havok filter only runs if FBXImporter succeeded. Safe to call from a worker thread. An error
+        that keeps the Havok filter from running, e.g. a missing executable, is stored to be reported by finish_havok_conversion."""
+
+        with use_trace(self.trace):
+            self.convert()
+
+
+    def convert(self):
+        returncode, out, cmdline = self.settings.runTool(
+            [self.settings.fbximporter, self.source, self.target],
+            logfile=f"{self.target}.convert.log"
         )
+        self.outputs.append((ToolType(1), returncode, out, cmdline, [0]))
+
+        if returncode != 0:
+            return
+
+        try:
+            # -t is for standard ouput, -s designates a filter set (hko created above), -p designates path.
+            # Above referenced from running "hctStandAloneFilterManager.exe -h"
+            # The paths are converted for Wine by the tool runner. The filter processes the HKT in place.
+            returncode, out, cmdline = self.settings.runTool(
+                [self.settings.havokfilter, '-t', '-s', self.hko_path, '-p', self.target, self.target],
+                logfile=self.target + ".filter.log"
+            )
+            self.outputs.append((ToolType(2), returncode, out, cmdline, [0,1]))
+
+        except Exception as e:
+            traceback.print_exc()
+            self.error = e
 
-    except Exception as e:
-        print(e)
 
-    finally:
-        if context.scene.seut.export_deleteLooseFiles:
-            os.remove(hko.name)
+def start_havok_conversion(context, settings: ExportSettings, source: str, target: str, havok_options: str, cache_key: str = None) -> HavokConversionJob:
+    """Starts converting the FBX created by export to the final HKT in the background. If a cache key is passed, the HKT is
+    added to the HKT cache once it was converted successfully."""
+
+    job = HavokConversionJob(context, settings, source, target, havok_options, cache_key)
+    job.future = run_in_background(job.run)
+    hold_trace(job.trace, job.future)
+
+    return job
+
+
+def finish_havok_conversion(context, job: HavokConversionJob):
+    """Yields until the conversion is done and reports the results of its tools. Must be called from the main thread."""
+
+    yield from wait_for(job.future)
+
+    name = os.path.basename(job.target)
+    succeeded = len(job.outputs) == 2
+    for tooltype, returncode, out, cmdline, successful_exit_codes in job.outputs:
+        try:
+            # Nonzero exit codes that are considered successful are not inspected further.
+            if not job.settings.checkToolResult(context, tooltype, returncode, out, cmdline, successfulExitCodes=successful_exit_codes) and returncode == 0:
+                succeeded = False
+
+        # A failed Havok filter is reported, but does not cancel the export.
+        except subprocess.CalledProcessError as e:
+            if tooltype != ToolType.Havok:
+                raise
+            seut_report(job.settings, context, 'ERROR', False, 'E061', name, str(tooltype), f"Exit code {e.returncode}.")
+            succeeded = False
+
+    if job.error is not None:
+        seut_report(job.settings, context, 'ERROR', False, 'E061', name, str(ToolType.Havok), str(job.error))
+        succeeded = False
+
+    if succeeded and job.cache_key is not None and os.path.isfile(job.target):
+        store_cached_hkt(job.cache_key, job.target)
 
 
 def get_hko_content(adjustments: dict = None) -> str:
     """Returns the content of the default HKO file."""
 
-    # This file is taken entirely from Balmung's fork of Harag's plugin. No reason to reinvent the wheel.
-    # https://github.com/Hotohori/se-blender/blob/master/src/python/space_engineers/havok_options.py
-    path = os.path.join(os.path.dirname(__file__), 'default.hko')
+    global hko_template
 
-    with open(path, 'r') as file:
-        hko = file.read()
+    key = tuple(sorted((elem, str(value)) for elem, value in adjustments.items())) if adjustments is not None else None
+    if key in hko_contents:
+        return hko_contents[key]
 
+    if hko_template is None:
+        # This file is taken entirely from Balmung's fork of Harag's plugin. No reason to reinvent the wheel.
+        # https://github.com/Hotohori/se-blender/blob/master/src/python/space_engineers/havok_options.py
+        path = os.path.join(os.path.dirname(__file__), 'default.hko')
+
+        with open(path, 'r') as file:
+            hko_template = file.read()
+
+    hko = hko_template
     if adjustments is not None:
         for elem, value in adjustments.items():
             hko = update_subelement(hko, 'hkparam', value, elem)
         hko = format_entry(hko)
 
-    return hko
\ No newline at end of file
+    hko_contents[key] = hko
+    return hko
+
+
+def get_hko_file(havok_options: str) -> str:
+    """Returns the path of a temporary HKO file with the given content. Must be called from the main thread."""
+
+    path = hko_files.get(havok_options)
+    if path is not None and os.path.isfile(path):
+        return path
+
+    session_dir = get_hko_session_dir()
+    os.makedirs(session_dir, exist_ok=True)
+
+    # Named after the content, so a file is never shared by different options, even after clear_hko_files.
+    digest = hashlib.sha1(havok_options.encode('utf-8')).hexdigest()
+    path = os.path.join(session_dir, f"space_engineers_{digest}.hko")
+    with open(path, 'w') as file:
+        file.write(havok_options)
+
+    hko_files[havok_options] = path
+    return path
+
+
+def get_hko_dir() -> str:
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'seut', 'hko')
+
+
+def get_hko_session_dir() -> str:
+    return os.path.join(get_hko_dir(), str(os.getpid()))
+
+
+def is_session_alive(pid: int, path: str) -> bool:
+    """Returns whether the Blender session that owns an HKO folder may still be running."""
+
+    if pid == os.getpid():
+        return True
+
+    # Signal 0 only checks for the process on Linux and macOS. On Windows it would terminate it, so the age decides there.
+    if sys.platform != "win32":
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass
+        return True
+
+    try:
+        return time.time() - os.path.getmtime(path) < HKO_STALE_AGE
+    except OSError:
+        return False
+
+
+def clear_stale_hko_dirs():
+    """Removes the HKO folders of Blender sessions that ended without unregistering the addon."""
+
+    hko_dir = get_hko_dir()
+    if not os.path.isdir(hko_dir):
+        return
+
+    for name in os.listdir(hko_dir):
+        path = os.path.join(hko_dir, name)
+        if name.isdigit() and not is_session_alive(int(name), path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def clear_hko_files():
+    """Removes the HKO files of this session and forgets the cached HKO content."""
+
+    global hko_template
+
+    shutil.rmtree(get_hko_session_dir(), ignore_errors=True)
+
+    hko_files.clear()
+    hko_contents.clear()
+    hko_template = None
\ No newline at end of file
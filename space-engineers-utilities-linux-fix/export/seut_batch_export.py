@@ -0,0 +1,174 @@
+"""Exports the scenes of BLEND files without the Blender UI, e.g. on a build server:
+
+    blender -b --python <SEUT directory>/seut_batch.py -- [--scene NAME] [--report FILE] [file.blend ...]
+
+If no BLEND file is passed, the file Blender was started with is exported. A summary of the results is printed as a single
+line starting with SUMMARY_PREFIX and optionally written to a JSON file. The exit code is 0 if all scenes were exported
+successfully, 1 if any failed and 2 if the arguments were invalid."""
+
+import bpy
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+
+from contextlib                     import contextmanager
+
+from .seut_ot_export                import export
+from .seut_ot_export_all_scenes     import get_exported_scenes
+from .seut_mwmbuilder               import MwmBuildQueue
+from ..utils.seut_tool_utils        import reset_tool_cancellation
+from ..seut_errors                  import issue_listeners
+
+
+SUMMARY_PREFIX = "SEUT_BATCH_SUMMARY "
+
+EXIT_SUCCESS = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="seut_batch.py", description="Exports scenes of BLEND files with SEUT.")
+    parser.add_argument('files', nargs='*', help="BLEND files to export. Defaults to the currently opened file.")
+    parser.add_argument('-s', '--scene', action='append', dest='scenes', default=[], help="Name of a scene to export. Can be repeated. Defaults to all scenes.")
+    parser.add_argument('-r', '--report', help="Path of a JSON file to write the summary to.")
+
+    return parser
+
+
+@contextmanager
+def collect_issues():
+    """Yields a list which all SEUT issues reported within the block are added to."""
+
+    issues = []
+
+    def listener(issue_type, text, code, reference):
+        issues.append({
+            'type': issue_type,
+            'code': code,
+            'text': text,
+        })
+
+    issue_listeners.append(listener)
+    try:
+        yield issues
+    finally:
+        issue_listeners.remove(listener)
+
+
+def export_scene(scene, mwm_queue: MwmBuildQueue) -> dict:
+    """Exports a single scene. Its MWMs are compiled through the queue."""
+
+    start = time.time()
+    entry = {
+        'file': bpy.data.filepath,
+        'scene': scene.name,
+        'success': False,
+    }
+
+    # Scenes are not switched through the window, as there is none.
+    with collect_issues() as issues, bpy.context.temp_override(scene=scene, view_layer=scene.view_layers['SEUT']):
+        context = bpy.context
+
+        try:
+            # There is no operator to report from, all reports go to the console and the issue list.
+            result = export(None, context, True, mwm_queue)
+            entry['success'] = result == {'FINISHED'}
+
+        except Exception as e:
+            traceback.print_exc()
+            entry['error'] = str(e)
+
+    entry['duration'] = round(time.time() - start, 3)
+    entry['issues'] = issues
+
+    return entry
+
+
+def export_file(filepath: str, scene_names: list) -> list:
+    """Opens a BLEND file and exports the selected scenes. Returns one entry per scene."""
+
+    if filepath is not None:
+        bpy.ops.wm.open_mainfile(filepath=filepath)
+
+    scenes = get_exported_scenes()
+    if scene_names != []:
+        scenes = [scn for scn in scenes if scn.name in scene_names]
+
+    entries = []
+    mwm_queue = MwmBuildQueue()
+
+    for scn in scenes:
+        print(f"SEUT: Exporting scene '{scn.name}' of '{bpy.data.filepath}'.")
+        entries.append(export_scene(scn, mwm_queue))
+
+    with collect_issues() as mwm_issues:
+        mwm_results = mwm_queue.finish(None, bpy.context)
+
+    # Issues of MWM Builder cannot be told apart by scene, so they are added to every scene that failed to compile.
+    for entry in entries:
+        if not mwm_results.get(entry['scene'], True):
+            entry['success'] = False
+            entry['issues'].extend(mwm_issues)
+
+    return entries
+
+
+def main(argv: list = None) -> int:
+    """Runs the batch export and returns its exit code."""
+
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+    parser = get_argument_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit:
+        return EXIT_USAGE
+
+    files = [os.path.abspath(f) for f in args.files]
+    for f in files:
+        if not os.path.isfile(f):
+            print(f"SEUT: BLEND file '{f}' does not exist.")
+            return EXIT_USAGE
+
+    if files == []:
+        if bpy.data.filepath == "":
+            print("SEUT: No BLEND file to export.")
+            return EXIT_USAGE
+        files = [None]
+
+    reset_tool_cancellation()
+
+    start = time.time()
+    entries = []
+
+    for f in files:
+        try:
+            entries.extend(export_file(f, args.scenes))
+        except Exception as e:
+            traceback.print_exc()
+            entries.append({'file': f, 'scene': None, 'success': False, 'error': str(e), 'issues': []})
+
+    missing = [name for name in args.scenes if name not in [e['scene'] for e in entries]]
+    for name in missing:
+        entries.append({'file': None, 'scene': name, 'success': False, 'error': "Scene not found.", 'issues': []})
+
+    summary = {
+        'success': len(entries) > 0 and all(e['success'] for e in entries),
+        'exported': len([e for e in entries if e['success']]),
+        'failed': len([e for e in entries if not e['success']]),
+        'duration': round(time.time() - start, 3),
+        'scenes': entries,
+    }
+
+    if args.report is not None:
+        with open(args.report, 'w') as report_file:
+            json.dump(summary, report_file, indent=4)
+
+    print(SUMMARY_PREFIX + json.dumps(summary))
+
+    return EXIT_SUCCESS if summary['success'] else EXIT_FAILED
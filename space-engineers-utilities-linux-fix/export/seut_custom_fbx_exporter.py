@@ -1,8 +1,16 @@
 
 import bpy
+import os
 import threading
 
+from types                  import SimpleNamespace
+from contextlib             import contextmanager
 from collections            import OrderedDict
+from concurrent.futures     import wait
+from bpy_extras             import node_shader_utils
+
+from .seut_export_steps     import run_in_background
+from .seut_export_trace     import trace_span
 
 # STOLLIE: This clones the specification from Blenders source code for its FBX Exporter so we can add some custom properties.
 def _clone_fbx_module():
@@ -177,6 +185,212 @@ def fbx_data_object_elements(root, ob_obj, scene_data):
 # STOLLIE: Assign the blender defined and custom properties above to the copied function from the loaded specification by calling the above function.
 _fbx.fbx_data_object_elements = fbx_data_object_elements
 
+# MwmBuilder takes the materials from the XML definitions, but expects each material in the FBX to have a texture.
+# Instead of adding dummy nodes to the node trees of all materials for the export, the materials of the exported objects
+# are presented to the exporter as stand-ins with a dummy texture.
+material_wrappers = {}
+
+
+class ExportTextureWrapper:
+    """Read-only stand-in for the ShaderImageTextureWrapper of an image node without mapping."""
+
+    texcoords = 'UV'
+    projection = 'FLAT'
+    extension = 'REPEAT'
+    translation = (0.0, 0.0, 0.0)
+    rotation = (0.0, 0.0, 0.0)
+    scale = (1.0, 1.0, 1.0)
+
+    def __init__(self, image):
+        self.image = image
+
+
+class ExportMaterialWrapper:
+    """Read-only stand-in for the PrincipledBSDFWrapper of a material consisting of a default Principled BSDF with an image as
+    base color and a normal map."""
+
+    use_nodes = True
+    base_color = (0.8, 0.8, 0.8)
+    specular = 0.5
+    specular_tint = (0.0, 0.0, 0.0)
+    roughness = 0.5
+    metallic = 0.0
+    ior = 1.5
+    transmission = 0.0
+    alpha = 1.0
+    emission_color = (0.0, 0.0, 0.0)
+    emission_strength = 0.0
+    normalmap_strength = 1.0
+
+    specular_texture = None
+    specular_tint_texture = None
+    roughness_texture = None
+    metallic_texture = None
+    ior_texture = None
+    transmission_texture = None
+    alpha_texture = None
+    emission_color_texture = None
+    emission_strength_texture = None
+    normalmap_texture = None
+
+    def __init__(self, material, image):
+        self.material = material
+        self.base_color_texture = ExportTextureWrapper(image)
+
+
+def PrincipledBSDFWrapper(material, is_readonly=True, use_nodes=True):
+    wrapper = material_wrappers.get(material)
+    if wrapper is not None:
+        return wrapper
+
+    return node_shader_utils.PrincipledBSDFWrapper(material, is_readonly=is_readonly, use_nodes=use_nodes)
+
+
+@contextmanager
+def use_material_wrappers(wrappers: dict):
+    """Presents the materials to the exporter as the stand-ins in wrappers within the block."""
+
+    global material_wrappers
+
+    material_wrappers = wrappers
+    try:
+        yield
+    finally:
+        material_wrappers = {}
+
+_fbx.node_shader_utils = SimpleNamespace(PrincipledBSDFWrapper=PrincipledBSDFWrapper)
+
+# Without bake_space_transform, the geometry of a mesh is written in its local space, so the global matrix, which carries
+# the grid size's rescale factor, only affects the transforms of the root objects. The geometry elements written for one
+# grid size can therefore be reused for the others instead of extracting the meshes again.
+geometry_cache = None
+
+_original_fbx_data_mesh_elements = _fbx.fbx_data_mesh_elements
+
+
+def reset_elem_offsets(elem):
+    """Allows an element that was already written to be written again."""
+
+    elem._end_offset = -1
+    elem._props_length = -1
+    for child in elem.elems:
+        reset_elem_offsets(child)
+
+
+def fbx_data_mesh_elements(root, me_obj, scene_data, done_meshes):
+    if geometry_cache is None or scene_data.settings.bake_space_transform:
+        return _original_fbx_data_mesh_elements(root, me_obj, scene_data, done_meshes)
+
+    me_key = scene_data.data_meshes[me_obj][0]
+    if me_key in done_meshes:
+        return
+
+    key = (me_obj.key, me_key)
+    elems = geometry_cache.get(key)
+    if elems is not None:
+        # The elements may still be written to a previous file.
+        if fbx_writes:
+            wait(list(fbx_writes.values()))
+        for elem in elems:
+            reset_elem_offsets(elem)
+        root.elems.extend(elems)
+        done_meshes.add(me_key)
+        return
+
+    count = len(root.elems)
+    _original_fbx_data_mesh_elements(root, me_obj, scene_data, done_meshes)
+    geometry_cache[key] = root.elems[count:]
+
+_fbx.fbx_data_mesh_elements = fbx_data_mesh_elements
+
+
+@contextmanager
+def use_geometry_cache():
+    """Reuses the geometry elements of meshes across all FBX files written within the block."""
+
+    global geometry_cache
+
+    if geometry_cache is not None:
+        yield
+        return
+
+    geometry_cache = {}
+    try:
+        yield
+    finally:
+        geometry_cache = None
+
+# The exporter gathers the data on the main thread, but encoding the element tree and writing it to disk does not access
+# Blender data. Within a write session, this is done in the background while the export carries on with the next file.
+fbx_writes = None
+
+_original_encode_bin = _fbx.encode_bin
+
+
+def write(fn, elem_root, version):
+    def write_in_background():
+        with trace_span("FBX Write", category='fbx', file=os.path.basename(fn)):
+            _original_encode_bin.write(fn, elem_root, version)
+
+    fbx_writes[fn] = run_in_background(write_in_background)
+
+
+@contextmanager
+def enable_multithreading_cm():
+    # Multithreaded array compression replaces FBXElem._write with a stub that raises while the next file is gathered,
+    # which breaks the writes still running in the background. Within a write session the arrays are compressed as they
+    # are added instead.
+    yield
+
+# The exporter only uses encode_bin.FBXElem to enable multithreading, the elements are created through fbx_utils. This
+# stand-in is only set on SEUT's clone of the exporter and only within fbx_write_session, see there.
+_session_encode_bin = SimpleNamespace(FBXElem=SimpleNamespace(enable_multithreading_cm=enable_multithreading_cm), write=write)
+
+
+def finish_fbx_write(path: str):
+    """Blocks until the file at path has been written. Raises any error that occurred while writing it."""
+
+    future = fbx_writes.pop(path, None) if fbx_writes is not None else None
+    if future is not None:
+        future.result()
+
+
+def pop_fbx_writes() -> dict:
+    """Returns the Futures of all files being written in the background by their path and stops tracking them."""
+
+    if fbx_writes is None:
+        return {}
+
+    writes = dict(fbx_writes)
+    fbx_writes.clear()
+    return writes
+
+
+@contextmanager
+def fbx_write_session(enabled: bool = True):
+    """Writes the FBX files in the background within the block. Waits for any writes still running when it ends."""
+
+    global fbx_writes
+
+    if fbx_writes is not None or not enabled:
+        yield
+        return
+
+    fbx_writes = {}
+    encode_bin = _fbx.encode_bin
+    _fbx.encode_bin = _session_encode_bin
+    try:
+        yield
+    finally:
+        _fbx.encode_bin = encode_bin
+        writes = fbx_writes
+        fbx_writes = None
+
+        wait(list(writes.values()))
+        for path, future in writes.items():
+            if future.exception() is not None:
+                print(f"SEUT: FBX file '{path}' could not be written: {future.exception()}")
+
 # HARAG: Export these two functions as our own so that clients of this module don't have to depend on
 # HARAG: the cloned fbx_experimental.export_fbx_bin module
 save_single = _fbx.save_single
@@ -0,0 +1,267 @@
+import bpy
+import os
+import json
+import hashlib
+import numpy as np
+
+from ..seut_collections     import get_collections, get_rev_ref_cols
+from ..seut_errors          import get_abs_path
+from ..seut_utils           import get_addon, get_export_objects
+
+
+MANIFEST_NAME = ".seut_export_manifest.json"
+MANIFEST_VERSION = 1
+
+# The state of an export pass is kept per export context, as each grid size is exported to its own files:
+# export_context.pending holds the collections whose fingerprint was computed but which still await a successful MWM build.
+# export_context.skipped holds the collections that were skipped because they are up to date.
+
+
+def is_cache_enabled(scene) -> bool:
+    """Returns whether the incremental export cache can be used for the given scene."""
+
+    # Characters depend on armatures, weights and actions, which are not part of the fingerprint.
+    return scene.seut.export_incremental and scene.seut.sceneType not in ['character', 'character_animation']
+
+
+def get_manifest_path(path: str) -> str:
+    return os.path.join(get_abs_path(path), MANIFEST_NAME)
+
+
+def load_manifest(path: str) -> dict:
+    """Loads the export manifest of an export folder."""
+
+    manifest_path = get_manifest_path(path)
+
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r') as manifest_file:
+                manifest = json.load(manifest_file)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+
+    return {'version': MANIFEST_VERSION, 'collections': {}}
+
+
+def save_manifest(path: str, manifest: dict):
+    """Saves the export manifest of an export folder."""
+
+    with open(get_manifest_path(path), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent = 4)
+
+
+def get_file_stats(filepath: str) -> list:
+    """Returns size and modification time of a file, None if it does not exist."""
+
+    if not os.path.isfile(filepath):
+        return None
+
+    stat = os.stat(filepath)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def hash_array(hasher, data, attribute: str, dtype, size: int = 1):
+    """Adds the values of an attribute of a bpy_prop_collection to the hash."""
+
+    array = np.empty(len(data) * size, dtype=dtype)
+    data.foreach_get(attribute, array)
+    hasher.update(array.tobytes())
+
+
+def hash_value(hasher, value):
+    hasher.update(str(value).encode('utf-8'))
+    hasher.update(b'\x00')
+
+
+def hash_matrix(hasher, matrix):
+    hasher.update(np.array(matrix, dtype=np.float32).tobytes())
+
+
+def hash_mesh(hasher, obj, depsgraph):
+    """Adds the evaluated geometry of a mesh object to the hash."""
+
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+
+    try:
+        hash_array(hasher, mesh.vertices, 'co', np.float32, 3)
+        hash_array(hasher, mesh.loops, 'vertex_index', np.int32)
+        hash_array(hasher, mesh.polygons, 'loop_start', np.int32)
+        hash_array(hasher, mesh.polygons, 'material_index', np.int32)
+        hash_array(hasher, mesh.corner_normals, 'vector', np.float32, 3)
+
+        for layer in mesh.uv_layers:
+            hash_value(hasher, layer.name)
+            hash_value(hasher, layer.active_render)
+            hash_array(hasher, layer.uv, 'vector', np.float32, 2)
+
+    finally:
+        obj_eval.to_mesh_clear()
+
+
+def hash_material(hasher, mat):
+    """Adds everything of a material that ends up in the XML definition or the converted textures to the hash."""
+
+    if mat is None:
+        hash_value(hasher, None)
+        return
+
+    hash_value(hasher, mat.name)
+    hash_value(hasher, mat.library.filepath if mat.library is not None else None)
+    hash_value(hasher, mat.asset_data is not None)
+    if mat.asset_data is not None:
+        hash_value(hasher, (mat.asset_data.seut.is_vanilla, mat.asset_data.seut.is_dlc))
+
+    hash_value(hasher, (mat.seut.technique, mat.seut.facing, mat.seut.windScale, mat.seut.windFrequency))
+
+    if mat.node_tree is None:
+        return
+
+    for node in mat.node_tree.nodes:
+        if node.type == 'TEX_IMAGE' and node.image is not None:
+            path = get_abs_path(node.image.filepath)
+            hash_value(hasher, (node.name, path, get_file_stats(path), tuple(node.image.size)))
+
+    for link in mat.node_tree.links:
+        hash_value(hasher, (link.from_node.name, link.from_node.label, link.to_node.name, link.to_socket.name))
+
+
+def hash_object(hasher, obj, depsgraph):
+    """Adds an object's transforms, properties and data to the hash."""
+
+    hash_value(hasher, (obj.name, obj.type, obj.seut.linked))
+    hash_value(hasher, (obj.parent.name if obj.parent is not None else None, obj.parent_type, obj.parent_bone))
+    hash_matrix(hasher, obj.matrix_world)
+    hash_matrix(hasher, obj.matrix_local)
+
+    for key in sorted(obj.keys()):
+        if key != 'seut':
+            hash_value(hasher, (key, obj.get(key)))
+
+    if obj.type == 'EMPTY':
+        hash_value(hasher, obj.empty_display_size)
+        linked_scene = obj.seut.linkedScene
+        if linked_scene is not None:
+            hash_value(hasher, (linked_scene.name, linked_scene.seut.subtypeId, linked_scene.seut.export_largeGrid, linked_scene.seut.export_smallGrid))
+        for entry in obj.seut.highlight_objects:
+            if entry.obj is not None:
+                hash_value(hasher, (entry.obj.name, entry.obj.parent.name if entry.obj.parent is not None else None))
+
+    elif obj.type == 'MESH':
+        for slot in obj.material_slots:
+            hash_material(hasher, slot.material)
+        hash_mesh(hasher, obj, depsgraph)
+
+
+def hash_collision(hasher, col, depsgraph):
+    """Adds a collision collection to the hash."""
+
+    hash_value(hasher, (col.name, col.seut.type_index, col.seut.ref_col.name if col.seut.ref_col is not None else None))
+
+    if col.seut.hkt_file != "":
+        path = get_abs_path(col.seut.hkt_file)
+        hash_value(hasher, (path, get_file_stats(path)))
+
+    for obj in sorted(col.objects, key=lambda o: o.name):
+        hash_object(hasher, obj, depsgraph)
+        if obj.rigid_body is not None:
+            rbo = obj.rigid_body
+            hash_value(hasher, (rbo.collision_shape, rbo.mass, rbo.friction, rbo.restitution, rbo.use_margin, rbo.collision_margin))
+
+
+def get_collection_fingerprint(context, export_context, collection) -> str:
+    """Returns a fingerprint of everything that influences the exported files of a collection."""
+
+    scene = context.scene
+    collections = get_collections(scene)
+    depsgraph = context.evaluated_depsgraph_get()
+    hasher = hashlib.sha1()
+
+    bl_info = get_addon().bl_info
+    hash_value(hasher, (bl_info['version'], bl_info['dev_version']))
+
+    # Scene settings
+    hash_value(hasher, (scene.seut.sceneType, export_context.subtype_id, export_context.grid_scale, export_context.rescale_factor, export_context.export_path))
+    hash_value(hasher, (scene.seut.export_largeGrid, scene.seut.export_smallGrid, scene.seut.export_medium_grid, scene.seut.rotate_character))
+    hash_value(hasher, (scene.seut.axis_up, scene.seut.axis_forward))
+
+    # Collection setup
+    hash_value(hasher, (collection.name, collection.seut.col_type, collection.seut.type_index, collection.seut.lod_distance))
+    hash_value(hasher, collection.seut.ref_col.name if collection.seut.ref_col is not None else None)
+
+    if collection.seut.col_type in ['main', 'bs']:
+        for col in get_rev_ref_cols(collections, collection, 'lod'):
+            hash_value(hasher, (col.name, col.seut.type_index, col.seut.lod_distance, len(col.objects) > 0))
+
+        # Collision of main may be duplicated for BS without one, so all collisions are relevant.
+        if collections.get('hkt') is not None:
+            for col in sorted(collections['hkt'], key=lambda c: c.name):
+                hash_collision(hasher, col, depsgraph)
+
+    for obj in sorted(get_export_objects(collection), key=lambda o: o.name):
+        hash_object(hasher, obj, depsgraph)
+
+    return hasher.hexdigest()
+
+
+def get_mwm_path(path: str, filename: str) -> str:
+    return os.path.join(get_abs_path(path), f"{filename}.mwm")
+
+
+def check_collection_cache(context, export_context, collection, filename: str) -> bool:
+    """Returns True if the collection is unchanged since the last export to the export context's files and its MWM still exists.
+    Otherwise, queues its fingerprint to be saved after the MWM build."""
+
+    scene = context.scene
+
+    if not is_cache_enabled(scene):
+        return False
+
+    fingerprint = get_collection_fingerprint(context, export_context, collection)
+    manifest = load_manifest(export_context.export_path)
+    entry = manifest['collections'].get(filename)
+
+    if entry is not None and entry.get('fingerprint') == fingerprint:
+        stats = get_file_stats(get_mwm_path(export_context.export_path, filename))
+        if stats is not None and stats == entry.get('mwm'):
+            export_context.skipped.add(collection.name)
+            return True
+
+    export_context.pending[filename] = fingerprint
+    return False
+
+
+def commit_export_cache(path: str, entries: dict):
+    """Saves the fingerprints of the collections exported to a folder to its manifest. Must only be called after a successful MWM build."""
+
+    if entries == {}:
+        return
+
+    manifest = load_manifest(path)
+
+    for filename, fingerprint in entries.items():
+        stats = get_file_stats(get_mwm_path(path, filename))
+        if stats is None:
+            manifest['collections'].pop(filename, None)
+        else:
+            manifest['collections'][filename] = {
+                'fingerprint': fingerprint,
+                'mwm': stats
+            }
+
+    save_manifest(path, manifest)
+
+
+def discard_export_cache(path: str, entries: dict):
+    """Removes the entries of the given collections from the manifest of a folder, forcing them to be rebuilt next time."""
+
+    if entries == {} or not os.path.isdir(get_abs_path(path)):
+        return
+
+    manifest = load_manifest(path)
+    for filename in entries.keys():
+        manifest['collections'].pop(filename, None)
+
+    save_manifest(path, manifest)
@@ -0,0 +1,221 @@
+import bpy
+import traceback
+
+from concurrent.futures     import Future, wait
+
+from ..utils.seut_tool_utils    import ToolGroup, get_tool_group, kill_tool_group, run_in_group, submit_group_task
+from ..seut_errors              import seut_report
+
+
+# The export is written as generators ("steps") which yield the name of the stage they begin and any Future of a tool
+# running in the background they need to wait for. run_steps drives them synchronously, ExportJob from a modal operator.
+
+# While an export runs, only these events reach Blender, so the view can be navigated but no data can be changed. Undo,
+# mode or scene switches and deletions would leave the export with references to data that no longer exists.
+PASSED_EVENTS = {
+    'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE',
+    'TRACKPADPAN', 'TRACKPADZOOM', 'MOUSEROTATE', 'MOUSESMARTZOOM',
+    'NDOF_MOTION', 'WINDOW_DEACTIVATE', 'TIMER', 'TIMER_REPORT',
+}
+
+# State of the running modal export, drawn by the export panel.
+progress = {
+    'running': False,
+    'stage': "",
+    'factor': 0.0,
+}
+
+
+def run_in_background(fn, *args, **kwargs) -> Future:
+    """Runs a function on the shared tool pool. It must not access Blender data. If called from the steps of an ExportJob
+    or a task they started, the function belongs to the job's tools and is stopped if the job is cancelled."""
+
+    return submit_group_task(get_tool_group(), fn, *args, **kwargs)
+
+
+def wait_for(future: Future):
+    """Waits for a Future while letting the caller continue with other work. Returns its result."""
+
+    if not future.done():
+        yield future
+
+    return future.result()
+
+
+def run_steps(steps):
+    """Runs export steps to completion, blocking while they wait for tools. Returns their result."""
+
+    while True:
+        try:
+            item = next(steps)
+        except StopIteration as e:
+            return e.value
+
+        if isinstance(item, Future):
+            wait([item])
+
+
+def is_export_running() -> bool:
+    return progress['running']
+
+
+def tag_redraw_all(context):
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+class ExportJob:
+    """Drives export steps a bit at a time so Blender stays responsive in between."""
+
+    def __init__(self, steps, stage_count: int, scenes: list):
+        self.steps = steps
+        self.stage_count = max(1, stage_count)
+        self.stages_done = -1
+        self.stage = ""
+        self.waiting = None
+        self.result = None
+
+        # The tools started by the steps, so cancelling the export does not stop those of e.g. a texture conversion.
+        self.tools = ToolGroup()
+
+        # Only names and pointers are kept, as accessing data that has been removed can crash Blender.
+        self.scenes = [(scn.name, scn.as_pointer()) for scn in scenes]
+        self.collections = [(col.name, col.as_pointer()) for col in bpy.data.collections if col.seut.scene in scenes]
+
+
+    def check_data(self, context) -> str:
+        """Returns what has changed in a way the steps cannot handle since the export started, None if nothing has."""
+
+        if context.mode != 'OBJECT':
+            return "Object Mode was left"
+
+        # Compared by pointer, as the export may rename collections.
+        scenes = {scn.as_pointer() for scn in bpy.data.scenes}
+        for name, pointer in self.scenes:
+            if pointer not in scenes:
+                return f"scene '{name}' was removed"
+
+        collections = {col.as_pointer() for col in bpy.data.collections}
+        for name, pointer in self.collections:
+            if pointer not in collections:
+                return f"collection '{name}' was removed"
+
+        return None
+
+
+    def advance(self) -> bool:
+        """Runs steps until they begin a new stage or wait for a tool that is still running. Returns True once all steps are done."""
+
+        while True:
+            if self.waiting is not None and not self.waiting.done():
+                return False
+            self.waiting = None
+
+            try:
+                item = run_in_group(self.tools, next, self.steps)
+            except StopIteration as e:
+                self.result = e.value
+                return True
+
+            if isinstance(item, Future):
+                self.waiting = item
+
+            elif isinstance(item, str):
+                self.stage = item
+                self.stages_done += 1
+                # Return to let the UI redraw between stages.
+                return False
+
+
+    def cancel(self):
+        kill_tool_group(self.tools)
+
+        # This runs the finally-blocks of the steps, which restore the scene as far as it still exists.
+        try:
+            run_in_group(self.tools, self.steps.close)
+        except Exception:
+            traceback.print_exc()
+
+
+def start_export_job(self, context, steps, stage_count: int, scenes: list) -> set:
+    """Starts running export steps from a modal operator. The export is cancelled if any of the scenes or their collections is removed."""
+
+    self.job = ExportJob(steps, stage_count, scenes)
+    self.timer = context.window_manager.event_timer_add(0.1, window=context.window)
+    context.window_manager.modal_handler_add(self)
+
+    progress['running'] = True
+    progress['stage'] = "Starting"
+    progress['factor'] = 0.0
+
+    return {'RUNNING_MODAL'}
+
+
+def end_export_job(self, context):
+    context.window_manager.event_timer_remove(self.timer)
+    context.workspace.status_text_set(None)
+
+    progress['running'] = False
+    progress['stage'] = ""
+    progress['factor'] = 0.0
+
+    tag_redraw_all(context)
+
+
+def update_export_job(self, context, event) -> set:
+    """Handles the events of a modal operator running export steps."""
+
+    if event.type == 'ESC' and event.value == 'PRESS':
+        self.job.cancel()
+        end_export_job(self, context)
+        seut_report(self, context, 'WARNING', True, 'W021')
+        return {'CANCELLED'}
+
+    if event.type not in PASSED_EVENTS:
+        return {'RUNNING_MODAL'}
+
+    if event.type != 'TIMER':
+        return {'PASS_THROUGH'}
+
+    change = self.job.check_data(context)
+    if change is not None:
+        self.job.cancel()
+        end_export_job(self, context)
+        seut_report(self, context, 'ERROR', True, 'E060', change)
+        return {'CANCELLED'}
+
+    try:
+        finished = self.job.advance()
+    except Exception as e:
+        traceback.print_exc()
+        self.job.cancel()
+        end_export_job(self, context)
+        seut_report(self, context, 'ERROR', True, 'E056', str(e))
+        return {'CANCELLED'}
+
+    if finished:
+        end_export_job(self, context)
+        return self.job.result if self.job.result in [{'FINISHED'}, {'CANCELLED'}] else {'FINISHED'}
+
+    progress['stage'] = f"{context.scene.name}: {self.job.stage}"
+    progress['factor'] = max(0, self.job.stages_done) / self.job.stage_count
+    context.workspace.status_text_set(f"SEUT: Exporting {progress['stage']} ({round(progress['factor'] * 100)}%). Press Esc to cancel.")
+    tag_redraw_all(context)
+
+    return {'PASS_THROUGH'}
+
+
+def draw_export_progress(layout):
+    if not progress['running']:
+        return False
+
+    box = layout.box()
+    box.label(text="Exporting...", icon='EXPORT')
+    box.progress(factor=progress['factor'], type='BAR', text=progress['stage'])
+    row = box.row()
+    row.scale_y = 0.75
+    row.label(text="Press Esc to cancel.")
+
+    return True
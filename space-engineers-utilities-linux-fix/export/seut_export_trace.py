@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import threading
+
+from contextlib     import contextmanager
+
+from ..seut_utils   import get_preferences
+
+
+# Records how long each part of the export takes as Chrome trace events, which can be opened in chrome://tracing or
+# ui.perfetto.dev. Spans can be recorded from any thread, e.g. by tools running in the background.
+
+current = None
+
+# The trace of the job a worker thread runs, which may be that of a scene whose export has already moved on, see use_trace.
+thread_trace = threading.local()
+NO_TRACE = object()
+
+
+class ExportTrace:
+    """Collects the spans of one export."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.start = time.perf_counter()
+        self.events = []
+        self.threads = {}
+        self.lock = threading.Lock()
+
+        # The trace is written once its session has ended and no job that records into it is left, see hold_trace.
+        self.holds = 0
+        self.closed = False
+
+
+    def add_span(self, name: str, category: str, start: float, end: float, args: dict):
+        thread = threading.current_thread()
+
+        with self.lock:
+            self.threads[thread.ident] = thread.name
+            self.events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': round((start - self.start) * 1000000, 1),
+                'dur': round((end - start) * 1000000, 1),
+                'pid': os.getpid(),
+                'tid': thread.ident,
+                'args': args,
+            })
+
+
+    def save(self):
+        with self.lock:
+            events = list(self.events)
+            for tid, name in self.threads.items():
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}})
+
+        with open(self.path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+
+    def hold(self):
+        with self.lock:
+            self.holds += 1
+
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            done = self.holds == 0
+
+        if done:
+            self.write()
+
+
+    def release(self):
+        with self.lock:
+            self.holds -= 1
+            done = self.closed and self.holds == 0
+
+        if done:
+            self.write()
+
+
+    def write(self):
+        try:
+            self.save()
+            print(f"SEUT: Export trace written to '{self.path}'.")
+        except OSError as e:
+            print(f"SEUT: Export trace could not be written: {e}")
+
+
+def is_trace_enabled() -> bool:
+    if os.environ.get('SEUT_TRACE', "") not in ["", "0"]:
+        return True
+
+    try:
+        return get_preferences().export_trace
+    except Exception:
+        return False
+
+
+@contextmanager
+def trace_session(path: str):
+    """Records all spans within the block and writes them to the path once they and the jobs holding the trace are done.
+    Does nothing if a session is already running or tracing is disabled."""
+
+    global current
+
+    if current is not None or not is_trace_enabled():
+        yield
+        return
+
+    current = ExportTrace(path)
+    try:
+        yield
+    finally:
+        trace = current
+        current = None
+        trace.close()
+
+
+def get_trace() -> ExportTrace:
+    """Returns the trace of the running session, None if there is none."""
+
+    return current
+
+
+def hold_trace(trace: ExportTrace, future):
+    """Keeps the trace from being written until the Future is done, e.g. that of an MWM Builder run the export of the next scene does not wait for."""
+
+    if trace is None:
+        return
+
+    trace.hold()
+    future.add_done_callback(lambda future: trace.release())
+
+
+@contextmanager
+def use_trace(trace: ExportTrace):
+    """Records the spans of the block on this thread into the trace instead of that of the running session."""
+
+    previous = getattr(thread_trace, 'value', NO_TRACE)
+    thread_trace.value = trace
+    try:
+        yield
+    finally:
+        thread_trace.value = previous
+
+
+@contextmanager
+def trace_span(name: str, category: str = 'export', **args):
+    """Records the duration of the block. Yields a dict that further args, e.g. results, can be added to."""
+
+    trace = getattr(thread_trace, 'value', NO_TRACE)
+    if trace is NO_TRACE:
+        trace = current
+
+    if trace is None:
+        yield args
+        return
+
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        trace.add_span(name, category, start, time.perf_counter(), args)
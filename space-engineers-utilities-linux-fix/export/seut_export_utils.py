@@ -8,21 +8,25 @@ import xml.etree.ElementTree as ET
 import xml.dom.minidom
 
 from os.path                                import join
+from contextlib                             import contextmanager
 from mathutils                              import Matrix
 from bpy_extras.io_utils                    import axis_conversion, ExportHelper
 
-from ..importing.seut_ot_import             import import_fbx
-from ..materials.seut_ot_remap_materials    import remap_materials
-from ..utils.seut_tool_utils                import get_tool_dir
+from ..utils.seut_tool_utils                import get_tool_dir, ToolAbortedError, TOOL_ABORTED
+from ..utils.seut_tool_runner               import get_tool_runner
 from ..seut_collections                     import get_collections, get_rev_ref_cols
 from ..seut_utils                           import *
 from ..seut_errors                          import seut_report, get_abs_path
-from .seut_custom_fbx_exporter              import save_single
+from .seut_custom_fbx_exporter              import save_single, use_material_wrappers, use_geometry_cache, ExportMaterialWrapper
+from .seut_custom_fbx_exporter              import finish_fbx_write, pop_fbx_writes
 from .seut_export_transparent_mat           import export_transparent_mat
 from .seut_export_texture                   import export_material_textures
+from .seut_export_cache                     import check_collection_cache
+from .seut_export_steps                     import wait_for
+from .seut_export_trace                     import trace_span
 
 
-def export_xml(self, context, collection) -> str:
+def export_xml(self, context, export_context, collection) -> str:
     """Exports the XML definition for a collection"""
 
     scene = context.scene
@@ -30,7 +34,7 @@ def export_xml(self, context, collection) -> str:
 
     # Create XML tree and add initial parameters.
     model = ET.Element('Model')
-    model.set('Name', scene.seut.subtypeId)
+    model.set('Name', export_context.subtype_id)
 
     if scene.seut.sceneType not in ['character', 'character_animation']:
         add_subelement(model, 'RescaleFactor', '1.0')
@@ -43,11 +47,11 @@ def export_xml(self, context, collection) -> str:
     if scene.seut.sceneType in ['character', 'character_animation'] and scene.seut.rotate_character:
         add_subelement(model, 'RotationY', '180')
 
-    path = get_abs_path(scene.seut.export_exportPath)
+    path = export_context.export_path
 
     # Write local materials as material entries into XML, write library materials as matrefs into XML
     used_materials = []
-    for obj in collection.objects:
+    for obj in get_export_objects(collection):
         if obj.type != 'MESH':
             continue
         for slot in obj.material_slots:
@@ -121,12 +125,12 @@ def export_xml(self, context, collection) -> str:
             cols = get_rev_ref_cols(collections, collection, 'lod')
             for col in cols:
                 if len(col.objects) > 0:
-                    create_lod_entry(model, col.seut.lod_distance, path, get_col_filename(col))
+                    create_lod_entry(model, col.seut.lod_distance, path, get_col_filename(col, export_context.subtype_id))
 
     # Create file with subtypename + collection name and write string to it
     xml_formatted = format_xml(self, context, model)
 
-    path = os.path.join(path, f"{get_col_filename(collection)}.xml")
+    path = os.path.join(path, f"{get_col_filename(collection, export_context.subtype_id)}.xml")
     os.makedirs(os.path.dirname(path), exist_ok=True)
     exported_xml = open(path, "w")
     exported_xml.write(xml_formatted)
@@ -134,8 +138,8 @@ def export_xml(self, context, collection) -> str:
     return {'FINISHED'}
 
 
-def get_col_filename(collection: object) -> str:
-    """Returns the correct filename for a given collection."""
+def get_col_filename(collection: object, subtype_id: str = None) -> str:
+    """Returns the correct filename for a given collection. Uses the SubtypeId of its scene unless another is passed."""
 
     schema = {
         'main': "{subtypeId}",
@@ -144,7 +148,7 @@ def get_col_filename(collection: object) -> str:
         'lod': "{ref_col_name}_LOD{type_index}"
     }
 
-    subtypeId = collection.seut.scene.seut.subtypeId
+    subtypeId = collection.seut.scene.seut.subtypeId if subtype_id is None else subtype_id
     type_index = collection.seut.type_index
 
     ref_col_name = ""
@@ -260,13 +264,50 @@ def format_xml(self, context, tree) -> str:
     return xml_string.toprettyxml()
 
 
-def export_fbx(self, context, collection, path_override = None) -> str:
+@contextmanager
+def compensate_bone_parent_drift(context, objects, primary_bone_axis='X', secondary_bone_axis='Y'):
+    """Temporarily moves objects parented to bones so they end up in the right place in the FBX.
+    The FBX exporter writes them relative to the bone with its axes converted to the primary and secondary bone axis, but does not convert their own transforms to match.
+    This would cause empties to drift when the model is loaded."""
+
+    if (primary_bone_axis, secondary_bone_axis) == ('Y', 'X'):
+        yield
+        return
+
+    correction_inv = axis_conversion(from_forward=secondary_bone_axis, from_up=primary_bone_axis, to_forward='X', to_up='Y').to_4x4().inverted()
+
+    originals = {}
+    for obj in objects:
+        if obj.parent is None or obj.parent_type != 'BONE' or obj.parent.type != 'ARMATURE' or obj.parent_bone not in obj.parent.data.bones:
+            continue
+
+        # Blender's bone parenting is relative to the tail of the bone, FBX's to its head.
+        bone = obj.parent.data.bones[obj.parent_bone]
+        to_tail = Matrix.Translation((0.0, (bone.tail_local - bone.head_local).length, 0.0))
+
+        originals[obj] = obj.matrix_basis.copy()
+        obj.matrix_local = to_tail.inverted() @ correction_inv @ to_tail @ obj.matrix_local
+
+    if originals != {}:
+        context.view_layer.update()
+
+    try:
+        yield
+
+    finally:
+        for obj, matrix in originals.items():
+            obj.matrix_basis = matrix
+
+        if originals != {}:
+            context.view_layer.update()
+
+
+def export_fbx(self, context, export_context, collection, path_override = None) -> str:
     """Exports the FBX file for a defined collection"""
 
     scene = context.scene
-    collections = get_collections(scene)
 
-    path = get_abs_path(scene.seut.export_exportPath)
+    path = export_context.export_path
 
     # Export exports the active layer_collection so the collection's layer_collection needs to be set as the active one
     try:
@@ -276,31 +317,14 @@ def export_fbx(self, context, collection, path_override = None) -> str:
     layer_collection = bpy.context.view_layer.layer_collection.children[collection.name]
     bpy.context.view_layer.active_layer_collection = layer_collection
 
-    # Error prevention with weight painting in character scenes
-    if scene.seut.sceneType == 'character':
-        for obj in collection.objects:
-            if obj.type != 'MESH':
-                continue
-            if obj is None or obj.data is None or obj.data.vertices is None or len(obj.data.vertices) <= 0:
-                continue
-            for v in obj.data.vertices:
-                for g in v.groups:
-                    g.weight = min(g.weight, 1)
+    # Weights of character meshes have already been clamped by check_weights.
 
-    # Prepare empties for export
-    for empty in collection.objects:
-        if empty is not None and empty.type == 'EMPTY':
+    # Subpart instances are left as they are, only the empties referencing the subparts are exported.
+    objects = get_export_objects(collection)
+    prepare_empties(context, export_context, collection)
 
-            # Remove numbers
-            # To ensure they work ingame (where duplicate names are no issue) this will remove the ".001" etc. from the name (and cause another empty to get this numbering)
-            if re.search("\.[0-9]{3}", empty.name[-4:]) != None and not empty.seut.linked:
-                if empty.name[:-4] in bpy.data.objects:
-                    temp_obj = bpy.data.objects[empty.name[:-4]]
-                    temp_obj.name = f"{empty.name} TEMP"
-                    empty.name = empty.name[:-4]
-                    temp_obj.name = temp_obj.name[:-len(" TEMP")]
-                else:
-                    empty.name = empty.name[:-4]
+    for empty in objects:
+        if empty is not None and empty.type == 'EMPTY':
 
             # Check parenting
             if empty.parent is None and not empty.seut.linked:
@@ -310,53 +334,26 @@ def export_fbx(self, context, collection, path_override = None) -> str:
 
             # Additional parenting checks
             if 'highlight' in empty:
-                if len(empty.seut.highlight_objects) > 0:
-
-                    highlights = ""
-                    for entry in empty.seut.highlight_objects:
-                        if not empty is None and not entry.obj is None:
-                            if empty.parent is not None and entry.obj.parent is not None and empty.parent != entry.obj.parent:
-                                seut_report(self, context, 'WARNING', True, 'W007', empty.name, entry.obj.name)
-
-                            if highlights == "":
-                                highlights = entry.obj.name
-                            else:
-                                highlights = highlights + ';' + entry.obj.name
-
-                    empty['highlight'] = highlights
+                for entry in empty.seut.highlight_objects:
+                    if not entry.obj is None:
+                        if empty.parent is not None and entry.obj.parent is not None and empty.parent != entry.obj.parent:
+                            seut_report(self, context, 'WARNING', True, 'W007', empty.name, entry.obj.name)
 
             elif 'file' in empty and empty.seut.linkedScene is not None:
                 linked_scene = empty.seut.linkedScene
                 if linked_scene.seut.export_largeGrid != scene.seut.export_largeGrid or linked_scene.seut.export_smallGrid != scene.seut.export_smallGrid:
                     seut_report(self, context, 'WARNING', True, 'W001', linked_scene.name, scene.name)
 
-                # Remove subpart instances
-                reference = get_subpart_reference(empty, collections)
-                reference = correct_for_export_type(scene, reference)
-                empty['file'] = reference
-                unlink_subpart_scene(empty)
-
-            # Resetting empty size
-            if empty.empty_display_size == 1.0:
-                empty.empty_display_size = 0.5
-                if 'highlight' in empty:
-                    empty.scale.x *= 1.5
-                    empty.scale.y *= 1.5
-                    empty.scale.z *= 1.5
-                    context.view_layer.update()
-
-    # Prepare materials for export
-    for mat in bpy.data.materials:
-        if mat is not None and mat.node_tree is not None:
-            prepare_mat_for_export(self, context, mat)
-
     # Export the collection to FBX
     if path_override is None:
-        path = os.path.join(path, f"{get_col_filename(collection)}.fbx")
+        path = os.path.join(path, f"{get_col_filename(collection, export_context.subtype_id)}.fbx")
     else:
         path = path_override
     try:
-        export_to_fbxfile(ExportSettings(scene, context.evaluated_depsgraph_get()), scene, path, collection.objects, ishavokfbxfile=False)
+        with export_material_session(), use_material_wrappers(get_export_materials(self, context, objects)), \
+            compensate_bone_parent_drift(context, objects if scene.seut.sceneType == 'character' else []):
+            settings = ExportSettings(scene, context.evaluated_depsgraph_get(), rescale_factor=export_context.rescale_factor)
+            export_to_fbxfile(settings, scene, path, objects, ishavokfbxfile=False)
 
     except RuntimeError as error:
         seut_report(self, context, 'ERROR', False, 'E017')
@@ -364,25 +361,69 @@ def export_fbx(self, context, collection, path_override = None) -> str:
     except KeyError as error:
         seut_report(self, context, 'ERROR', True, 'E038', error)
 
-    # Revert materials back to original form
-    for mat in bpy.data.materials:
-        if mat is not None and mat.node_tree is not None:
-            revert_mat_after_export(self, context, mat)
+    bpy.context.scene.collection.children.unlink(collection)
+
+    return {'FINISHED'}
+
+
+def prepare_empties(context, export_context, collection):
+    """Prepares the empties of a collection for export to the export context's files.
+    This changes the empties themselves, so it must happen before the collection's fingerprint is taken.
+    The subpart references are corrected for the grid size, see keep_subpart_references."""
+
+    scene = context.scene
+    collections = get_collections(scene)
 
-    # Relink all subparts to empties
-    for empty in collection.objects:
+    for empty in get_export_objects(collection):
         if empty is not None and empty.type == 'EMPTY':
 
-            if scene.seut.linkSubpartInstances:
-                if 'file' in empty and empty.seut.linkedScene is not None and empty.seut.linkedScene.name in bpy.data.scenes:
-                    reference = get_subpart_reference(empty, collections)
+            # Remove numbers
+            # To ensure they work ingame (where duplicate names are no issue) this will remove the ".001" etc. from the name (and cause another empty to get this numbering)
+            if re.search("\.[0-9]{3}", empty.name[-4:]) != None and not empty.seut.linked:
+                if empty.name[:-4] in bpy.data.objects:
+                    temp_obj = bpy.data.objects[empty.name[:-4]]
+                    temp_obj.name = f"{empty.name} TEMP"
+                    empty.name = empty.name[:-4]
+                    temp_obj.name = temp_obj.name[:-len(" TEMP")]
+                else:
+                    empty.name = empty.name[:-4]
 
-                    link_subpart_scene(self, scene, empty, empty.users_collection[0])
-                    empty['file'] = reference
+            if 'highlight' in empty:
+                if len(empty.seut.highlight_objects) > 0:
+                    highlights = [entry.obj.name for entry in empty.seut.highlight_objects if entry.obj is not None]
+                    empty['highlight'] = ';'.join(highlights)
 
-    bpy.context.scene.collection.children.unlink(collection)
+            elif 'file' in empty and empty.seut.linkedScene is not None:
+                reference = get_subpart_reference(empty, collections)
+                reference = correct_for_export_type(scene, reference, export_context.grid_scale)
+                empty['file'] = reference
 
-    return {'FINISHED'}
+            # Resetting empty size
+            if empty.empty_display_size == 1.0:
+                empty.empty_display_size = 0.5
+                if 'highlight' in empty:
+                    empty.scale.x *= 1.5
+                    empty.scale.y *= 1.5
+                    empty.scale.z *= 1.5
+                    context.view_layer.update()
+
+
+@contextmanager
+def keep_subpart_references(scene):
+    """Restores the subpart references of the scene's empties after prepare_empties has corrected them for each grid size
+    within the block, so the small grid reference of one pass is neither saved nor taken as input for the next export."""
+
+    originals = {obj: obj['file'] for obj in scene.objects if obj.type == 'EMPTY' and 'file' in obj}
+
+    try:
+        yield
+
+    finally:
+        for obj, reference in originals.items():
+            try:
+                obj['file'] = reference
+            except ReferenceError:
+                pass
 
 
 def get_subpart_reference(empty, collections: dict) -> str:
@@ -398,10 +439,13 @@ def get_subpart_reference(empty, collections: dict) -> str:
     return empty.seut.linkedScene.seut.subtypeId
 
 
-def correct_for_export_type(scene, reference: str) -> str:
-    """Corrects reference depending on export type (large / small) selected."""
+def correct_for_export_type(scene, reference: str, grid_scale: str = None) -> str:
+    """Corrects reference depending on export type (large / small) selected. Uses the grid scale of the scene unless another is passed."""
 
-    if scene.seut.gridScale == 'large':
+    if grid_scale is None:
+        grid_scale = scene.seut.gridScale
+
+    if grid_scale == 'large':
         if reference.startswith("LG_") or reference.find("_LG_") != -1 or reference.endswith("_LG"):
             pass
 
@@ -416,7 +460,7 @@ def correct_for_export_type(scene, reference: str) -> str:
         elif scene.seut.export_largeGrid and scene.seut.export_smallGrid:
             reference = "LG_" + reference
 
-    elif scene.seut.gridScale == 'small':
+    elif grid_scale == 'small':
         if reference.startswith("SG_") or reference.find("_SG_") != -1 or reference.endswith("_SG"):
             pass
 
@@ -434,132 +478,120 @@ def correct_for_export_type(scene, reference: str) -> str:
     return reference
 
 
-def prepare_mat_for_export(self, context, material):
-    """Switches material around so that SE can properly read it"""
+class ExportContext:
+    """The SubtypeId, grid scale, rescale factor and export path a scene is exported with for one grid size.
+    The export reads them from here instead of the scene, so the scene's properties and their update callbacks are left alone."""
 
-    if material.library:
+    def __init__(self, scene, grid_size: str):
+        self.scene = scene
+        self.orig_grid_scale = scene.seut.gridScale
+        self.grid_scale = grid_size
+        self.subtype_id = correct_for_export_type(scene, scene.seut.subtypeId, grid_size)
 
-        # If the material is a library and not used, remove it.
-        if material.users < 1:
-            bpy.data.materials.remove(material)
-            return
+        path = scene.seut.export_exportPath
+
+        if grid_size == 'large':
+            if self.orig_grid_scale == 'small':
+                self.rescale_factor = 3.0 if scene.seut.export_medium_grid else 5.0
+            else:
+                self.rescale_factor = 1.0
+
+            if path.find("\\small\\") != -1 or path.endswith("\\small"):
+                path = path.replace("\\small\\", "\\large\\")
+                path = path.replace("\\small", "\\large")
+
+        else:
+            if self.orig_grid_scale == 'large':
+                self.rescale_factor = 0.6 if scene.seut.export_medium_grid else 0.2
+            else:
+                self.rescale_factor = 1.0
+
+            if path.find("\\large\\") != -1 or path.endswith("\\large"):
+                path = path.replace("\\large\\", "\\small\\")
+                path = path.replace("\\large", "\\small")
+
+        self.export_path = get_abs_path(path)
+
+        # State of the incremental export cache, see seut_export_cache.
+        self.pending = {}
+        self.skipped = set()
+
+        # HKT conversions running in the background, see export_hkt.
+        self.havok_jobs = []
+
+
+material_session = None
 
-        # If the material has a local version: Remap library to local if local has asset, else remap local to linked.
-        for mat in bpy.data.materials:
-            if mat.name == material.name and mat.library is None:
-                if mat.asset_data is not None:
-                    material.user_remap(mat)
-                    bpy.data.materials.remove(material)
-                else:
-                    mat.user_remap(material)
-                    bpy.data.materials.remove(mat)
-                break
-
-        material = material.override_create(remap_local_usages=True)
-
-    # See if relevant nodes already exist
-    dummy_shader_node = None
-    dummy_image_node = None
-    dummy_image = None
-    material_output = None
-    normal_map = None
-
-    for node in material.node_tree.nodes:
-        if node.type == 'BSDF_PRINCIPLED' and node.name == 'EXPORT_DUMMY':
-            dummy_shader_node = node
-        elif node.type == 'TEX_IMAGE' and node.name == 'DUMMY_IMAGE':
-            dummy_image_node = node
-        elif node.type == 'OUTPUT_MATERIAL':
-            material_output = node
-        elif node.type == 'NORMAL_MAP':
-            normal_map = node
-
-    # Iterate through images to find the dummy image
-    for img in bpy.data.images:
-        if img.name == 'DUMMY':
-            dummy_image = img
-
-    # If it doesn't exist, create it and a DUMMY image node, and link them up
-    if dummy_image_node is None:
-        dummy_image_node = material.node_tree.nodes.new('ShaderNodeTexImage')
-        dummy_image_node.name = 'DUMMY_IMAGE'
-        dummy_image_node.label = 'DUMMY_IMAGE'
 
+@contextmanager
+def export_material_session():
+    """Keeps the material stand-ins built within the block for all FBX exports in it. Does nothing if a session is already running."""
+
+    global material_session
+
+    if material_session is not None:
+        yield
+        return
+
+    material_session = {}
+    try:
+        yield
+    finally:
+        material_session = None
+
+
+def get_export_materials(self, context, objects) -> dict:
+    """Returns the stand-ins the materials used by the objects are exported as, building those not yet built in the current session."""
+
+    dummy_image = bpy.data.images.get('DUMMY')
     if dummy_image is None:
         dummy_image = bpy.data.images.new('DUMMY', 1, 1)
 
-    if normal_map is None:
-        normal_map = material.node_tree.nodes.new('ShaderNodeNormalMap')
-        normal_map.name = 'NORMAL_MAP_DUMMY'
+    wrappers = {}
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
 
-    if dummy_shader_node is None:
-        dummy_shader_node = material.node_tree.nodes.new('ShaderNodeBsdfPrincipled')
-        dummy_shader_node.name = 'EXPORT_DUMMY'
-        dummy_shader_node.label = 'EXPORT_DUMMY'
+        for slot in obj.material_slots:
+            material = slot.material
+            if material is None or material.node_tree is None or material in wrappers:
+                continue
 
-    if material_output is None:
-        material_output = material.node_tree.nodes.new('ShaderNodeOutputMaterial')
-        material.seut.nodeLinkedToOutputName = ""
+            wrapper = material_session.get(material) if material_session is not None else None
+            if wrapper is None:
+                for node in material.node_tree.nodes:
+                    if node.type == 'OUTPUT_MATERIAL' and not node.inputs[0].is_linked:
+                        seut_report(self, context, 'INFO', False, 'I005', material.name)
+                        break
 
-    # This allows the reestablishment of connections after the export is complete.
-    else:
-        try:
-            material.seut.nodeLinkedToOutputName = material_output.inputs[0].links[0].from_node.name
-        except IndexError:
-            seut_report(self, context, 'INFO', False, 'I005', material.name)
-
-    # link nodes, add image to node
-    material.node_tree.links.new(dummy_image_node.outputs[0], dummy_shader_node.inputs[0])
-    material.node_tree.links.new(dummy_shader_node.outputs[0], material_output.inputs[0])
-    material.node_tree.links.new(normal_map.outputs['Normal'], dummy_shader_node.inputs['Normal'])
-    dummy_image_node.image = dummy_image
-
-
-def revert_mat_after_export(self, context, material):
-    """Removes the dummy nodes from the material again after export"""
-
-    material_output = None
-    node_linked_to_output = None
-
-    # Remove dummy nodes - do I need to remove the links too?
-    # Image can stay, it's 1x1 px so nbd
-    for node in material.node_tree.nodes:
-        if node.type == 'TEX_IMAGE' and node.name == 'DUMMY_IMAGE':
-            material.node_tree.nodes.remove(node)
-        elif node.type == 'BSDF_PRINCIPLED' and node.name == 'EXPORT_DUMMY':
-            material.node_tree.nodes.remove(node)
-        elif node.type == 'NORMAL_MAP' and node.name == 'NORMAL_MAP_DUMMY':
-            material.node_tree.nodes.remove(node)
-        elif node.type == 'OUTPUT_MATERIAL':
-            material_output = node
-        elif node.name == material.seut.nodeLinkedToOutputName:
-            node_linked_to_output = node
-
-    # link the node group back to output
-    if node_linked_to_output is not None:
-        try:
-            material.node_tree.links.new(node_linked_to_output.outputs[0], material_output.inputs[0])
-        except IndexError:
-            seut_report(self, context, 'INFO', False, 'I005', material.name)
+                wrapper = ExportMaterialWrapper(material, dummy_image)
+                if material_session is not None:
+                    material_session[material] = wrapper
+
+            wrappers[material] = wrapper
 
-    if material.override_library is not None:
-        material.override_library.destroy()
+    return wrappers
 
 
 vanilla_bones = ['SE_RigPelvis', 'SE_RigLThigh', 'SE_RigLCalf', 'SE_RigLFoot', 'SE_RigLR_Foot_tip1', 'SE_RigSpine1', 'SE_RigSpine2', 'SE_RigSpine3', 'SE_RigSpine4', 'SE_RigRibcage', 'SE_RigNeck', 'SE_RigHead', 'SE_RigHelmetGlassBone', 'SE_RigL_Eye', 'SE_RigL_EyeLidUpper', 'SE_RigL_EyeLidLower', 'SE_RigR_Eye', 'SE_RigR_EyeLidUpper', 'SE_RigR_EyeLidLower', 'SE_RigLCollarbone', 'SE_RigLUpperarm', 'SE_RigLForearm1', 'SE_RigLForearm2', 'SE_RigLForearm3', 'SE_RigLPalm', 'SE_RigL_Thumb_1', 'SE_RigL_Thumb_2', 'SE_RigL_Thumb_3', 'SE_RigL_Index_1', 'SE_RigL_Index_2', 'SE_RigL_Index_3', 'SE_RigL_Middle_1', 'SE_RigL_Middle_2', 'SE_RigL_Middle_3', 'SE_RigL_Ring_1', 'SE_RigL_Ring_2', 'SE_RigL_Ring_3', 'SE_RigL_Little_1', 'SE_RigL_Little_2', 'SE_RigL_Little_3', 'SE_RigRCollarbone', 'SE_RigRUpperarm', 'SE_RigRForearm1', 'SE_RigRForearm2', 'SE_RigRForearm3', 'SE_RigRPalm', 'SE_RigR_Thumb_1', 'SE_RigR_Thumb_2', 'SE_RigR_Thumb_3', 'SE_RigR_Index_1', 'SE_RigR_Index_2', 'SE_RigR_Index_3', 'SE_RigR_Middle_1', 'SE_RigR_Middle_2', 'SE_RigR_Middle_3', 'SE_RigR_Ring_1', 'SE_RigR_Ring_2', 'SE_RigR_Ring_3', 'SE_RigR_Little_1', 'SE_RigR_Little_2', 'SE_RigR_Little_3', 'SE_RigRibcageBone001', 'SE_RigRThigh', 'SE_RigRCalf', 'SE_RigRFoot', 'SE_RigRR_Foot_tip1', 'SE_RigL_Weapon_pin', 'SE_RigR_Weapon_pin']
 
 
-def export_collection(self, context, collection):
-    """Exports the collection to XML and FBX"""
+def export_collection(self, context, export_contexts: list, collection) -> list:
+    """Exports the collection to XML and FBX once per export context. Their FBX files share the extracted geometry."""
 
-    print(f"\n------------------------------ Exporting Collection '{collection.name}'.")
-    result_xml = export_xml(self, context, collection)
-    result_fbx = export_fbx(self, context, collection)
+    targets = []
+    for export_context in export_contexts:
+        prepare_empties(context, export_context, collection)
+        if check_collection_cache(context, export_context, collection, get_col_filename(collection, export_context.subtype_id)):
+            print(f"\n------------------------------ Skipping Collection '{collection.name}' ({export_context.grid_scale}): Unchanged since last export.")
+        else:
+            targets.append(export_context)
 
-    # This is insane, yes, but it seems to be the only viable solution to mitigate empty drift on export.
-    if context.scene.seut.sceneType == 'character':
+    if targets == []:
+        return [{'FINISHED'}]
 
-        # Displays warning if non-vanilla bone names are detected
+    # Displays warning if non-vanilla bone names are detected
+    if context.scene.seut.sceneType == 'character':
         non_vanilla_bones = []
         for obj in context.scene.objects:
             if obj.type != 'ARMATURE':
@@ -571,57 +603,22 @@ def export_collection(self, context, collection):
 
             if obj.scale == (1.0, 1.0, 1.0):
                 seut_report(self, context, 'ERROR', False, 'E052')
-                return {'CANCELLED'}
+                return [{'CANCELLED'}]
 
         if len(non_vanilla_bones) > 0:
             seut_report(self, context, 'WARNING', False, 'W018', str(non_vanilla_bones))
 
-        current_scn = context.scene
-        bpy.ops.scene.new(type='FULL_COPY')
-        temp_scn = bpy.context.scene
-
-        context.window.scene = temp_scn
-        temp_scn.seut.subtypeId = current_scn.name + "_tmp"
-        collections = get_collections(temp_scn)
-
-        for obj in temp_scn.objects:
-            bpy.data.objects.remove(obj)
-
-        for col in collections[collection.seut.col_type]:
-            if col.seut.type_index == collection.seut.type_index:
-                corr_col = col
-                break
-
-        filepath = f"{os.path.join(get_abs_path(temp_scn.seut.export_exportPath), get_col_filename(collection)) + '.fbx'}"
-
-        bpy.context.view_layer.active_layer_collection = temp_scn.view_layers['SEUT'].layer_collection.children[collections['seut'][0].name].children[corr_col.name]
-        import_fbx(self, context, filepath)
-        remap_materials(self, bpy.context)
-
-        for obj in collections['seut'][0].objects:
-            corr_col.objects.link(obj)
-            collections['seut'][0].objects.unlink(obj)
-
-        result_fbx = export_fbx(self, context, corr_col, filepath)
-
-        context.window.scene = current_scn
-
-        for col in bpy.data.collections:
-            if col.seut.scene == temp_scn:
-                bpy.data.collections.remove(col)
+    results = []
+    with use_geometry_cache():
+        for export_context in targets:
+            print(f"\n------------------------------ Exporting Collection '{collection.name}' ({export_context.grid_scale}).")
+            with trace_span("Collection", scene=context.scene.name, collection=collection.name, subtype_id=export_context.subtype_id):
+                results.append(export_xml(self, context, export_context, collection))
+                results.append(export_fbx(self, context, export_context, collection))
 
-        for obj in bpy.data.objects:
-            if obj.users < 1:
-                bpy.data.objects.remove(obj)
+            print(f"------------------------------ Finished exporting Collection '{collection.name}' ({export_context.grid_scale}).\n")
 
-            elif re.search("\.[0-9]{3}", obj.name[-4:]) != None and obj.name[:-4] not in bpy.data.objects:
-                obj.name = obj.name[:-4]
-
-        bpy.data.scenes.remove(temp_scn)
-
-    print(f"------------------------------ Finished exporting Collection '{collection.name}'.\n")
-
-    return result_xml, result_fbx
+    return results
 
 
 def convert_position_to_cell(context, grid_size, empty) -> list:
@@ -689,25 +686,29 @@ def tool_path(propertyName, displayName, toolPath=None):
 # STOLLIE: Called by other methods to write to a log file when an errors occur.
 def write_to_log(logfile, content, cmdline=None, cwd=None, loglines=[]):
     with open(logfile, 'wb') as log: # wb params here represent writing/create file and binary mode.
-        if cwd:
-            str = "Running from: %s \n" % (cwd)
-            log.write(str.encode('utf-8'))
+        write_log_header(log, cmdline=cmdline, cwd=cwd, loglines=loglines)
+        log.write(content)
 
-        if cmdline:
-            str = "Command: %s \n" % (" ".join(cmdline))
-            log.write(str.encode('utf-8'))
 
-        for line in loglines:
-            log.write(line.encode('utf-8'))
-            log.write(b"\n")
+def write_log_header(log, cmdline=None, cwd=None, loglines=[]):
+    if cwd:
+        str = "Running from: %s \n" % (cwd)
+        log.write(str.encode('utf-8'))
 
-        log.write(content)
+    if cmdline:
+        str = "Command: %s \n" % (" ".join(cmdline))
+        log.write(str.encode('utf-8'))
+
+    for line in loglines:
+        log.write(line.encode('utf-8'))
+        log.write(b"\n")
 
 
 class ExportSettings:
-    def __init__(self, scene, depsgraph, mwmDir=None):
+    def __init__(self, scene, depsgraph, mwmDir=None, rescale_factor=None):
         self.scene = scene # ObjectSource.getObjects() uses .utils.scene() instead
         self.depsgraph = depsgraph
+        self.rescale_factor = scene.seut.export_rescaleFactor if rescale_factor is None else rescale_factor
         self.operator = STDOUT_OPERATOR
         self.isLogToolOutput = True
 
@@ -735,61 +736,91 @@ class ExportSettings:
             self._mwmbuilder = tool_path('mwmb_path', 'MWM Builder')
         return self._mwmbuilder
 
-    def callTool(self, context, cmdline, tooltype, logfile=None, cwd=None, successfulExitCodes=[0], loglines=[], logtextInspector=None):
-        # check if the tool ends with .exe, if it does run it with wine
-        if cmdline[0].endswith('.exe'):
-            print(f"SEUT: Running Windows tool with Wine: {cmdline[0]}")
-            cmdline = ["wine"] + cmdline
-
-            itterator = 2
-            while itterator < len(cmdline):
-                if cmdline[itterator].startswith('/home'):
-                    cmdline[itterator] = linux_path_to_wine_path(cmdline[itterator])
-                itterator += 1
-
-        try:
-            out = subprocess.check_output(cmdline, cwd=cwd, stderr=subprocess.STDOUT, shell=False)
-            if self.isLogToolOutput and logfile:
-                write_to_log(logfile, out, cmdline=cmdline, cwd=cwd, loglines=loglines)
-            if logtextInspector is not None:
-                logtextInspector(out)
-
-            out_str = out.decode("utf-8", "ignore")
-            if out_str.find(": ERROR:") != -1:
-                if out_str.find("Assimp.AssimpException: Error loading unmanaged library from path: Assimp32.dll") != -1:
-                    seut_report(self, context, 'ERROR', False, 'E039')
-                    return False
-
-                elif out_str.find("System.ArgumentOutOfRangeException: Index was out of range. Must be non-negative and less than the size of the collection.") != -1:
-                    # Use cross-platform path separator
-                    models_path: str = f"{os.sep}Models{os.sep}"
-                    temp_string = out_str[out_str.find(models_path) + len(models_path):]
-                    temp_string = temp_string[:temp_string.find(".fbx")]
-                    seut_report(self, context, 'ERROR', False, 'E043', temp_string + ".fbx")
-                    return False
-
-                else:
-                    seut_report(self, context, 'ERROR', False, 'E044')
-                    return False
-
-            return True
+    def runTool(self, cmdline, logfile=None, cwd=None, loglines=[], fatalPatterns=None, lineHandler=None):
+        """Runs the tool and writes its output to the logfile and passes it to the lineHandler as it arrives. If a line of the
+        output contains one of the fatal patterns, the tool is stopped right away and TOOL_ABORTED is returned as its exit code.
+        Does not access Blender data, so it is safe to call from a worker thread."""
+
+        with trace_span(os.path.basename(cmdline[0]), category='tool', logfile=logfile) as span:
+            log = None
+            try:
+                if self.isLogToolOutput and logfile:
+                    log = open(logfile, 'wb') # wb params here represent writing/create file and binary mode.
+
+                def write_header(cmdline):
+                    if log is not None:
+                        write_log_header(log, cmdline=cmdline, cwd=cwd, loglines=loglines)
+
+                # The runner decides how the tool is run, e.g. with Wine, see seut_tool_runner.
+                out, cmdline = get_tool_runner().run(cmdline, cwd=cwd, log=log, fatal_patterns=fatalPatterns, on_line=lineHandler, on_start=write_header)
+                returncode = 0
+            except ToolAbortedError as e:
+                print(f"SEUT: Tool was stopped after it reported: {e.line}")
+                out = e.output
+                returncode = TOOL_ABORTED
+                cmdline = e.cmd
+            except subprocess.CalledProcessError as e:
+                out = e.output
+                returncode = e.returncode
+                cmdline = e.cmd
+            finally:
+                if log is not None:
+                    log.close()
+
+            span['exit_code'] = returncode
+
+        return returncode, out, cmdline
+
+    def checkToolResult(self, context, tooltype, returncode, out, cmdline, successfulExitCodes=[0], logtextInspector=None):
+        """Reports errors found in the result of a tool run. Must be called from the main thread."""
+
+        if returncode == TOOL_ABORTED:
+            if not self.reportToolErrors(context, out):
+                seut_report(self, context, 'ERROR', False, 'E058', str(tooltype))
+            return False
 
-        except subprocess.CalledProcessError as e:
-            if self.isLogToolOutput and logfile:
-                write_to_log(logfile, e.output, cmdline=cmdline, cwd=cwd, loglines=loglines)
-            if e.returncode not in successfulExitCodes:
-                if e.returncode == 4294967295:
+        if returncode != 0:
+            if returncode not in successfulExitCodes:
+                if returncode == 4294967295:
                     seut_report(self, context, 'ERROR', False, 'E037')
-                elif e.returncode == 3221225477:
+                elif returncode == 3221225477:
                     seut_report(self, context, 'ERROR', False, 'E047')
-                elif e.returncode == 3221225781:
+                elif returncode == 3221225781:
                     seut_report(self, context, 'ERROR', False, 'E050')
                 else:
                     seut_report(self, context, 'ERROR', False, 'E035', str(tooltype))
-                raise
+                raise subprocess.CalledProcessError(returncode, cmdline, output=out)
 
             return False
 
+        if logtextInspector is not None:
+            logtextInspector(out)
+
+        return not self.reportToolErrors(context, out)
+
+    def reportToolErrors(self, context, out) -> bool:
+        """Reports the errors a tool printed to its output. Returns True if there were any."""
+
+        out_str = out.decode("utf-8", "ignore")
+        if out_str.find(": ERROR:") != -1:
+            if out_str.find("Assimp.AssimpException: Error loading unmanaged library from path: Assimp32.dll") != -1:
+                seut_report(self, context, 'ERROR', False, 'E039')
+                return True
+
+            elif out_str.find("System.ArgumentOutOfRangeException: Index was out of range. Must be non-negative and less than the size of the collection.") != -1:
+                # Use cross-platform path separator
+                models_path: str = f"{os.sep}Models{os.sep}"
+                temp_string = out_str[out_str.find(models_path) + len(models_path):]
+                temp_string = temp_string[:temp_string.find(".fbx")]
+                seut_report(self, context, 'ERROR', False, 'E043', temp_string + ".fbx")
+                return True
+
+            else:
+                seut_report(self, context, 'ERROR', False, 'E044')
+                return True
+
+        return False
+
     def __getitem__(self, key): # makes all attributes available for parameter substitution
         if not type(key) is str or key.startswith('_'):
             raise KeyError(key)
@@ -899,17 +930,38 @@ def export_to_fbxfile(settings: ExportSettings, scene, filepath, objects, ishavo
     global_matrix = axis_conversion(to_forward=kwargs['axis_forward'], to_up=kwargs['axis_up']).to_4x4()
     scale = kwargs['global_scale']
 
-    scale *= scene.seut.export_rescaleFactor
+    scale *= settings.rescale_factor
 
     if abs(1.0-scale) >= 0.000001:
         global_matrix = Matrix.Scale(scale, 4) @ global_matrix
 
     kwargs['global_matrix'] = global_matrix
 
-    return save_single(
-        settings.operator,
-        settings.scene,
-        settings.depsgraph,
-        filepath=filepath,
-        **kwargs # Stores any number of Keyword Arguments into a dictionary called 'fbxSettings'.
-    )
\ No newline at end of file
+    with trace_span("FBX", category='fbx', file=os.path.basename(filepath), objects=len(objects), havok=ishavokfbxfile):
+        result = save_single(
+            settings.operator,
+            settings.scene,
+            settings.depsgraph,
+            filepath=filepath,
+            **kwargs # Stores any number of Keyword Arguments into a dictionary called 'fbxSettings'.
+        )
+
+    # The Havok tools read the file right away.
+    if ishavokfbxfile:
+        finish_fbx_write(filepath)
+
+    return result
+
+
+def wait_for_fbx_writes(self, context):
+    """Waits for the FBX files being written in the background. Yields while they are written."""
+
+    result = {'FINISHED'}
+    for path, future in pop_fbx_writes().items():
+        try:
+            yield from wait_for(future)
+        except Exception as error:
+            seut_report(self, context, 'ERROR', True, 'E057', path, error)
+            result = {'CANCELLED'}
+
+    return result
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+import re
+import json
+import time
+import threading
+
+
+# MwmBuilder logs one model after another. Each line mentioning an FBX file starts the record of the model it names; the
+# following lines up to the next model are attributed to it. Lines are timed as they arrive, as the log has no timestamps.
+
+FBX_PATTERN = re.compile(rb"([^\s'\"]+\.fbx)", re.IGNORECASE)
+MWM_PATTERN = re.compile(rb"([^\s'\"]+\.mwm)", re.IGNORECASE)
+TEXTURE_PATTERN = re.compile(rb"([^\s'\"]+\.(?:dds|png|tif|tiff|tga))", re.IGNORECASE)
+MATERIAL_PATTERN = re.compile(rb"material\s*:?\s*'?([^\s'\",]+)'?", re.IGNORECASE)
+
+MISSING_PATTERNS = [b"not found", b"missing", b"could not find", b"does not exist", b"not defined", b"undefined"]
+
+
+def get_model_name(path: bytes) -> str:
+    """Returns the name of a model from a path, which may be a Windows path."""
+
+    name = path.decode('utf-8', 'ignore').replace('\\', '/').split('/')[-1]
+    return os.path.splitext(name)[0]
+
+
+def get_level(line: bytes) -> str:
+    if b": ERROR:" in line or b"Exception" in line:
+        return 'error'
+    elif b"WARNING" in line:
+        return 'warning'
+
+    return 'info'
+
+
+class MwmbLogParser:
+    """Turns the output of an MwmBuilder run into a record per model. Lines can be fed from the thread running the tool."""
+
+    def __init__(self):
+        self.models = []
+        self.general = {'warnings': [], 'errors': []}
+        self.start = None
+        self.end = None
+        self.lock = threading.Lock()
+
+
+    def feed(self, line: bytes, timestamp: float = None):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        with self.lock:
+            if self.start is None:
+                self.start = timestamp
+            self.end = timestamp
+
+            fbx = FBX_PATTERN.search(line)
+            if fbx is not None:
+                name = get_model_name(fbx.group(1))
+                model = self.models[-1] if self.models != [] else None
+                if model is None or model['name'] != name:
+                    if model is not None:
+                        model['duration'] = round(timestamp - model['start'], 3)
+                    self.models.append(new_model_record(name, fbx.group(1).decode('utf-8', 'ignore'), timestamp))
+
+            self.add_line(line.decode('utf-8', 'ignore').strip(), line)
+
+
+    def add_line(self, text: str, line: bytes):
+        model = self.models[-1] if self.models != [] else None
+        target = model if model is not None else self.general
+        level = get_level(line)
+
+        if level == 'error':
+            target['errors'].append(text)
+        elif level == 'warning':
+            target['warnings'].append(text)
+
+        if model is None:
+            return
+
+        mwm = MWM_PATTERN.search(line)
+        if mwm is not None:
+            path = mwm.group(1).decode('utf-8', 'ignore')
+            if path not in model['outputs']:
+                model['outputs'].append(path)
+
+        if level != 'info' and any(p in line.lower() for p in MISSING_PATTERNS):
+            texture = TEXTURE_PATTERN.search(line)
+            material = MATERIAL_PATTERN.search(line)
+            if texture is not None:
+                add_unique(model['missing_textures'], texture.group(1).decode('utf-8', 'ignore'))
+            elif material is not None:
+                add_unique(model['missing_materials'], material.group(1).decode('utf-8', 'ignore'))
+
+
+    def get_result(self, fbx_path: str, mwm_path: str, expected: list = None) -> dict:
+        """Returns the records of all models. A model succeeded if it has no errors and its MWM exists in mwm_path.
+        Models in expected that MwmBuilder never got to are added as failed."""
+
+        with self.lock:
+            models = [dict(m) for m in self.models]
+            if models != [] and models[-1]['duration'] is None and self.end is not None:
+                models[-1]['duration'] = round(self.end - models[-1]['start'], 3)
+
+        names = [m['name'] for m in models]
+        for name in expected if expected is not None else []:
+            if name not in names:
+                models.append(new_model_record(name, None, None))
+                models[-1]['errors'].append("Not processed by MwmBuilder.")
+
+        for model in models:
+            model.pop('start')
+            fbx = os.path.join(fbx_path, f"{model['name']}.fbx")
+            model['fbx_size'] = os.path.getsize(fbx) if os.path.isfile(fbx) else None
+            model['success'] = model['errors'] == [] and os.path.isfile(os.path.join(mwm_path, f"{model['name']}.mwm"))
+
+        return {
+            'duration': round(self.end - self.start, 3) if self.start is not None else None,
+            'success': all(m['success'] for m in models) and self.general['errors'] == [],
+            'warnings': list(self.general['warnings']),
+            'errors': list(self.general['errors']),
+            'models': models,
+        }
+
+
+def new_model_record(name: str, fbx: str, start: float) -> dict:
+    return {
+        'name': name,
+        'fbx': fbx,
+        'start': start,
+        'duration': None,
+        'outputs': [],
+        'warnings': [],
+        'errors': [],
+        'missing_textures': [],
+        'missing_materials': [],
+    }
+
+
+def add_unique(entries: list, value):
+    if value not in entries:
+        entries.append(value)
+
+
+def write_mwmb_report(path: str, subtype_id: str, result: dict) -> str:
+    """Writes the parsed result of an MwmBuilder run as JSON beside the export. Returns the path of the file."""
+
+    report_path = os.path.join(path, f"{subtype_id}.mwm.json")
+    with open(report_path, 'w') as report_file:
+        json.dump(result, report_file, indent = 4)
+
+    return report_path
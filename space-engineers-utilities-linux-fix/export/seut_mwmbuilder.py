@@ -1,38 +1,279 @@
 import os
 import glob
+import threading
+import subprocess
+
+from concurrent.futures         import Future
 
 from .seut_export_utils         import ExportSettings
+from .seut_export_cache         import commit_export_cache, discard_export_cache
+from .seut_export_steps         import run_in_background
+from .seut_export_trace         import get_trace, hold_trace, use_trace
+from ..utils.seut_tool_utils    import get_tool_group, submit_group_task
+from .seut_mwmb_log             import MwmbLogParser, write_mwmb_report
 from ..utils.called_tool_type   import ToolType
-from ..seut_errors              import seut_report
+from ..seut_errors              import seut_report, get_abs_path
+
+
+# Lines after which MWM Builder cannot produce a valid MWM anymore. It is stopped right away instead of running to the end.
+MWMB_FATAL_PATTERNS = [
+    b": ERROR:",
+    b"FileNotFoundException",
+    b"DirectoryNotFoundException",
+    b"Could not find file",
+]
+
+class MwmBuildJob:
+    """A single MWM Builder invocation. Captures everything it needs from the scene so it can run after the export of the scene has moved on."""
+
+    def __init__(self, context, export_context, path, mwm_path, settings: ExportSettings, materials_path: str, cache_entries: dict = None):
+        scene = context.scene
+
+        self.scene_name = scene.name
+        self.subtype_id = export_context.subtype_id
+        self.delete_loose_files = scene.seut.export_deleteLooseFiles
+        self.path = path
+        self.mwm_path = mwm_path
+        self.settings = settings
+        self.cache_entries = {} if cache_entries is None else dict(cache_entries)
+
+        self.cmdline = [settings.mwmbuilder, '/f', '/s:' + path + '', '/m:' + self.subtype_id + '*.fbx', '/o:' + mwm_path + '', '/x:' + materials_path + '']
+        self.logfile = os.path.join(path, self.subtype_id + '.mwm.log')
+
+        self.log_parser = MwmbLogParser()
+
+        # The job may run after the export of the scene and its trace session are done, see hold_trace.
+        self.trace = get_trace()
+
+        self.wait_for = []
+        self.future = None
+
+
+    def conflicts_with(self, job) -> bool:
+        """Returns True if both jobs could pick up each other's files through their file masks."""
+
+        if get_abs_path(self.path) != get_abs_path(job.path):
+            return False
+
+        return self.subtype_id.startswith(job.subtype_id) or job.subtype_id.startswith(self.subtype_id)
+
+
+    def run(self):
+        """Runs MWM Builder. Safe to call from a worker thread."""
+
+        with use_trace(self.trace):
+            return self.settings.runTool(self.cmdline, cwd=self.path, logfile=self.logfile, fatalPatterns=MWMB_FATAL_PATTERNS, lineHandler=self.log_parser.feed)
+
+
+    def get_models(self) -> list:
+        """Returns the names of the models MWM Builder picks up through the file mask."""
 
+        files = glob.glob(os.path.join(glob.escape(self.path), self.subtype_id + '*.fbx'))
+        return [os.path.splitext(os.path.basename(f))[0] for f in sorted(files) if not f.endswith('.hkt.fbx')]
 
-def mwmbuilder(self, context, path, mwm_path, settings: ExportSettings, mwmfile: str, materials_path: str):
-    """Calls MWMB to compile files into MWM"""
 
-    scene = context.scene
+def mwmbuilder(self, context, export_context, path, mwm_path, settings: ExportSettings, mwmfile: str, materials_path: str, cache_entries: dict = None) -> bool:
+    """Calls MWMB to compile files into MWM. Yields while MWMB runs."""
+
+    job = MwmBuildJob(context, export_context, path, mwm_path, settings, materials_path, cache_entries)
+    job.future = run_in_background(job.run)
+    hold_trace(job.trace, job.future)
+
+    if not job.future.done():
+        yield job.future
+
+    return finish_mwmbuilder(self, context, job, get_job_output(job))
+
+
+def get_job_output(job: MwmBuildJob):
+    """Returns the result of a job's tool run or the exception it raised."""
+
+    try:
+        return job.future.result()
+    except Exception as e:
+        return e
+
+
+def finish_mwmbuilder(self, context, job: MwmBuildJob, output) -> bool:
+    """Reports the result of an MWM Builder run and cleans up the loose files. Must be called from the main thread."""
+
     result = False
+    models = []
 
     try:
-        cmdline = [settings.mwmbuilder, '/f', '/s:' + path + '', '/m:' + scene.seut.subtypeId + '*.fbx', '/o:' + mwm_path + '', '/x:' + materials_path + '']
-        
-        result = settings.callTool(
-            context,
-            cmdline,
-            ToolType(3),
-            cwd=path,
-            logfile=os.path.join(path, scene.seut.subtypeId + '.mwm.log')
-        )
+        if isinstance(output, Exception):
+            raise output
+
+        returncode, out, cmdline = output
+        result = job.settings.checkToolResult(context, ToolType(3), returncode, out, cmdline)
 
     finally:
-        if scene.seut.export_deleteLooseFiles:
-            file_list = [f for f in os.listdir(path) if (f"{scene.seut.subtypeId}_BS" in f or f"{scene.seut.subtypeId}_LOD" in f or f"{scene.seut.subtypeId}." in f) and (".fbx" in f or ".xml" in f or ".hkt" in f or ".log" in f)]
+        try:
+            models = report_mwmbuilder_models(self, context, job)
+        finally:
+            if result:
+                commit_export_cache(job.path, job.cache_entries)
+            else:
+                # The models that were built are kept in the cache, so only the failed ones are rebuilt next time.
+                built = [m['name'] for m in models if m['success']]
+                commit_export_cache(job.path, {k: v for k, v in job.cache_entries.items() if k in built})
+                discard_export_cache(job.path, {k: v for k, v in job.cache_entries.items() if k not in built})
+
+        if job.delete_loose_files:
+            path = job.path
+            subtype_id = job.subtype_id
+            file_list = [f for f in os.listdir(path) if (f"{subtype_id}_BS" in f or f"{subtype_id}_LOD" in f or f"{subtype_id}." in f) and (".fbx" in f or ".xml" in f or ".hkt" in f or ".log" in f)]
 
             try:
                 for f in file_list:
                     os.remove(os.path.join(path, f))
-            
+
                 if result:
-                    seut_report(self, context, 'INFO', True, 'I007', scene.name)
+                    seut_report(self, context, 'INFO', True, 'I007', job.scene_name)
 
             except EnvironmentError:
-                seut_report(self, context, 'ERROR', False, 'E020')
\ No newline at end of file
+                seut_report(self, context, 'ERROR', False, 'E020')
+
+    return result
+
+
+def report_mwmbuilder_models(self, context, job: MwmBuildJob) -> list:
+    """Reports the issues MWM Builder logged per model and writes them to '<SubtypeId>.mwm.json'. Returns the model records."""
+
+    result = job.log_parser.get_result(job.path, job.mwm_path, job.get_models())
+
+    try:
+        report_path = write_mwmb_report(job.path, job.subtype_id, result)
+    except OSError as e:
+        print(f"SEUT: MWM Builder report could not be written: {e}")
+        report_path = job.logfile
+
+    for model in result['models']:
+        if model['errors'] != []:
+            seut_report(self, context, 'ERROR', False, 'E059', model['name'], model['errors'][0])
+        if model['missing_textures'] != []:
+            seut_report(self, context, 'WARNING', False, 'W024', model['name'], ", ".join(model['missing_textures']))
+        if model['missing_materials'] != []:
+            seut_report(self, context, 'WARNING', False, 'W025', model['name'], ", ".join(model['missing_materials']))
+        if model['warnings'] != []:
+            seut_report(self, context, 'WARNING', False, 'W023', len(model['warnings']), model['name'], report_path)
+
+    return result['models']
+
+
+def get_mwmb_worker_count() -> int:
+    """Leaves one core to Blender, which keeps writing FBX files while MWM Builder runs. The size of the tool pool limits it further."""
+
+    # Set when multiple Blender instances share the machine, see seut_farm.py.
+    if os.environ.get('SEUT_MWMB_WORKERS', "").isdigit():
+        return max(1, int(os.environ['SEUT_MWMB_WORKERS']))
+
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class MwmBuildQueue:
+    """Runs the MWM Builder invocations of multiple scenes on the tool pool while the export of the next scene continues.
+    At most max_workers of them run at the same time. Jobs are only handed to the pool once they can start, so they never
+    hold a worker that other tools, e.g. the FBX writes and Havok conversions of the next scene, are waiting for."""
+
+    def __init__(self, max_workers: int = None):
+        if max_workers is None:
+            max_workers = get_mwmb_worker_count()
+
+        self.max_workers = max_workers
+        self.running = 0
+        self.pending = []
+        self.jobs = []
+        self.lock = threading.Lock()
+
+
+    def submit(self, job: MwmBuildJob):
+        """Queues a job. Jobs that could pick up each other's files wait for the earlier one to finish."""
+
+        # The job's Future is resolved by the queue once the job has run on the pool, see start_jobs.
+        job.wait_for = [j for j in self.jobs if j.conflicts_with(job)]
+        job.future = Future()
+        job.task = None
+        hold_trace(job.trace, job.future)
+        # Jobs are started from worker threads once earlier ones are done, so they are added to the tools of the export here.
+        job.tools = get_tool_group()
+
+        with self.lock:
+            self.jobs.append(job)
+            self.pending.append(job)
+
+        self.start_jobs()
+
+
+    def start_jobs(self):
+        """Hands the pending jobs whose conflicting jobs are done to the pool, as long as there are free slots."""
+
+        started = []
+        with self.lock:
+            for job in list(self.pending):
+                if self.running >= self.max_workers:
+                    break
+                if all(j.future.done() for j in job.wait_for):
+                    self.pending.remove(job)
+                    self.running += 1
+                    started.append(job)
+
+        # Outside the lock, as the callback runs right away if the task is already done.
+        for job in started:
+            job.task = submit_group_task(job.tools, job.run)
+            job.task.add_done_callback(lambda task, job=job: self.job_done(job, task))
+
+
+    def job_done(self, job: MwmBuildJob, task: Future):
+        with self.lock:
+            self.running -= 1
+
+        if task.cancelled():
+            job.future.cancel()
+        elif task.exception() is not None:
+            job.future.set_exception(task.exception())
+        else:
+            job.future.set_result(task.result())
+
+        self.start_jobs()
+
+
+    def wait(self):
+        """Yields until all jobs are done, see seut_export_steps."""
+
+        for job in self.jobs:
+            if not job.future.done():
+                yield job.future
+
+
+    def cancel(self):
+        """Drops all jobs that have not started yet. Running ones are killed with the tools of the export, see ExportJob.cancel."""
+
+        with self.lock:
+            pending = list(self.pending)
+            self.pending.clear()
+
+        for job in pending:
+            job.future.cancel()
+        for job in self.jobs:
+            if job.task is not None:
+                job.task.cancel()
+        self.jobs.clear()
+
+
+    def finish(self, operator, context) -> dict:
+        """Waits for all jobs and reports their results. Returns whether the MWMs of each scene were built successfully."""
+
+        results = {}
+
+        for job in self.jobs:
+            try:
+                result = finish_mwmbuilder(operator, context, job, get_job_output(job))
+            except subprocess.CalledProcessError:
+                result = False
+
+            results[job.scene_name] = results.get(job.scene_name, True) and result
+
+        self.jobs.clear()
+
+        return results
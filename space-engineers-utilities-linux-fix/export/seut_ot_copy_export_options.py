@@ -23,6 +23,7 @@ class SEUT_OT_CopyExportOptions(Operator):
         
         for scn in bpy.data.scenes:
             scn.seut.export_deleteLooseFiles = scene.seut.export_deleteLooseFiles
+            scn.seut.export_incremental = scene.seut.export_incremental
             scn.seut.export_sbc_type = scene.seut.export_sbc_type
             scn.seut.export_largeGrid = scene.seut.export_largeGrid
             scn.seut.export_smallGrid = scene.seut.export_smallGrid
@@ -8,19 +8,25 @@ import shutil
 from os.path        import join
 from bpy.types      import Operator
 
-from .havok.seut_havok_hkt          import convert_fbx_to_fbxi_hkt, convert_fbxi_hkt_to_hkt
-from .seut_mwmbuilder               import mwmbuilder
+from .havok.seut_havok_hkt          import start_havok_conversion, finish_havok_conversion, get_hko_content
+from .havok.seut_havok_cache        import is_hkt_cache_enabled, get_collision_key, restore_cached_hkt
+from .seut_mwmbuilder               import mwmbuilder, MwmBuildJob
 from .seut_export_utils             import ExportSettings, export_to_fbxfile, create_relative_path
 from .seut_export_utils             import correct_for_export_type, export_collection, get_col_filename, convert_position_to_cell
+from .seut_export_utils             import export_material_session, keep_subpart_references, wait_for_fbx_writes, ExportContext
 from .seut_export_transparent_mat   import export_transparent_mat
+from .seut_export_cache             import is_cache_enabled
 from ..utils.seut_xml_utils         import *
 from ..seut_collections             import get_collections, get_rev_ref_cols, get_cols_by_type, get_first_free_index
 from ..seut_errors                  import *
-from ..seut_utils                   import prep_context, get_preferences, create_relative_path, get_addon
-from ..utils.seut_tool_utils        import get_tool_dir
+from ..seut_utils                   import prep_context, get_preferences, create_relative_path, get_addon, get_export_objects
+from ..utils.seut_tool_utils        import get_tool_dir, reset_tool_cancellation
+from .seut_export_steps             import run_steps, is_export_running, start_export_job, update_export_job
+from .seut_export_trace             import trace_session, trace_span
+from .seut_custom_fbx_exporter      import fbx_write_session
 
 
-orig_grid_scale = ""
+EXPORT_STAGES = ["Build Stages", "LODs", "Main", "Collision", "SBC", "Materials", "MWM"]
 
 
 class SEUT_OT_Export(Operator):
@@ -32,22 +38,56 @@ class SEUT_OT_Export(Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.area.type == 'VIEW_3D' and context.mode == 'OBJECT'
+        return context.area.type == 'VIEW_3D' and context.mode == 'OBJECT' and not is_export_running()
 
 
     def execute(self, context):
         """Calls the function to export all collections"""
 
+        reset_tool_cancellation()
         result = export(self, context)
 
         return result
 
 
-def export(self, context, export_materials=True):
+    def invoke(self, context, event):
+        """Runs the export in the background, keeping Blender responsive"""
+
+        return start_export_job(self, context, export_steps(self, context), count_export_stages(), [context.scene])
+
+
+    def modal(self, context, event):
+        return update_export_job(self, context, event)
+
+
+def export(self, context, export_materials=True, mwm_queue=None):
     """Exports all collections in the current scene and compiles them to MWM"""
 
+    return run_steps(export_steps(self, context, export_materials, mwm_queue))
+
+
+def get_export_grid_sizes(scene) -> list:
+    """Returns the grid sizes the scene is exported to."""
+
+    grid_sizes = []
+    if scene.seut.export_largeGrid or scene.seut.sceneType in ['character', 'character_animation', 'item']:
+        grid_sizes.append('large')
+    if scene.seut.export_smallGrid:
+        grid_sizes.append('small')
+
+    return grid_sizes
+
+
+def count_export_stages() -> int:
+    """Returns the number of stages a scene's export yields. All grid sizes are exported in the same pass."""
+
+    return len(EXPORT_STAGES)
+
+
+def export_steps(self, context, export_materials=True, mwm_queue=None):
+    """Exports all collections in the current scene and compiles them to MWM. Yields its stages and the tools it waits for, see seut_export_steps."""
+
     scene = context.scene
-    preferences = get_preferences()
 
     active_col = context.view_layer.active_layer_collection
 
@@ -64,18 +104,35 @@ def export(self, context, export_materials=True):
     scene.seut.mirroringToggle = 'off'
     scene.seut.renderToggle = 'off'
 
-    subparts = scene.seut.linkSubpartInstances
-    scene.seut.linkSubpartInstances = False
+    trace_path = os.path.join(get_abs_path(scene.seut.export_exportPath), f"{scene.seut.subtypeId}.trace.json")
+
+    try:
+        with trace_session(trace_path), export_material_session(), keep_subpart_references(scene), \
+            fbx_write_session(get_preferences().fbx_background_write), trace_span("Export Scene", scene=scene.name, version=version) as span:
+            result = yield from export_grid_sizes(self, context, export_materials, mwm_queue)
+            span['result'] = str(result)
+
+    finally:
+        if context.area is not None:
+            context.area.type = current_area
+        context.view_layer.active_layer_collection = active_col
+
+    return result
+
+
+def export_grid_sizes(self, context, export_materials=True, mwm_queue=None):
+    """Exports the scene to all grid sizes it is set to be exported to in a single pass"""
+
+    scene = context.scene
+    preferences = get_preferences()
 
     if not os.path.isdir(get_abs_path(scene.seut.mod_path) + '/'):
         seut_report(self, context, 'ERROR', True, 'E019', "Mod", scene.name)
-        scene.seut.linkSubpartInstances = subparts
         return {'CANCELLED'}
 
     # Checks export path and whether SubtypeId exists
     result = check_export(self, context)
     if not result == {'CONTINUE'}:
-        scene.seut.linkSubpartInstances = subparts
         return result
 
     if not os.path.exists(get_abs_path(scene.seut.export_exportPath)):
@@ -84,20 +141,17 @@ def export(self, context, export_materials=True):
     # Check for availability of FBX Importer
     result = check_toolpath(self, context, os.path.join(get_tool_dir(), 'FBXImporter.exe'), "Custom FBX Importer", "FBXImporter.exe")
     if not result == {'CONTINUE'}:
-        scene.seut.linkSubpartInstances = subparts
         return result
 
     # Check for availability of MWM Builder
     result = check_toolpath(self, context, preferences.mwmb_path, "MWM Builder", "MwmBuilder.exe")
     if not result == {'CONTINUE'}:
-        scene.seut.linkSubpartInstances = subparts
         return result
 
     # Check materials path
     materials_path = os.path.join(get_abs_path(preferences.asset_path), 'Materials')
     if preferences.asset_path == "":
         seut_report(self, context, 'ERROR', True, 'E012', "Asset Directory", get_abs_path(preferences.asset_path))
-        scene.seut.linkSubpartInstances = subparts
         return {'CANCELLED'}
     elif not os.path.isdir(materials_path):
         os.makedirs(materials_path, exist_ok=True)
@@ -106,95 +160,58 @@ def export(self, context, export_materials=True):
     if scene.seut.sceneType == 'character_animation' and len(scene.timeline_markers) <= 0:
         scene.timeline_markers.new('F_00', frame=0)
 
-    grid_scale = str(scene.seut.gridScale)
-    global orig_grid_scale
-    orig_grid_scale = grid_scale
-    subtype_id = str(scene.seut.subtypeId)
-    rescale_factor = int(scene.seut.export_rescaleFactor)
-    path = str(scene.seut.export_exportPath)
-
-    # Exports large grid and character-type scenes
-    if scene.seut.export_largeGrid or scene.seut.sceneType in ['character', 'character_animation', 'item']:
-        scene.seut.gridScale = 'large'
-        scene.seut.subtypeId = correct_for_export_type(scene, scene.seut.subtypeId)
-
-        if grid_scale == 'small':
-            scene.seut.export_rescaleFactor = 5.0
-            if scene.seut.export_medium_grid:
-                scene.seut.export_rescaleFactor = 3.0
-        else:
-            scene.seut.export_rescaleFactor = 1.0
-
-        if scene.seut.export_exportPath.find("\small\\") != -1 or scene.seut.export_exportPath.endswith("\small"):
-            scene.seut.export_exportPath = scene.seut.export_exportPath.replace("\small\\", "\large\\")
-            scene.seut.export_exportPath = scene.seut.export_exportPath.replace("\small", "\large")
-
-        result = export_all(self, context, export_materials)
+    # All grid sizes are exported in one pass, so each collection is only validated once and its geometry only extracted once.
+    export_contexts = [ExportContext(scene, grid_size) for grid_size in get_export_grid_sizes(scene)]
 
-        # Resetting the variables
-        scene.seut.subtypeId = subtype_id
-        scene.seut.gridScale = grid_scale
-        scene.seut.export_rescaleFactor = rescale_factor
-        scene.seut.export_exportPath = path
+    return (yield from export_all(self, context, export_contexts, export_materials, mwm_queue))
 
-    # Exports small grid scenes
-    if scene.seut.export_smallGrid:
-        scene.seut.gridScale = 'small'
-        scene.seut.subtypeId = correct_for_export_type(scene, scene.seut.subtypeId)
-
-        if grid_scale == 'large':
-            scene.seut.export_rescaleFactor = 0.2
-            if scene.seut.export_medium_grid:
-                scene.seut.export_rescaleFactor = 0.6
-        else:
-            scene.seut.export_rescaleFactor = 1.0
-
-        if scene.seut.export_exportPath.find("\large\\") != -1 or scene.seut.export_exportPath.endswith("\large"):
-            scene.seut.export_exportPath = scene.seut.export_exportPath.replace("\large\\", "\small\\")
-            scene.seut.export_exportPath = scene.seut.export_exportPath.replace("\large", "\small")
-
-        result = export_all(self, context, export_materials)
 
-        # Resetting the variables
-        scene.seut.subtypeId = subtype_id
-        scene.seut.gridScale = grid_scale
-        scene.seut.export_rescaleFactor = rescale_factor
-        scene.seut.export_exportPath = path
-
-    scene.seut.linkSubpartInstances = subparts
-
-    context.area.type = current_area
-    context.view_layer.active_layer_collection = active_col
-
-    return result
-
-
-def export_all(self, context, export_materials=True):
-    """Exports all collections"""
+def export_all(self, context, export_contexts: list, export_materials=True, mwm_queue=None):
+    """Exports all collections once per export context. If an MwmBuildQueue is passed, the MWM compilation is queued instead of waited for."""
 
     scene = context.scene
 
     results = []
 
-    results.append(export_bs(self, context))
-    results.append(export_lod(self, context))
-    results.append(export_main(self, context))
-    results.append(export_hkt(self, context))
-
-    if scene.seut.export_sbc_type in ['update', 'new']:
-        if scene.seut.sceneType == 'mainScene':
-            results.append(export_sbc(self, context))
-        if export_materials:
+    yield EXPORT_STAGES[0]
+    with trace_span(EXPORT_STAGES[0], scene=scene.name):
+        results.append(export_bs(self, context, export_contexts))
+    yield EXPORT_STAGES[1]
+    with trace_span(EXPORT_STAGES[1], scene=scene.name):
+        results.append(export_lod(self, context, export_contexts))
+    yield EXPORT_STAGES[2]
+    with trace_span(EXPORT_STAGES[2], scene=scene.name):
+        results.append(export_main(self, context, export_contexts))
+    yield EXPORT_STAGES[3]
+    with trace_span(EXPORT_STAGES[3], scene=scene.name):
+        results.append(export_hkt(self, context, export_contexts))
+
+    yield EXPORT_STAGES[4]
+    if scene.seut.export_sbc_type in ['update', 'new'] and scene.seut.sceneType == 'mainScene':
+        with trace_span(EXPORT_STAGES[4], scene=scene.name):
+            for export_context in export_contexts:
+                results.append(export_sbc(self, context, export_context))
+    yield EXPORT_STAGES[5]
+    if scene.seut.export_sbc_type in ['update', 'new'] and export_materials:
+        with trace_span(EXPORT_STAGES[5], scene=scene.name):
             results.append(export_tms(self, context))
 
+    # MwmBuilder reads the FBX and HKT files, which may still be written in the background.
+    results.append((yield from wait_for_fbx_writes(self, context)))
+    with trace_span("Wait for Collision", scene=scene.name):
+        results.append((yield from finish_hkt(self, context, export_contexts)))
+
     if {'CANCELLED'} not in results:
-        export_mwm(self, context)
+        yield EXPORT_STAGES[6]
+        for export_context in export_contexts:
+            with trace_span(EXPORT_STAGES[6], scene=scene.name, subtype_id=export_context.subtype_id, queued=mwm_queue is not None):
+                yield from export_mwm(self, context, export_context, mwm_queue)
         return {'FINISHED'}
     else:
         return {'CANCELLED'}
 
 
-def export_main(self, context):
+def export_main(self, context, export_contexts: list):
     """Exports the Main collection"""
 
     scene = context.scene
@@ -211,7 +228,7 @@ def export_main(self, context):
 
     found_armatures = False
     unparented_objects = 0
-    for obj in collections['main'][0].objects:
+    for obj in get_export_objects(collections['main'][0]):
 
         if scene.seut.sceneType == 'character' and check_weights(context, obj) is False:
             return {'CANCELLED'}
@@ -227,7 +244,7 @@ def export_main(self, context):
             return {'CANCELLED'}
 
         if obj.type == 'EMPTY' and 'file' in obj and not obj.seut.linked:
-            if orig_grid_scale == 'large' and scene.seut.export_smallGrid or orig_grid_scale == 'small' and scene.seut.export_largeGrid:
+            if scene.seut.gridScale == 'large' and scene.seut.export_smallGrid or scene.seut.gridScale == 'small' and scene.seut.export_largeGrid:
                 seut_report(self, context, 'WARNING', True, 'W020', scene.name, obj.name)
 
     # Check for armatures being present in collection
@@ -241,27 +258,28 @@ def export_main(self, context):
         seut_report(self, context, 'ERROR', True, 'E031', collections['main'][0].name)
         return {'CANCELLED'}
 
-    results = export_collection(self, context, collections['main'][0])
+    results = export_collection(self, context, export_contexts, collections['main'][0])
     if {'CANCELLED'} in results:
         return {'CANCELLED'}
 
     return {'FINISHED'}
 
 
-def export_hkt(self, context):
-    """Exports collision to HKT"""
+def export_hkt(self, context, export_contexts: list):
+    """Exports collision to FBX once per export context and starts converting it to HKT in the background, see finish_hkt."""
 
     scene = context.scene
     collections = get_collections(scene)
     preferences = get_preferences()
-    settings = ExportSettings(scene, None)
-    path = get_abs_path(scene.seut.export_exportPath) + "\\"
 
     # Check for availability of Havok SFM
     result = check_toolpath(self, context, preferences.havok_path, "Havok Standalone Filter Manager", "hctStandAloneFilterManager.exe")
     if not result == {'CONTINUE'}:
         return result
 
+    havok_options = get_hko_content()
+    use_hkt_cache = is_hkt_cache_enabled()
+
     if 'hkt' in collections and not collections['hkt'] is None and collections['hkt'] != []:
         for col in collections['hkt']:
 
@@ -269,7 +287,8 @@ def export_hkt(self, context):
             if col.seut.hkt_file != "":
                 ext_hkt_path = get_abs_path(col.seut.hkt_file)
                 if os.path.exists(ext_hkt_path):
-                    shutil.copyfile(ext_hkt_path, join(path, f"{get_col_filename(col)}.hkt"))
+                    for export_context in export_contexts:
+                        shutil.copyfile(ext_hkt_path, join(export_context.export_path, f"{get_col_filename(col, export_context.subtype_id)}.hkt"))
                 else:
                     seut_report(self, context, 'ERROR', True, 'E003', f"External Collision (set in Collision collection '{col.name}') file", ext_hkt_path)
                     cancelled = True
@@ -280,6 +299,13 @@ def export_hkt(self, context):
                 if not result == {'CONTINUE'}:
                     continue
 
+                # The collision is part of the fingerprint of its collection, so it is up to date if the collection is. Main's
+                # HKT is deleted with the loose files though, so it is needed again whenever a rebuilt BS gets a copy of it.
+                targets = [e for e in export_contexts if col.seut.ref_col is None or col.seut.ref_col.name not in e.skipped
+                           or (col.seut.ref_col.seut.col_type == 'main' and get_bs_without_collision(collections, e) != [])]
+                if targets == []:
+                    continue
+
                 cancelled = False
                 for obj in col.objects:
 
@@ -306,30 +332,62 @@ def export_hkt(self, context):
                     seut_report(self, context, 'ERROR', True, 'E022', col.name, len(col.objects))
                     continue
 
-                fbx_hkt_file = join(path, f"{get_col_filename(col)}.hkt.fbx")
-                hkt_file = join(path, f"{get_col_filename(col)}.hkt")
+                # The Havok FBX has the rescale factor baked into its geometry, so it is written for each grid size.
+                for export_context in targets:
+                    settings = ExportSettings(scene, None, rescale_factor=export_context.rescale_factor)
+                    fbx_hkt_file = join(export_context.export_path, f"{get_col_filename(col, export_context.subtype_id)}.hkt.fbx")
+                    hkt_file = join(export_context.export_path, f"{get_col_filename(col, export_context.subtype_id)}.hkt")
 
-                # Export as FBX
-                export_to_fbxfile(settings, scene, fbx_hkt_file, col.objects, ishavokfbxfile=True)
+                    cache_key = get_collision_key(context, col, export_context.rescale_factor, havok_options) if use_hkt_cache else None
+                    if cache_key is not None and restore_cached_hkt(cache_key, hkt_file):
+                        print(f"Collision '{col.name}' ({export_context.grid_scale}) is unchanged, using cached HKT.")
+                        continue
 
-                # Then create the HKT file.
-                convert_fbx_to_fbxi_hkt(context, settings, fbx_hkt_file, hkt_file)
-                convert_fbxi_hkt_to_hkt(self, context, settings, hkt_file, hkt_file)
+                    # Export as FBX
+                    export_to_fbxfile(settings, scene, fbx_hkt_file, col.objects, ishavokfbxfile=True)
+
+                    # Then create the HKT file while the next collection is exported.
+                    export_context.havok_jobs.append(start_havok_conversion(context, settings, fbx_hkt_file, hkt_file, havok_options, cache_key))
+
+    return {'FINISHED'}
+
+
+def get_bs_without_collision(collections: dict, export_context) -> list:
+    """Returns the BS collections rebuilt in this export pass that have no collision collection and get a copy of main's HKT, see export_mwm."""
+
+    if collections.get('bs') is None:
+        return []
+
+    # An empty collision collection means the BS has no collision, so it does not get main's either.
+    own_collision = set()
+    if collections.get('hkt') is not None:
+        own_collision = {col.seut.ref_col.name for col in collections['hkt'] if col.seut.ref_col is not None}
+
+    return [col for col in collections['bs'] if col.name not in own_collision and get_col_filename(col, export_context.subtype_id) in export_context.pending]
+
+
+def finish_hkt(self, context, export_contexts: list):
+    """Waits for the HKT conversions started by export_hkt and reports their results. Yields while the Havok tools run."""
+
+    for export_context in export_contexts:
+        for job in export_context.havok_jobs:
+            yield from finish_havok_conversion(context, job)
+        export_context.havok_jobs.clear()
 
     return {'FINISHED'}
 
 
-def export_bs(self, context):
+def export_bs(self, context, export_contexts: list):
     """Exports Build Stage collections"""
 
     scene = context.scene
     bs_cols = get_cols_by_type(scene, 'bs')
-    result = check_export_col_dict(self, context, bs_cols)
+    result = check_export_col_dict(self, context, export_contexts, bs_cols)
 
     return result
 
 
-def export_lod(self, context):
+def export_lod(self, context, export_contexts: list):
     """Exports LOD collections"""
 
     scene = context.scene
@@ -337,14 +395,14 @@ def export_lod(self, context):
 
     # Normal LODs
     lod_cols = get_cols_by_type(scene, 'lod', collections['main'][0])
-    result_normal = check_export_col_dict(self, context, lod_cols)
+    result_normal = check_export_col_dict(self, context, export_contexts, lod_cols)
 
     # BS LODs
     if 'bs' in collections:
         if collections['bs'] is not None:
             for ref_col in collections['bs']:
                 lod_cols = get_cols_by_type(scene, 'lod', ref_col)
-                result_bslod = check_export_col_dict(self, context, lod_cols)
+                result_bslod = check_export_col_dict(self, context, export_contexts, lod_cols)
                 if result_bslod == {'CANCELLED'}:
                     return {'CANCELLED'}
 
@@ -354,7 +412,7 @@ def export_lod(self, context):
     return {'FINISHED'}
 
 
-def check_export_col_dict(self, context, cols: dict):
+def check_export_col_dict(self, context, export_contexts: list, cols: dict):
     scene = context.scene
     first_free_idx = get_first_free_index(cols)
 
@@ -378,28 +436,28 @@ def check_export_col_dict(self, context, cols: dict):
                 seut_report(self, context, 'ERROR', True, 'E011', col.name, cols[idx - 1].name)
                 return {'CANCELLED'}
 
-            for obj in col.objects:
+            for obj in get_export_objects(col):
                 if check_uvms(self, context, obj) != {'CONTINUE'}:
                     return {'CANCELLED'}
                 if scene.seut.sceneType == 'character' and check_weights(context, obj) is False:
                     return {'CANCELLED'}
 
-            results = export_collection(self, context, col)
+            results = export_collection(self, context, export_contexts, col)
             if {'CANCELLED'} in results:
                 return {'CANCELLED'}
 
 
-def export_mwm(self, context):
-    """Compiles to MWM from the previously exported temp files"""
+def export_mwm(self, context, export_context, mwm_queue=None):
+    """Compiles to MWM from the previously exported temp files. Yields while MWM Builder runs."""
 
     scene = context.scene
     preferences = get_preferences()
-    path = get_abs_path(scene.seut.export_exportPath)
+    path = export_context.export_path
     materials_path = os.path.join(get_abs_path(preferences.asset_path), 'Materials')
     collections = get_collections(scene)
 
-    settings = ExportSettings(scene, None)
-    mwmfile = join(path, scene.seut.subtypeId + ".mwm")
+    settings = ExportSettings(scene, None, rescale_factor=export_context.rescale_factor)
+    mwmfile = join(path, export_context.subtype_id + ".mwm")
 
     # This duplicates HKTs if none are defined for BS but one exists for main.
     hkts = []
@@ -410,10 +468,10 @@ def export_mwm(self, context):
         if os.path.isdir(f):
             continue
 
-        if f == f"{scene.seut.subtypeId}.hkt" or (f"{scene.seut.subtypeId}_BS" in f and os.path.splitext(f)[1] == '.hkt'):
+        if f == f"{export_context.subtype_id}.hkt" or (f"{export_context.subtype_id}_BS" in f and os.path.splitext(f)[1] == '.hkt'):
             hkts.append(f)
 
-        elif f"{scene.seut.subtypeId}_BS" in f and os.path.splitext(f)[1] == '.fbx':
+        elif f"{export_context.subtype_id}_BS" in f and os.path.splitext(f)[1] == '.fbx':
             bses.append(f)
 
     # If there are empty collision collections for BS collections, do not duplicate main's HKT for them.
@@ -423,25 +481,45 @@ def export_mwm(self, context):
                 seut_report(self, context, 'INFO', False, 'I022', col.name)
                 continue
             if col.seut.ref_col.seut.col_type == 'bs' and len(col.objects) == 0:
-                bses.remove(f"{scene.seut.subtypeId}_BS{col.seut.ref_col.seut.type_index}.fbx")
+                bs_fbx = f"{export_context.subtype_id}_BS{col.seut.ref_col.seut.type_index}.fbx"
+                if bs_fbx in bses:
+                    bses.remove(bs_fbx)
 
     if len(hkts) == 1:
         if not "_BS" in os.path.basename(hkts[0]):
             for bs in bses:
                 shutil.copyfile(os.path.join(path, hkts[0]), os.path.join(path, os.path.splitext(bs)[0] + '.hkt'))
 
-    mwmbuilder(self, context, path, path, settings, mwmfile, materials_path)
+    # Main's collision could not be converted, so the BS that would get a copy of it are built without collision.
+    # An empty collision collection without an external HKT is not meant to produce an HKT, so it is not reported.
+    main_collision = [col for col in collections.get('hkt') or [] if col.seut.ref_col is not None and col.seut.ref_col.seut.col_type == 'main' and (len(col.objects) > 0 or col.seut.hkt_file != "")]
+    if main_collision != [] and f"{export_context.subtype_id}.hkt" not in hkts:
+        for col in get_bs_without_collision(collections, export_context):
+            seut_report(self, context, 'WARNING', True, 'W026', col.name, main_collision[0].name)
+
+    # Nothing has changed since the last export, so the existing MWMs are still valid.
+    if is_cache_enabled(scene) and export_context.pending == {} and len(export_context.skipped) > 0:
+        seut_report(self, context, 'INFO', False, 'I023', scene.name)
+        return {'FINISHED'}
+
+    cache_entries = dict(export_context.pending)
+    export_context.pending.clear()
+
+    if mwm_queue is not None:
+        mwm_queue.submit(MwmBuildJob(context, export_context, path, path, settings, materials_path, cache_entries))
+    else:
+        yield from mwmbuilder(self, context, export_context, path, path, settings, mwmfile, materials_path, cache_entries)
 
     return {'FINISHED'}
 
 
-def export_sbc(self, context):
+def export_sbc(self, context, export_context):
     """Exports to SBC"""
 
     scene = context.scene
     collections = get_collections(scene)
     path_data = os.path.join(get_abs_path(scene.seut.mod_path), "Data")
-    path_models = get_abs_path(scene.seut.export_exportPath)
+    path_models = export_context.export_path
 
     # Checks whether collection exists, is excluded or is empty
     result = check_collection(self, context, scene, collections['main'][0], False)
@@ -451,7 +529,7 @@ def export_sbc(self, context):
     # 3 options: no file and no entry, file but no entry, file and entry
 
     # Create XML tree and add initial parameters.
-    output = get_relevant_sbc(os.path.dirname(path_data), 'CubeBlocks', 'Definition', scene.seut.subtypeId)
+    output = get_relevant_sbc(os.path.dirname(path_data), 'CubeBlocks', 'Definition', export_context.subtype_id)
     if output is not None:
         file_to_update = output[0]
         lines = output[1]
@@ -477,28 +555,28 @@ def export_sbc(self, context):
 
         def_Id = add_subelement(def_definition, 'Id')
         add_subelement(def_Id, 'TypeId', 'CubeBlock')
-        add_subelement(def_Id, 'SubtypeId', scene.seut.subtypeId)
+        add_subelement(def_Id, 'SubtypeId', export_context.subtype_id)
 
-        add_subelement(def_definition, 'DisplayName', '{LOC:DisplayName_' + scene.seut.subtypeId + '}')
-        add_subelement(def_definition, 'Description', '{LOC:Description_' + scene.seut.subtypeId + '}')
+        add_subelement(def_definition, 'DisplayName', '{LOC:DisplayName_' + export_context.subtype_id + '}')
+        add_subelement(def_definition, 'Description', '{LOC:Description_' + export_context.subtype_id + '}')
 
     icon_path = 'Textures\GUI\Icons\AstronautBackpack.dds'
-    icon_target_path = get_abs_path(os.path.join(scene.render.filepath, scene.seut.subtypeId + '.dds'))
+    icon_target_path = get_abs_path(os.path.join(scene.render.filepath, export_context.subtype_id + '.dds'))
     if (os.path.exists(icon_target_path) or os.path.exists(icon_target_path.replace("_LG_", "_SG_")) or os.path.exists(icon_target_path.replace("_SG_", "_LG_")) or os.path.exists(os.path.splitext(icon_target_path)[0] + '.png')) and icon_target_path.find('Textures') != -1:
         icon_path = os.path.join('Textures', icon_target_path.split('Textures\\')[1])
     lines_entry = update_add_subelement(def_definition, 'Icon', icon_path, update_sbc, lines_entry)
 
     medium_grid_scalar = 1.0 # default to doing nothing unless the 3to5 mode is detected
 
-    if scene.seut.gridScale == 'large':
+    if export_context.grid_scale == 'large':
         lines_entry = update_add_subelement(def_definition, 'CubeSize', 'Large', update_sbc, lines_entry)
         grid_size = 2.5
-        if (abs(scene.seut.export_rescaleFactor - 3) < 0.01): # floating point comparison
+        if (abs(export_context.rescale_factor - 3) < 0.01): # floating point comparison
             medium_grid_scalar = 0.6 # Large grid block is going to be 3/5 of the expected size
-    elif scene.seut.gridScale == 'small':
+    elif export_context.grid_scale == 'small':
         lines_entry = update_add_subelement(def_definition, 'CubeSize', 'Small', update_sbc, lines_entry)
         grid_size = 0.5
-        if (abs(scene.seut.export_rescaleFactor - 0.6) < 0.01): # floating point comparison
+        if (abs(export_context.rescale_factor - 0.6) < 0.01): # floating point comparison
             medium_grid_scalar = 3.0 # Small grid block is going to be 3 times larger than expected
 
     def_Size = 'Size'
@@ -532,7 +610,7 @@ def export_sbc(self, context):
         add_attrib(def_ModelOffset, 'z', 0)
 
     # Model
-    lines_entry = update_add_subelement(def_definition, 'Model', os.path.join(create_relative_path(path_models, "Models"), scene.seut.subtypeId + '.mwm'), update_sbc, lines_entry)
+    lines_entry = update_add_subelement(def_definition, 'Model', os.path.join(create_relative_path(path_models, "Models"), export_context.subtype_id + '.mwm'), update_sbc, lines_entry)
 
     # Components
     if not update_sbc:
@@ -551,8 +629,8 @@ def export_sbc(self, context):
 
     if len(scene.seut.mountpointAreas) > 0:
 
-        # gridScale here is modified when exporting both types, use rescaleFactor to determine original gridScale used to define mountpoints
-        if (scene.seut.gridScale == 'small' and scene.seut.export_rescaleFactor > 0.99) or (scene.seut.gridScale == "large" and scene.seut.export_rescaleFactor > 1.01):
+        # The grid scale differs from the scene's when exporting both types, use the rescale factor to determine the original grid scale used to define mountpoints
+        if (export_context.grid_scale == 'small' and export_context.rescale_factor > 0.99) or (export_context.grid_scale == "large" and export_context.rescale_factor > 1.01):
             scale = 0.5
         else:
             scale = 2.5
@@ -683,14 +761,14 @@ def export_sbc(self, context):
                 else:
                     add_attrib(def_BS_Model, 'BuildPercentUpperBound', "{:.2f}".format((bs + 1) * percentage)[:4])
 
-                add_attrib(def_BS_Model, 'File', os.path.join(create_relative_path(path_models, "Models"), scene.seut.subtypeId + '_BS' + str(bs + 1) + '.mwm'))
+                add_attrib(def_BS_Model, 'File', os.path.join(create_relative_path(path_models, "Models"), export_context.subtype_id + '_BS' + str(bs + 1) + '.mwm'))
 
             if update_sbc:
                 lines_entry = convert_back_xml(def_BuildProgressModels, 'BuildProgressModels', lines_entry)
 
     # BlockPairName
     if not update_sbc:
-        add_subelement(def_definition, 'BlockPairName', scene.seut.subtypeId)
+        add_subelement(def_definition, 'BlockPairName', export_context.subtype_id)
 
     # Mirroring
     if collections['mirroring'] != None:
@@ -764,7 +842,7 @@ def export_sbc(self, context):
     if update_sbc:
         target_file = file_to_update
     else:
-        filename = scene.seut.subtypeId
+        filename = export_context.subtype_id
         target_file = os.path.join(path_data, "CubeBlocks", filename + ".sbc")
         if not os.path.exists(os.path.join(path_data, "CubeBlocks")):
             os.makedirs(os.path.join(path_data, "CubeBlocks"))
@@ -787,7 +865,7 @@ def export_sbc(self, context):
     if not update_sbc:
         seut_report(self, context, 'INFO', False, 'I004', target_file)
     else:
-        seut_report(self, context, 'INFO', False, 'I015', scene.seut.subtypeId, target_file)
+        seut_report(self, context, 'INFO', False, 'I015', export_context.subtype_id, target_file)
 
     return {'FINISHED'}
 
@@ -3,10 +3,12 @@ import os
 
 from bpy.types  import Operator
 
-from ..utils.seut_tool_utils    import get_tool_dir
+from ..utils.seut_tool_utils    import get_tool_dir, reset_tool_cancellation
 from ..seut_errors              import *
 from ..seut_utils               import prep_context, get_preferences
-from .seut_ot_export            import export
+from .seut_ot_export            import export_steps, count_export_stages
+from .seut_export_steps         import run_steps, is_export_running, start_export_job, update_export_job
+from .seut_mwmbuilder           import MwmBuildQueue
 
 
 class SEUT_OT_ExportAllScenes(Operator):
@@ -18,67 +20,108 @@ class SEUT_OT_ExportAllScenes(Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.area.type == 'VIEW_3D' and context.mode == 'OBJECT'
+        return context.area.type == 'VIEW_3D' and context.mode == 'OBJECT' and not is_export_running()
 
 
     def execute(self, context):
         """Exports all collections in all scenes and compresses them to MWM."""
 
-        preferences = get_preferences()
+        reset_tool_cancellation()
+        return run_steps(export_all_scenes(self, context))
 
-        # Check for availability of FBX Importer
-        result = check_toolpath(self, context, os.path.join(get_tool_dir(), 'FBXImporter.exe'), "Custom FBX Importer", "FBXImporter.exe")
-        if result != {'CONTINUE'}:
-            return result
 
-        # Check for availability of MWM Builder
-        result = check_toolpath(self, context, preferences.mwmb_path, "MWM Builder", "MwmBuilder.exe")
-        if result != {'CONTINUE'}:
-            return result
+    def invoke(self, context, event):
+        """Runs the export in the background, keeping Blender responsive"""
 
-        # Check materials path
-        materials_path = os.path.join(get_abs_path(preferences.asset_path), 'Materials')
-        if preferences.asset_path == "":
-            seut_report(self, context, 'ERROR', True, 'E012', "Asset Directory", get_abs_path(preferences.asset_path))
-            return {'CANCELLED'}
-        elif not os.path.isdir(materials_path):
-            os.makedirs(materials_path, exist_ok=True)
+        scenes = get_exported_scenes()
+        stage_count = len(scenes) * count_export_stages() + 1
+        return start_export_job(self, context, export_all_scenes(self, context), stage_count, scenes)
 
-        # Checks export path and whether SubtypeId exists
-        result = check_export(self, context)
-        if result != {'CONTINUE'}:
-            return result
 
-        current_area = prep_context(context)
-        original_scene = context.window.scene
+    def modal(self, context, event):
+        return update_export_job(self, context, event)
 
-        scene_counter = 0
-        failed_counter = 0
 
+def get_exported_scenes() -> list:
+    return [scn for scn in bpy.data.scenes if 'SEUT' in scn.view_layers and scn.seut.sceneType in ['mainScene', 'subpart', 'character', 'character_animation', 'item']]
+
+
+def export_all_scenes(self, context):
+    """Exports all collections in all scenes and compresses them to MWM. Yields its stages and the tools it waits for, see seut_export_steps."""
+
+    preferences = get_preferences()
+
+    # Check for availability of FBX Importer
+    result = check_toolpath(self, context, os.path.join(get_tool_dir(), 'FBXImporter.exe'), "Custom FBX Importer", "FBXImporter.exe")
+    if result != {'CONTINUE'}:
+        return result
+
+    # Check for availability of MWM Builder
+    result = check_toolpath(self, context, preferences.mwmb_path, "MWM Builder", "MwmBuilder.exe")
+    if result != {'CONTINUE'}:
+        return result
+
+    # Check materials path
+    materials_path = os.path.join(get_abs_path(preferences.asset_path), 'Materials')
+    if preferences.asset_path == "":
+        seut_report(self, context, 'ERROR', True, 'E012', "Asset Directory", get_abs_path(preferences.asset_path))
+        return {'CANCELLED'}
+    elif not os.path.isdir(materials_path):
+        os.makedirs(materials_path, exist_ok=True)
+
+    # Checks export path and whether SubtypeId exists
+    result = check_export(self, context)
+    if result != {'CONTINUE'}:
+        return result
+
+    current_area = prep_context(context)
+    original_scene = context.window.scene
+
+    scene_counter = 0
+    failed_scenes = set()
+
+    # MWM Builder runs in the background while the next scene is being exported.
+    mwm_queue = MwmBuildQueue()
+    finished = False
+
+    try:
         for idx, scn in enumerate(bpy.data.scenes):
 
-            if 'SEUT' not in scn.view_layers:
+            if scn not in get_exported_scenes():
                 continue
 
-            if scn.seut.sceneType in ['mainScene', 'subpart', 'character', 'character_animation', 'item']:
+            scene_counter += 1
+            context.window.scene = scn
 
-                scene_counter += 1
-                context.window.scene = scn
+            try:
+                result = yield from export_steps(self, context, idx != 0, mwm_queue)
 
-                try:
-                    result = export(self, context, idx != 0)
+                if result != {'FINISHED'}:
+                    failed_scenes.add(scn.name)
+                    seut_report(self, context, 'ERROR', True, 'E016', scn.name)
 
-                    if result != {'FINISHED'}:
-                        failed_counter += 1
-                        seut_report(self, context, 'ERROR', True, 'E016', scn.name)
+            except RuntimeError:
+                failed_scenes.add(scn.name)
+                seut_report(self, context, 'ERROR', True, 'E016', scn.name)
 
-                except RuntimeError:
-                    failed_counter += 1
-                    seut_report(self, context, 'ERROR', True, 'E016', scn.name)
+        yield "Waiting for MWM Builder"
+        yield from mwm_queue.wait()
+        finished = True
 
+    finally:
         context.window.scene = original_scene
-        context.area.type = current_area
+        if context.area is not None:
+            context.area.type = current_area
+
+        if not finished:
+            mwm_queue.cancel()
+
+    mwm_results = mwm_queue.finish(self, context)
+    for scene_name, success in mwm_results.items():
+        if not success and scene_name not in failed_scenes:
+            failed_scenes.add(scene_name)
+            seut_report(self, context, 'ERROR', True, 'E016', scene_name)
 
-        seut_report(self, context, 'INFO', True, 'I008', scene_counter - failed_counter, scene_counter)
+    seut_report(self, context, 'INFO', True, 'I008', scene_counter - len(failed_scenes), scene_counter)
 
-        return {'FINISHED'}
\ No newline at end of file
+    return {'FINISHED'}
@@ -4,12 +4,17 @@ import time
 
 from bpy.types  import Operator
 
-from ..utils.seut_tool_utils        import *
+from concurrent.futures             import wait
+
+from ..utils.seut_tool_utils        import call_tool, call_tool_threaded, start_tools, collect_tool_results, kill_tool_group, get_tool_dir, ToolGroup
 from ..seut_text                    import supported_image_types
 from ..seut_errors                  import seut_report, get_abs_path
 from ..seut_utils                   import create_relative_path, get_preferences, get_seut_blend_data
 
 
+# Files per texconv call. Kept low enough to stay well below the Windows command line length limit.
+TEXCONV_BATCH_SIZE = 50
+
 presets = {
     "icon": [None, None, '-ft', 'DDS', '-f', 'BC7_UNORM_SRGB', '-pmalpha', '-sRGB', '-y', '-o', None],
     "cm": [None, None, '-ft', 'DDS', '-f', 'BC7_UNORM_SRGB', '-sepalpha', '-sRGB', '-y', '-o', None],
@@ -99,7 +104,7 @@ class SEUT_OT_ConvertTextures(Operator):
 
 
 class SEUT_OT_MassConvertTextures(Operator):
-    """Mass converts DDS textures to TIF.\nWARNING: This can lock up Blender for up to 30min for a full conversion"""
+    """Mass converts DDS textures to TIF.\nA full conversion can take up to 30min. Press Esc to cancel it"""
     bl_idname = "wm.mass_convert_textures"
     bl_label = "Update Textures from Game Files"
     bl_options = {'REGISTER', 'UNDO'}
@@ -114,40 +119,120 @@ class SEUT_OT_MassConvertTextures(Operator):
     def execute(self, context):
 
         data = get_seut_blend_data()
-        preferences = get_preferences()
-        target_dir = os.path.join(preferences.asset_path, 'Textures')
-
-        dirs_to_convert = [
-            "Models/Cubes",
-            "Models/Cubes/armor",
-            "Models/Cubes/Damaged",
-            "Models/Cubes/lods",
-            "Models/Physical_item",
-            "Models/Debris",
-            "Models/Characters/Astronaut",
-            "Models/Characters/Plushie",
-            "Models/Environment/Bushes",
-            "Models/Environment/Grass",
-            "Models/Environment/Trees",
-            "Models/Environment/Props",
-            "Models/Environment/SafeZone",
-            "Models/Weapons",
-            "Models/Debug",
-            "Particles"
-        ]
-
-        skip_list = ['_de.', '_ns.', '_me.']
-
-        for d in range(0, len(dirs_to_convert)):
-            dirs_to_convert[d] = os.path.join(preferences.game_path, 'Content', 'Textures', dirs_to_convert[d])
+        dirs_to_convert, target_dir, skip_list = get_game_texture_dirs()
 
         result = mass_convert_textures(self, context, dirs_to_convert, target_dir, data.seut.setup_conversion_filetype.lower(), skip_list=skip_list, log_to_file=True, can_report=True)
 
         return result
 
 
+    def invoke(self, context, event):
+        """Converts the textures in the background, keeping Blender responsive"""
+
+        data = get_seut_blend_data()
+        dirs_to_convert, target_dir, skip_list = get_game_texture_dirs()
+        preset = data.seut.setup_conversion_filetype.lower()
+
+        self.conversion = get_texture_batches(dirs_to_convert, target_dir, preset, skip_list=skip_list)
+        if self.conversion['total'] == 0:
+            seut_report(self, context, 'INFO', True, 'I003')
+            return {'FINISHED'}
+
+        self.logfile = os.path.join(target_dir, 'conversion.log')
+        self.start_time = time.time()
+        # Only this conversion's tools are killed on Esc, an export running at the same time carries on.
+        self.tools = ToolGroup()
+        self.futures = start_tools(self.conversion['commands'], group=self.tools)
+
+        self.timer = context.window_manager.event_timer_add(0.5, window=context.window)
+        context.window_manager.modal_handler_add(self)
+
+        return {'RUNNING_MODAL'}
+
+
+    def modal(self, context, event):
+
+        if event.type == 'ESC' and event.value == 'PRESS':
+            kill_tool_group(self.tools)
+            wait(self.futures)
+            self.end(context)
+            seut_report(self, context, 'WARNING', True, 'W027')
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        done = sum(1 for f in self.futures if f.done())
+        if done < len(self.futures):
+            context.workspace.status_text_set(f"SEUT: Converting textures ({done}/{len(self.futures)} batches). Press Esc to cancel.")
+            return {'PASS_THROUGH'}
+
+        self.end(context)
+        results = collect_tool_results(self.futures, self.logfile)
+        return report_texture_conversion(self, context, results, self.conversion, self.start_time, can_report=True)
+
+
+    def end(self, context):
+        context.window_manager.event_timer_remove(self.timer)
+        context.workspace.status_text_set(None)
+
+
+def get_game_texture_dirs() -> tuple:
+    """Returns the game's texture directories to convert, the directory to convert them to and the files to skip."""
+
+    preferences = get_preferences()
+    target_dir = os.path.join(preferences.asset_path, 'Textures')
+
+    dirs_to_convert = [
+        "Models/Cubes",
+        "Models/Cubes/armor",
+        "Models/Cubes/Damaged",
+        "Models/Cubes/lods",
+        "Models/Physical_item",
+        "Models/Debris",
+        "Models/Characters/Astronaut",
+        "Models/Characters/Plushie",
+        "Models/Environment/Bushes",
+        "Models/Environment/Grass",
+        "Models/Environment/Trees",
+        "Models/Environment/Props",
+        "Models/Environment/SafeZone",
+        "Models/Weapons",
+        "Models/Debug",
+        "Particles"
+    ]
+
+    skip_list = ['_de.', '_ns.', '_me.']
+
+    for d in range(0, len(dirs_to_convert)):
+        dirs_to_convert[d] = os.path.join(preferences.game_path, 'Content', 'Textures', dirs_to_convert[d])
+
+    return dirs_to_convert, target_dir, skip_list
+
+
 def mass_convert_textures(self, context, dirs: list, target_dir: str, preset: str, settings: list = [], skip_list: list = [], log_to_file=False, can_report=False):
 
+    conversion = get_texture_batches(dirs, target_dir, preset, settings, skip_list)
+
+    if conversion['total'] > 0:
+        if log_to_file:
+            logfile = os.path.join(target_dir, 'conversion.log')
+        else:
+            logfile = None
+
+        timer = time.time()
+        results = call_tool_threaded(conversion['commands'], logfile)
+        return report_texture_conversion(self, context, results, conversion, timer, can_report)
+
+    else:
+        seut_report(self, context, 'INFO', can_report, 'I003')
+
+    return {'FINISHED'}
+
+
+def get_texture_batches(dirs: list, target_dir: str, preset: str, settings: list = [], skip_list: list = []) -> dict:
+    """Returns the texconv calls to convert the outdated textures in the directories and the files each of them converts."""
+
     if preset == 'custom':
         idx_ft = settings.index('-ft')
         output_type = settings[idx_ft + 1]
@@ -184,45 +269,51 @@ def mass_convert_textures(self, context, dirs: list, target_dir: str, preset: st
                 if not os.path.exists(target) or os.path.getmtime(source) > os.path.getmtime(target):
                     files_to_convert.append([os.path.join(tex_dir, file), target])
 
-    commands = []
+    # texconv accepts many files per call, so files sharing an output directory are converted in batches.
+    batches = {}
     for tex in files_to_convert:
-        os.makedirs(os.path.dirname(tex[1]), exist_ok=True)
-        commands.append(get_conversion_args(preset, tex[0], os.path.dirname(tex[1]), settings))
+        batches.setdefault(os.path.dirname(tex[1]), []).append(tex)
 
-    total = len(files_to_convert)
-    if total > 0:
-        if log_to_file:
-            logfile = os.path.join(target_dir, 'conversion.log')
-        else:
-            logfile = None
-
-        timer = time.time()
-        results = []
-        results = call_tool_threaded(commands, 25, logfile)
-        duration = time.time() - timer
-
-        converted = 0
-        for r in results:
-            idx_o = r[2].index('-o')
-            target_file = os.path.join(r[2][idx_o + 1], os.path.splitext(os.path.basename(r[2][1]))[0] + '.' + output_type)
-            if r[0] == 0:
+    commands = []
+    command_files = []
+    for output_dir, textures in batches.items():
+        os.makedirs(output_dir, exist_ok=True)
+        for i in range(0, len(textures), TEXCONV_BATCH_SIZE):
+            batch = textures[i:i + TEXCONV_BATCH_SIZE]
+            commands.append(get_conversion_args(preset, [tex[0] for tex in batch], output_dir, settings))
+            command_files.append(batch)
+
+    return {
+        'commands': commands,
+        'files': command_files,
+        'total': len(files_to_convert),
+    }
+
+
+def report_texture_conversion(self, context, results: list, conversion: dict, timer: float, can_report=False):
+    """Reports the results of the texconv calls of get_texture_batches."""
+
+    total = conversion['total']
+    duration = time.time() - timer
+
+    converted = 0
+    for r, batch in zip(results, conversion['files']):
+        for (source, target_file), returncode, out in split_batch_result(r, batch, timer):
+            if returncode == 0:
                 converted += 1
                 print(f"OK    - {target_file}")
             else:
                 print(f"ERROR - {target_file}")
-                print(r[1])
+                print(out)
 
-        if converted == 0:
-            return {'CANCELLED'}
-
-        elif duration > 60:
-            m, s = divmod(duration, 60)
-            seut_report(self, context, 'INFO', can_report, 'I009', f"{converted}/{total}", f" in {m}m {round(s, 1)}s")
-        else:
-            seut_report(self, context, 'INFO', can_report, 'I009', f"{converted}/{total}", f" in {round(duration, 1)}s")
+    if converted == 0:
+        return {'CANCELLED'}
 
+    elif duration > 60:
+        m, s = divmod(duration, 60)
+        seut_report(self, context, 'INFO', can_report, 'I009', f"{converted}/{total}", f" in {m}m {round(s, 1)}s")
     else:
-        seut_report(self, context, 'INFO', can_report, 'I003')
+        seut_report(self, context, 'INFO', can_report, 'I009', f"{converted}/{total}", f" in {round(duration, 1)}s")
 
     return {'FINISHED'}
 
@@ -243,17 +334,54 @@ def convert_texture(path_in: str, path_out: str, preset: str, settings=[]):
         return result
 
 
-def get_conversion_args(preset: str, path_in: str, path_out: str, settings=[]) -> list:
+def split_batch_result(result: list, batch: list, start_time: float) -> list:
+    """Splits the result of a texconv call into one result per converted file."""
+
+    if result is None:
+        return [(tex, 1, "None") for tex in batch]
+
+    returncode = result[0]
+    out = result[1].decode("utf-8", "ignore") if result[1] is not None else ""
+
+    # texconv reports each input file on a line starting with "reading", in the order they were passed.
+    chunks = []
+    for line in out.splitlines():
+        if line.startswith('reading ') or chunks == []:
+            chunks.append(line)
+        else:
+            chunks[-1] += '\n' + line
+
+    if len(chunks) > 0 and not chunks[0].startswith('reading '):
+        chunks.pop(0)
+
+    file_results = []
+    for idx, tex in enumerate(batch):
+        chunk = chunks[idx] if idx < len(chunks) else out
+        target_written = os.path.exists(tex[1]) and os.path.getmtime(tex[1]) >= start_time - 1
+
+        if returncode == 0 or (target_written and chunk.find("FAILED") == -1):
+            file_results.append((tex, 0, chunk))
+        else:
+            file_results.append((tex, returncode if returncode != 0 else 1, chunk))
+
+    return file_results
+
+
+def get_conversion_args(preset: str, path_in, path_out: str, settings=[]) -> list:
+    """Returns the texconv arguments to convert one or more files (if path_in is a list) to path_out."""
+
+    if isinstance(path_in, list):
+        paths_in = path_in
+    else:
+        paths_in = [path_in]
 
-    args = list(presets[preset])
-    args[0] = os.path.join(get_tool_dir(), 'texconv.exe')
-    args[1] = path_in
+    args = [os.path.join(get_tool_dir(), 'texconv.exe')] + paths_in + list(presets[preset][2:])
     args[len(args) - 1] = path_out
 
     if preset == 'custom' and settings != []:
-        pos = 2
+        pos = 1 + len(paths_in)
         for i in settings:
             args.insert(pos, i)
             pos += 1
 
-    return list(args)
\ No newline at end of file
+    return list(args)
@@ -0,0 +1,35 @@
+"""Command line entry point to export with SEUT without the Blender UI:
+
+    blender -b --python <SEUT directory>/seut_batch.py -- [--scene NAME] [--report FILE] [file.blend ...]
+
+See export/seut_batch_export.py for details."""
+
+import os
+import sys
+import importlib
+import addon_utils
+
+
+def get_addon_module_name() -> str:
+    """Returns the module name SEUT is installed under, as it depends on the installation."""
+
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+
+    for mod in addon_utils.modules():
+        if os.path.dirname(os.path.abspath(mod.__file__)) == addon_dir:
+            return mod.__name__
+
+    return None
+
+
+if __name__ == "__main__":
+    module_name = get_addon_module_name()
+    if module_name is None:
+        print("SEUT: This script must be run from the installed SEUT addon directory.")
+        sys.exit(2)
+
+    if not addon_utils.check(module_name)[1]:
+        addon_utils.enable(module_name)
+
+    batch_export = importlib.import_module(f"{module_name}.export.seut_batch_export")
+    sys.exit(batch_export.main())
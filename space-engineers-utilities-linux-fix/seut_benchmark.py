@@ -0,0 +1,26 @@
+"""Command line entry point to benchmark the SEUT export with synthetic scenes and stand-in tools:
+
+    blender -b --python <SEUT directory>/seut_benchmark.py -- [--repeat N] [--report FILE] [--baseline FILE] ...
+
+See benchmark/seut_benchmark.py for details."""
+
+import os
+import sys
+import importlib
+import addon_utils
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from seut_batch import get_addon_module_name
+
+
+if __name__ == "__main__":
+    module_name = get_addon_module_name()
+    if module_name is None:
+        print("SEUT: This script must be run from the installed SEUT addon directory.")
+        sys.exit(2)
+
+    if not addon_utils.check(module_name)[1]:
+        addon_utils.enable(module_name)
+
+    benchmark = importlib.import_module(f"{module_name}.benchmark.seut_benchmark")
+    sys.exit(benchmark.main())
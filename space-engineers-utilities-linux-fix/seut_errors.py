@@ -3,13 +3,18 @@ import sys
 import io
 import os
 import time
-
-from mathutils  import Vector
+import numpy as np
 
 
 log = io.StringIO()
 previous_message = ""
 
+# Functions called with (issue_type, text, code, reference) whenever an issue is added, e.g. to collect them during a batch export.
+issue_listeners = []
+
+# UV islands covering less than this area, as a fraction of the UV square, are considered degenerate.
+UV_AREA_EPSILON = 1e-10
+
 errors = {
     'E001': "Import error. Imported object not found.",
     'E002': "Collection {variable_1} not found, excluded from view layer or empty. Action not possible.",
@@ -66,6 +71,12 @@ errors = {
     'E053': "Material '{variable_1}' contains invalid node tree. Custom node trees are not supported by Space Engineers - all changes to a material must be made by altering its texture files.",
     'E054': "The rigid body of collision object '{variable_1}' in collection {variable_2} is set to an unsupported collision shape (COMPOUND).",
     'E055': "An external collision file has been linked to '{variable_1}' but that collision collection also contains objects. It is not possible to use both at the same time.",
+    'E056': "Export failed with an unexpected error: {variable_1}",
+    'E057': "FBX file '{variable_1}' could not be written: {variable_2}",
+    'E058': "{variable_1} was stopped early because it reported an error. Please refer to the logs in your export folder (to generate, disable 'Delete Temp Files') for details.",
+    'E059': "MWM Builder failed to build model '{variable_1}': {variable_2}",
+    'E060': "Export was cancelled because {variable_1} while it was running. Files that were already written have been kept.",
+    'E061': "Collision '{variable_1}' could not be converted to HKT by {variable_2}: {variable_3} The model is exported without collision.",
 }
 
 warnings = {
@@ -89,6 +100,14 @@ warnings = {
     'W018': "Nonstandard bones detected: {variable_1}. You may need to alter the Animation Controller for them to work as intended.",
     'W019': "Material '{variable_1}' has a linked '{variable_2}'-texture but the material technique '{variable_3}' does not support it.",
     'W020': "Scene '{variable_1}' is set to a different grid size than its export size and contains a subpart empty '{variable_2}'. Subpart empties do not support export to a different grid size.",
+    'W021': "Export was cancelled. Files that were already written have been kept.",
+    'W022': "Object '{variable_1}' has {variable_2} of {variable_3} UV islands with zero area. Textures will not display correctly on them ingame.",
+    'W023': "MWM Builder logged {variable_1} warning(s) for model '{variable_2}'. See '{variable_3}' for details.",
+    'W024': "Model '{variable_1}' references texture(s) that could not be found: {variable_2}",
+    'W025': "Model '{variable_1}' references material(s) that are not defined: {variable_2}",
+    'W026': "BS collection '{variable_1}' has no collision of its own and the collision of '{variable_2}' could not be found. It is exported without collision.",
+    'W027': "Texture conversion was cancelled. Textures that were already converted have been kept.",
+    'W028': "Object '{variable_1}' has {variable_2} vertex weight(s) above 1.0. They have been set to 1.0.",
 }
 
 infos = {
@@ -114,6 +133,7 @@ infos = {
     'I020': "The import of {variable_1} materials was skipped because they already exist in the BLEND file: {variable_2}",
     'I021': "{variable_1} of {variable_2} files successfully imported. Refer to Blender System Console for details.",
     'I022': "Export of collision collection '{variable_1}' was skipped because the collection is not attached to the main or a BS collection.",
+    'I023': "Scene '{variable_1}' has not changed since its last export. MWM compilation was skipped.",
 }
 
 
@@ -207,6 +227,70 @@ def check_collection_excluded(scene, collection) -> bool:
     return False
 
 
+def get_loop_topology(mesh) -> tuple:
+    """Returns the face of every loop and the loop following it within its face, which holds the other end of its edge."""
+
+    face_count = len(mesh.polygons)
+
+    loop_starts = np.empty(face_count, dtype=np.int64)
+    loop_totals = np.empty(face_count, dtype=np.int64)
+    mesh.polygons.foreach_get('loop_start', loop_starts)
+    mesh.polygons.foreach_get('loop_total', loop_totals)
+
+    # The loops of a face are stored consecutively, in the order of the faces.
+    loop_faces = np.repeat(np.arange(face_count), loop_totals)
+
+    next_loops = np.arange(len(mesh.loops)) + 1
+    next_loops[loop_starts + loop_totals - 1] = loop_starts
+
+    return loop_faces, next_loops
+
+
+def get_uv_islands(mesh, uvs, loop_faces, next_loops) -> tuple:
+    """Returns the UV island index of every face and the number of islands. Faces are in the same island if they share an edge whose UVs match on both sides."""
+
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int64)
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get('vertex_index', loop_verts)
+    mesh.loops.foreach_get('edge_index', loop_edges)
+
+    # Orders the ends of every edge by vertex, so both loops of a shared edge describe it the same way.
+    first_is_min = (loop_verts <= loop_verts[next_loops])[:, None]
+    uv_min = np.where(first_is_min, uvs, uvs[next_loops])
+    uv_max = np.where(first_is_min, uvs[next_loops], uvs)
+
+    keys = np.column_stack((loop_edges, np.round(uv_min, 6), np.round(uv_max, 6)))
+    order = np.lexsort(keys.T[::-1])
+    same = np.all(keys[order[1:]] == keys[order[:-1]], axis=1)
+    a = loop_faces[order[1:]][same]
+    b = loop_faces[order[:-1]][same]
+
+    # Connected components, by repeatedly linking each face to the lowest face index it is connected to.
+    labels = np.arange(len(mesh.polygons))
+    while True:
+        lowest = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, lowest)
+        np.minimum.at(updated, b, lowest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    islands, labels = np.unique(labels, return_inverse=True)
+
+    return labels, len(islands)
+
+
+def get_uv_face_areas(uvs, loop_faces, next_loops, face_count: int) -> np.ndarray:
+    """Returns the area every face covers in UV space."""
+
+    # Shoelace formula, summed per face.
+    cross = uvs[:, 0] * uvs[next_loops, 1] - uvs[next_loops, 0] * uvs[:, 1]
+
+    return np.abs(np.bincount(loop_faces, weights=cross, minlength=face_count)) / 2
+
+
 def check_uvms(self, context, obj):
     """Checks whether object has UV layers"""
 
@@ -216,28 +300,79 @@ def check_uvms(self, context, obj):
             seut_report(self, context, 'ERROR', True, 'E032', obj.name)
             return {'CANCELLED'}
 
-        at_zero = 0
-        obj_total = len(obj.data.uv_layers.active.data)
-        for loop in obj.data.loops:
-            uv = obj.data.uv_layers.active.data[loop.index].uv
-            if uv == Vector((0.0, 0.0)):
-                at_zero += 1
+        mesh = obj.data
+        obj_total = len(mesh.uv_layers.active.data)
 
         if obj_total <= 0:
             seut_report(self, context, 'WARNING', False, 'W013', obj.name)
             return {'CONTINUE'}
 
+        uvs = np.empty(obj_total * 2, dtype=np.float32)
+        mesh.uv_layers.active.data.foreach_get('uv', uvs)
+        uvs = uvs.reshape(-1, 2)
+
+        at_zero = int(np.count_nonzero(np.all(uvs == 0.0, axis=1)))
+
         if (at_zero / obj_total) > 0.25 and at_zero > 10:
             seut_report(self, context, 'ERROR', True, 'E042', obj.name, at_zero, obj_total)
             return {'CANCELLED'}
         elif (at_zero / obj_total) > 0.005 and at_zero > 10:
             seut_report(self, context, 'WARNING', True, 'W002', obj.name)
 
+        if len(mesh.polygons) > 0:
+            uvs = uvs.astype(np.float64)
+            loop_faces, next_loops = get_loop_topology(mesh)
+            face_areas = get_uv_face_areas(uvs, loop_faces, next_loops, len(mesh.polygons))
+
+            # An island only has no area if none of its faces have any, so the islands are only found if there are such faces.
+            if np.any(face_areas < UV_AREA_EPSILON):
+                labels, island_count = get_uv_islands(mesh, uvs, loop_faces, next_loops)
+                island_areas = np.bincount(labels, weights=face_areas, minlength=island_count)
+                degenerate = int(np.count_nonzero(island_areas < UV_AREA_EPSILON))
+                if degenerate > 0:
+                    seut_report(self, context, 'WARNING', True, 'W022', obj.name, degenerate, island_count)
+
     return {'CONTINUE'}
 
 
+def get_vertex_weights(mesh) -> tuple:
+    """Reads the deform weights of all vertices in one pass. Returns the vertex, group and weight of every assignment."""
+
+    # Blender has no bulk access to vertex group assignments, so they are flattened once and analysed with NumPy.
+    vertex_groups = [v.groups for v in mesh.vertices]
+    counts = np.fromiter((len(g) for g in vertex_groups), dtype=np.int64, count=len(vertex_groups))
+    assignments = [(g.group, g.weight) for groups in vertex_groups for g in groups]
+
+    vertices = np.repeat(np.arange(len(vertex_groups)), counts)
+    if len(assignments) == 0:
+        return vertices, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    groups, weights = np.array(assignments, dtype=np.float64).T
+
+    return vertices, groups.astype(np.int64), weights
+
+
+def set_marker_group(obj, name: str, marked: np.ndarray) -> bool:
+    """Makes the vertex group contain exactly the marked vertices. Creates it if needed and removes it if empty. Returns whether any vertex is marked."""
+
+    grp = obj.vertex_groups.get(name)
+
+    if not marked.any():
+        if grp is not None:
+            obj.vertex_groups.remove(grp)
+        return False
+
+    if grp is None:
+        grp = obj.vertex_groups.new(name=name)
+
+    grp.remove(np.flatnonzero(~marked).tolist())
+    grp.add(np.flatnonzero(marked).tolist(), 0.0, 'ADD')
+
+    return True
+
+
 def check_weights(context, obj):
-    """Checks an object's vertices for missing weight painting. Returns True if all good, False if issue, None if invalid object."""
+    """Checks an object's vertices for missing weight painting. Weights above 1 are clamped and reported. Returns True if all good, False if issue, None if invalid object."""
 
     if obj.type != 'MESH':
         return None
@@ -245,49 +380,36 @@ def check_weights(context, obj):
     if obj is None or obj.data is None or obj.data.vertices is None or len(obj.data.vertices) <= 0:
         return None
 
-    ungrouped = False
-    weightless = False
     grp_ungrouped = "Problematic - Ungrouped"
     grp_weightless = "Problematic - Unweighted"
-    for v in obj.data.vertices:
-
-        if len(v.groups) == 0 or len(v.groups) == 1 and obj.vertex_groups[v.groups[0].group].name in [grp_ungrouped, grp_weightless]:
-            if grp_ungrouped in obj.vertex_groups:
-                grp = obj.vertex_groups[grp_ungrouped]
-            else:
-                grp = obj.vertex_groups.new(name=grp_ungrouped)
-            grp.add([v.index], 0.0, 'ADD')
-            ungrouped = True
-        else:
-            if any(obj.vertex_groups[x.group].name == grp_ungrouped for x in v.groups):
-                obj.vertex_groups[grp_ungrouped].remove([v.index])
-
-
-        total_weight = 0
-        for g in v.groups:
-            total_weight += g.weight
-
-        if total_weight == 0:
-            if grp_weightless in obj.vertex_groups:
-                grp = obj.vertex_groups[grp_weightless]
-            else:
-                grp = obj.vertex_groups.new(name=grp_weightless)
-            grp.add([v.index], 0.0, 'ADD')
-            weightless = True
-        else:
-            if any(obj.vertex_groups[x.group].name == grp_weightless for x in v.groups):
-                obj.vertex_groups[grp_weightless].remove([v.index])
-
-
-    if grp_ungrouped in obj.vertex_groups and len([v for v in obj.data.vertices if obj.vertex_groups[grp_ungrouped].index in [vg.group for vg in v.groups]]) == 0:
-        obj.vertex_groups.remove(obj.vertex_groups[grp_ungrouped])
-    if grp_weightless in obj.vertex_groups and len([v for v in obj.data.vertices if obj.vertex_groups[grp_weightless].index in [vg.group for vg in v.groups]]) == 0:
-        obj.vertex_groups.remove(obj.vertex_groups[grp_weightless])
-
-    if grp_ungrouped in obj.vertex_groups and ungrouped:
+    mesh = obj.data
+    vertex_count = len(mesh.vertices)
+
+    vertices, groups, weights = get_vertex_weights(mesh)
+
+    # Weights above 1 cause issues ingame. Assignments are ordered by vertex, so the first one of a vertex gives the position within it.
+    over = np.flatnonzero(weights > 1.0)
+    for idx, position in zip(over, over - np.searchsorted(vertices, vertices[over])):
+        mesh.vertices[int(vertices[idx])].groups[int(position)].weight = 1.0
+    weights = np.minimum(weights, 1.0)
+
+    if len(over) > 0:
+        seut_report(None, context, 'WARNING', True, 'W028', obj.name, len(over))
+
+    # The marker groups of a previous check do not count as groups.
+    markers = [grp.index for grp in obj.vertex_groups if grp.name in [grp_ungrouped, grp_weightless]]
+    is_real = ~np.isin(groups, markers)
+
+    ungrouped = np.bincount(vertices[is_real], minlength=vertex_count) == 0
+    weightless = np.bincount(vertices, weights=weights, minlength=vertex_count) == 0
+
+    ungrouped = set_marker_group(obj, grp_ungrouped, ungrouped)
+    weightless = set_marker_group(obj, grp_weightless, weightless)
+
+    if ungrouped:
         seut_report(None, context, 'ERROR', True, 'E051', obj.name, f"Vertex is not grouped in vertex group. Added to vertex group '{grp_ungrouped}'.")
         return False
-    if grp_weightless in obj.vertex_groups and weightless:
+    if weightless:
         seut_report(None, context, 'ERROR', True, 'E051', obj.name, f"One or multiple vertices are not weight-painted. Added to vertex group '{grp_weightless}'.")
         return False
 
@@ -309,6 +431,9 @@ def show_popup_report(context, title, text: str):
     def draw(self, context):
         self.layout.label(text=text)
 
+    if context.window is None:
+        return
+
     context.window_manager.popup_menu(draw, title=title, icon='ERROR')
 
 
@@ -376,6 +501,9 @@ def add_to_issues(context, issue_type: str, text: str, code: str, reference: str
     if issue_type == 'ERROR':
         data.seut.issue_alert = True
 
+    for listener in issue_listeners:
+        listener(issue_type, text, code, reference)
+
 
 def init_logging():
     """Duplicates output to a global variable for saving to a log file"""
@@ -0,0 +1,218 @@
+"""Exports many BLEND files in parallel by distributing them across multiple headless Blender instances.
+Unlike seut_batch.py, this is run with a regular Python 3 interpreter, not from within Blender:
+
+    python3 seut_farm.py [--blender PATH] [--workers N] [--scene NAME] [--report FILE] [--log-dir DIR] file.blend ...
+
+Each worker runs seut_batch.py on its share of the files. Their reports and logs are merged into one.
+The exit code is 0 if all scenes were exported successfully, 1 if any failed and 2 if the arguments were invalid."""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+
+EXIT_SUCCESS = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+BATCH_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seut_batch.py')
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="seut_farm.py", description="Exports BLEND files with SEUT in multiple Blender instances.")
+    parser.add_argument('files', nargs='+', help="BLEND files to export.")
+    parser.add_argument('-b', '--blender', default=os.environ.get('BLENDER', 'blender'), help="Blender executable. Defaults to $BLENDER or 'blender'.")
+    parser.add_argument('-w', '--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Number of Blender instances. Defaults to half the CPU count.")
+    parser.add_argument('-s', '--scene', action='append', dest='scenes', default=[], help="Name of a scene to export. Can be repeated. Defaults to all scenes.")
+    parser.add_argument('-r', '--report', help="Path of a JSON file to write the merged summary to.")
+    parser.add_argument('-l', '--log-dir', help="Directory for the worker logs and reports. Defaults to a temporary directory.")
+    parser.add_argument('-t', '--timeout', type=float, default=None, help="Seconds after which a worker is killed.")
+
+    return parser
+
+
+def distribute_files(files: list, worker_count: int) -> list:
+    """Splits the files into one list per worker, so that each worker gets about the same amount of data."""
+
+    shares = [[] for i in range(worker_count)]
+    sizes = [0] * worker_count
+
+    # Largest files first, each to the worker with the least data so far.
+    for f in sorted(files, key=os.path.getsize, reverse=True):
+        idx = sizes.index(min(sizes))
+        shares[idx].append(f)
+        sizes[idx] += os.path.getsize(f)
+
+    return [share for share in shares if share != []]
+
+
+class Worker:
+    """A headless Blender instance exporting a share of the files."""
+
+    def __init__(self, index: int, blender: str, files: list, scenes: list, log_dir: str, tool_workers: int):
+        self.index = index
+        self.files = files
+        self.log_path = os.path.join(log_dir, f"worker_{index}.log")
+        self.report_path = os.path.join(log_dir, f"worker_{index}.json")
+
+        self.cmdline = [blender, '-b', '--python', BATCH_SCRIPT, '--', '--report', self.report_path]
+        for scene in scenes:
+            self.cmdline += ['--scene', scene]
+        self.cmdline += files
+
+        self.env = os.environ.copy()
+        self.env['SEUT_TOOL_WORKERS'] = str(tool_workers)
+        self.env['SEUT_MWMB_WORKERS'] = str(tool_workers)
+
+        self.process = None
+        self.log = None
+        self.start_time = None
+        self.duration = None
+
+
+    def start(self):
+        if os.path.exists(self.report_path):
+            os.remove(self.report_path)
+
+        self.log = open(self.log_path, 'wb')
+        self.start_time = time.time()
+        self.process = subprocess.Popen(self.cmdline, env=self.env, stdout=self.log, stderr=subprocess.STDOUT)
+
+
+    def poll(self, timeout: float = None) -> bool:
+        """Returns True once the worker has exited. Kills it if it exceeded the timeout."""
+
+        if self.process.poll() is None:
+            if timeout is None or time.time() - self.start_time < timeout:
+                return False
+
+            print(f"SEUT Farm: Worker {self.index} timed out after {timeout}s and is killed.")
+            self.process.kill()
+            self.process.wait()
+
+        if self.duration is None:
+            self.duration = round(time.time() - self.start_time, 3)
+            self.log.close()
+
+        return True
+
+
+    def get_result(self) -> dict:
+        """Returns the worker's report. If it did not write one, all of its files are considered failed."""
+
+        if os.path.isfile(self.report_path):
+            try:
+                with open(self.report_path, 'r') as report_file:
+                    return json.load(report_file)
+            except (OSError, ValueError):
+                pass
+
+        error = f"Worker {self.index} exited with code {self.process.returncode} without a report. See {self.log_path}."
+        return {
+            'success': False,
+            'scenes': [{'file': f, 'scene': None, 'success': False, 'error': error, 'issues': []} for f in self.files],
+        }
+
+
+def merge_logs(workers: list, path: str):
+    with open(path, 'wb') as merged:
+        for worker in workers:
+            merged.write(f"============================== Worker {worker.index}: {', '.join(worker.files)}\n".encode('utf-8'))
+            if os.path.isfile(worker.log_path):
+                with open(worker.log_path, 'rb') as log:
+                    merged.write(log.read())
+            merged.write(b"\n")
+
+
+def main(argv: list = None) -> int:
+    """Runs the farm and returns its exit code."""
+
+    parser = get_argument_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit:
+        return EXIT_USAGE
+
+    files = [os.path.abspath(f) for f in args.files]
+    for f in files:
+        if not os.path.isfile(f):
+            print(f"SEUT Farm: BLEND file '{f}' does not exist.")
+            return EXIT_USAGE
+
+    log_dir = args.log_dir if args.log_dir is not None else tempfile.mkdtemp(prefix="seut_farm_")
+    os.makedirs(log_dir, exist_ok=True)
+
+    shares = distribute_files(files, max(1, args.workers))
+
+    # Split the cores among the workers' tool pools, which also run their MWM Builder invocations.
+    tool_workers = max(1, (os.cpu_count() or 2) // len(shares))
+
+    workers = [Worker(idx, args.blender, share, args.scenes, log_dir, tool_workers) for idx, share in enumerate(shares)]
+
+    start = time.time()
+    for worker in workers:
+        print(f"SEUT Farm: Starting worker {worker.index} with {len(worker.files)} file(s).")
+        worker.start()
+
+    running = list(workers)
+    while running != []:
+        for worker in list(running):
+            if worker.poll(args.timeout):
+                running.remove(worker)
+                print(f"SEUT Farm: Worker {worker.index} finished with exit code {worker.process.returncode} in {worker.duration}s.")
+        time.sleep(0.5)
+
+    entries = []
+    worker_summaries = []
+    for worker in workers:
+        result = worker.get_result()
+        entries += result.get('scenes', [])
+        worker_summaries.append({
+            'index': worker.index,
+            'files': worker.files,
+            'exit_code': worker.process.returncode,
+            'duration': worker.duration,
+            'log': worker.log_path,
+        })
+
+    # Each worker reports scenes it did not find in its own files, which may have been exported by another worker.
+    found = set(e['scene'] for e in entries if e.get('file') is not None)
+    missing = set()
+    for entry in list(entries):
+        if entry.get('file') is None and entry.get('scene') is not None:
+            if entry['scene'] in found or entry['scene'] in missing:
+                entries.remove(entry)
+            else:
+                missing.add(entry['scene'])
+
+    merged_log = os.path.join(log_dir, 'farm.log')
+    merge_logs(workers, merged_log)
+
+    summary = {
+        'success': len(entries) > 0 and all(e['success'] for e in entries),
+        'exported': len([e for e in entries if e['success']]),
+        'failed': len([e for e in entries if not e['success']]),
+        'duration': round(time.time() - start, 3),
+        'log': merged_log,
+        'workers': worker_summaries,
+        'scenes': entries,
+    }
+
+    report_path = args.report if args.report is not None else os.path.join(log_dir, 'farm.json')
+    with open(report_path, 'w') as report_file:
+        json.dump(summary, report_file, indent=4)
+
+    for entry in entries:
+        status = "OK    " if entry['success'] else "FAILED"
+        print(f"{status} - {entry.get('file')}: {entry.get('scene')}")
+    print(f"SEUT Farm: {summary['exported']} scene(s) exported, {summary['failed']} failed in {summary['duration']}s. Report: {report_path}")
+
+    return EXIT_SUCCESS if summary['success'] else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,8 @@ from .utils.seut_repositories       import *
 from .seut_errors                   import seut_report, get_abs_path
 from .seut_utils                    import get_preferences, get_addon, get_seut_blend_data, wrap_text
 from .seut_bau                      import draw_bau_ui, get_config, set_config
+from .utils.seut_wine               import update_wine_settings, DEFAULT_IDLE_TIMEOUT
+from .utils.seut_tool_runner        import update_tool_runner, RUNNER_ITEMS
 
 
 preview_collections = {}
@@ -217,6 +219,73 @@ class SEUT_AddonPreferences(AddonPreferences):
         description="SEUT import uses GLB as an intermediary format for import. If GLB files are not deleted, repeated import is quicker",
         default= True,
     )
+    export_trace: BoolProperty(
+        name="Write Export Trace",
+        description="Writes the duration of every export stage, FBX file and tool call to '<SubtypeId>.trace.json' in the export folder.\nOpen it in chrome://tracing or ui.perfetto.dev to see where time is spent",
+        default=False
+    )
+    fbx_background_write: BoolProperty(
+        name="Write FBX Files in Background",
+        description="Encodes and writes the FBX files in a background thread while the export continues with the next collection",
+        default=True
+    )
+    hkt_cache: BoolProperty(
+        name="Cache Collision",
+        description="Keeps converted HKT files in the user's cache directory and reuses them for collision that has not changed, instead of running FBXImporter and the Havok filter again",
+        default=True
+    )
+    tool_runner: EnumProperty(
+        name="Tool Runner",
+        description="How SEUT runs the external tools.\nRecord and Replay allow exports to be repeated on machines without the tools, e.g. to benchmark or test them",
+        items=RUNNER_ITEMS,
+        default='WINE',
+        update=update_tool_runner
+    )
+    tool_recordings_path: StringProperty(
+        name="Tool Recordings",
+        description="Folder the results of the tools are recorded to and replayed from. Defaults to a folder in the user's cache directory",
+        subtype='DIR_PATH',
+        update=update_tool_runner
+    )
+    tool_workers: IntProperty(
+        name="Tool Workers",
+        description="How many external tools SEUT runs at the same time, during the export as well as the texture conversion.\nSet to 0 to use the number of CPU cores",
+        default=0,
+        min=0,
+        max=256
+    )
+    tool_timeout: IntProperty(
+        name="Tool Timeout",
+        description="Stops an external tool that is still running after this many seconds, so a hanging tool cannot block the export.\nSet to 0 to never stop tools",
+        default=0,
+        min=0,
+        max=86400,
+        update=update_tool_runner
+    )
+    wine_idle_timeout: IntProperty(
+        name="Wine Server Idle Timeout",
+        description="SEUT keeps the Wine server running between tool calls to avoid a cold start for every call. It shuts down after this many seconds without any running tool.\nSet to 0 to start Wine anew for every call",
+        default=DEFAULT_IDLE_TIMEOUT,
+        min=0,
+        max=3600,
+        update=update_wine_settings
+    )
+    wine_prefix_count: IntProperty(
+        name="Wine Prefixes",
+        description="Tools running in parallel are spread across this many Wine prefixes, so they do not have to share a single Wine server.\nAdditional prefixes are cloned from the default prefix when first needed and stored in the user's cache directory. Each clone contains a copy of the prefix's Windows folder",
+        default=1,
+        min=1,
+        max=64,
+        update=update_wine_settings
+    )
+    wine_prefix_limit: IntProperty(
+        name="Tools per Wine Prefix",
+        description="Tools wait for a Wine prefix if this many are already running in every prefix.\nSet to 0 to let any number of tools share a prefix",
+        default=0,
+        min=0,
+        max=256,
+        update=update_wine_settings
+    )
 
     def draw(self, context):
         layout = self.layout
@@ -403,6 +472,22 @@ class SEUT_AddonPreferences(AddonPreferences):
         box = layout.box()
         box.label(text="External Tools", icon='TOOL_SETTINGS')
         box.prop(self, "havok_path", text="Havok Filter Manager", expand=True)
+        row = box.row()
+        row.prop(self, "export_trace")
+        row.prop(self, "fbx_background_write")
+        row.prop(self, "hkt_cache")
+        row = box.row()
+        row.prop(self, "tool_runner", expand=True)
+        if self.tool_runner in ['RECORD', 'REPLAY']:
+            box.prop(self, "tool_recordings_path", expand=True)
+        row = box.row()
+        row.prop(self, "tool_workers", text="Tool Workers (0 = CPU Cores)")
+        row.prop(self, "tool_timeout", text="Tool Timeout (s)")
+        if sys.platform != "win32":
+            row = box.row()
+            row.prop(self, "wine_idle_timeout", text="Wine Server Idle Timeout (s)")
+            row.prop(self, "wine_prefix_count", text="Wine Prefixes")
+            row.prop(self, "wine_prefix_limit", text="Tools per Prefix (0 = No Limit)")
 
         box0 = layout.box()
         box0.label(text="SEUT Panels", icon="META_PLANE")
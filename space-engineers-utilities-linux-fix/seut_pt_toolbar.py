@@ -7,6 +7,7 @@ from .utils.seut_patch_blend        import check_patch_needed
 from .seut_collections              import get_collections, seut_collections
 from .seut_utils                    import get_enum_items, wrap_text, get_seut_blend_data
 from .seut_preferences              import get_preferences
+from .export.seut_export_steps      import draw_export_progress
 
 
 def check_display_panels(context) -> bool:
@@ -429,6 +430,8 @@ class SEUT_PT_Panel_Export(Panel):
         data = get_seut_blend_data()
 
         # Export
+        draw_export_progress(layout)
+
         row = layout.row()
         row.scale_y = 2.0
         row.operator('scene.export_all_scenes', icon='EXPORT')
@@ -454,6 +457,8 @@ class SEUT_PT_Panel_Export(Panel):
         col.operator('scene.copy_export_options', text="", icon='PASTEDOWN')
 
         box.prop(scene.seut, "export_deleteLooseFiles", icon='TEMP')
+        if scene.seut.sceneType not in ['character', 'character_animation']:
+            box.prop(scene.seut, "export_incremental", icon='FILE_REFRESH')
         box.prop(data.seut, "convert_textures", icon='NODE_TEXTURE')
 
         if scene.seut.sceneType not in ['character', 'character_animation', 'item']:
@@ -632,6 +632,11 @@ class SEUT_Scene(PropertyGroup):
         description="Whether the temporary files should be deleted after the MWM has been created",
         default=True
     )
+    export_incremental: BoolProperty(
+        name="Incremental Export",
+        description="Skip collections that have not changed since the last export. Their MWM files from the previous export must still exist",
+        default=False
+    )
     export_largeGrid: BoolProperty(
         name="Large",
         description="Whether to export to large grid",
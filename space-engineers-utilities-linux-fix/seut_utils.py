@@ -194,6 +194,12 @@ def unlink_objects_in_hierarchy(obj):
     bpy.data.objects.remove(obj, do_unlink=True)
 
 
+def get_export_objects(collection) -> list:
+    """Returns the objects of a collection that are exported, which excludes the instances of subparts."""
+
+    return [obj for obj in collection.objects if obj is not None and not obj.seut.linked]
+
+
 def get_parent_collection(context, obj):
     scene = context.scene
     collections = get_collections(scene)
@@ -231,6 +237,11 @@ def get_preferences():
 def prep_context(context):
     """Prep context for doing larger alterations, returns previous area"""
 
+    # There is no area when running without UI.
+    if context.area is None:
+        clear_selection(context)
+        return None
+
     try:
         current_area = context.area.type
         context.area.type = 'VIEW_3D'
@@ -0,0 +1,456 @@
+import os
+import re
+import glob
+import json
+import shutil
+import hashlib
+import fnmatch
+import tempfile
+import threading
+import subprocess
+
+from abc                import ABC, abstractmethod
+
+from .seut_tool_utils   import run_tool_process, ToolAbortedError
+from .seut_wine         import wine_session
+from ..seut_utils       import get_preferences
+from ..seut_errors      import get_abs_path
+
+
+# All tools are run through a ToolRunner. Which one is used is set in the preferences or through SEUT_TOOL_RUNNER:
+#   WINE    Runs Windows tools with Wine, everything else directly.
+#   NATIVE  Runs a native build of a tool instead if one is found, e.g. a texconv port. Falls back to Wine.
+#   RECORD  Like NATIVE, but also stores the output and written files of every call under its inputs' hash.
+#   REPLAY  Serves the recordings of RECORD instead of running any tool. Calls without a recording fail.
+
+RUNNER_ITEMS = (
+    ('WINE', 'Wine', "Runs Windows tools with Wine"),
+    ('NATIVE', 'Native', "Runs native builds of the tools where available, otherwise Wine"),
+    ('RECORD', 'Record', "Runs the tools like Native and records their results"),
+    ('REPLAY', 'Replay', "Serves recorded results instead of running the tools"),
+)
+
+# Names of native builds of the tools, if they differ from the Windows tool's name without extension.
+NATIVE_TOOL_NAMES = {
+    'fbx2gltf-windows-x64': ['FBX2glTF-linux-x64', 'FBX2glTF'],
+}
+
+# Options whose following argument is a path the tool writes to. FBXImporter takes its target as second argument.
+OUTPUT_OPTIONS = ['-o', '-p']
+# Option of texconv that sets the file type of the files it writes to its output folder, and the default type.
+OUTPUT_TYPE_OPTION = '-ft'
+DEFAULT_OUTPUT_TYPE = 'dds'
+OUTPUT_ARGS = {
+    'fbximporter': [1],
+}
+
+RECORDING_VERSION = 1
+
+lock = threading.Lock()
+settings = {
+    'runner': None,
+}
+
+
+class ToolRunner(ABC):
+    """Runs the command lines of tools. Tools that are given no timeout are killed after the default timeout in seconds."""
+
+    timeout = None
+
+    @abstractmethod
+    def run(self, cmdline: list, cwd=None, log=None, fatal_patterns: list = None, on_line=None, on_start=None, timeout: float = None) -> tuple:
+        """Runs a tool like run_tool_process and returns its output and the command line that was run. on_start is called
+        with that command line before the tool starts. Raises CalledProcessError if the tool fails or runs longer than the
+        timeout in seconds."""
+
+
+class WineToolRunner(ToolRunner):
+
+    def run(self, cmdline: list, cwd=None, log=None, fatal_patterns: list = None, on_line=None, on_start=None, timeout: float = None) -> tuple:
+        if timeout is None:
+            timeout = self.timeout
+
+        with wine_session(cmdline) as (cmdline, env):
+            if on_start is not None:
+                on_start(cmdline)
+            return run_tool_process(cmdline, cwd=cwd, env=env, log=log, fatal_patterns=fatal_patterns, on_line=on_line, timeout=timeout), cmdline
+
+
+class NativeToolRunner(WineToolRunner):
+
+    def run(self, cmdline: list, cwd=None, log=None, fatal_patterns: list = None, on_line=None, on_start=None, timeout: float = None) -> tuple:
+        native = get_native_tool(cmdline[0])
+        if native is not None:
+            cmdline = [native] + list(cmdline[1:])
+
+        return super().run(cmdline, cwd=cwd, log=log, fatal_patterns=fatal_patterns, on_line=on_line, on_start=on_start, timeout=timeout)
+
+
+class RecordingToolRunner(NativeToolRunner):
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+    def run(self, cmdline: list, cwd=None, log=None, fatal_patterns: list = None, on_line=None, on_start=None, timeout: float = None) -> tuple:
+        files = ToolFiles(cmdline)
+        key = files.get_key()
+        before = files.snapshot()
+
+        try:
+            out, run_cmdline = super().run(cmdline, cwd=cwd, log=log, fatal_patterns=fatal_patterns, on_line=on_line, on_start=on_start, timeout=timeout)
+            returncode = 0
+        except subprocess.CalledProcessError as e:
+            out = e.output
+            returncode = e.returncode
+            run_cmdline = e.cmd
+            error = e
+
+        # Killed or cancelled tools did not run to the end, so their results would be incomplete.
+        if returncode >= 0:
+            save_recording(self.path, key, cmdline, returncode, out, files.get_outputs(before))
+
+        if returncode != 0:
+            raise error
+
+        return out, run_cmdline
+
+
+class ReplayToolRunner(ToolRunner):
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+    def run(self, cmdline: list, cwd=None, log=None, fatal_patterns: list = None, on_line=None, on_start=None, timeout: float = None) -> tuple:
+        files = ToolFiles(cmdline)
+        key = files.get_key()
+
+        if on_start is not None:
+            on_start(cmdline)
+
+        recording = load_recording(self.path, key)
+        if recording is None:
+            out = f"SEUT Replay: No recording of '{os.path.basename(cmdline[0])}' with these inputs ({key}).\n".encode('utf-8')
+            if log is not None:
+                log.write(out)
+            raise subprocess.CalledProcessError(1, cmdline, output=out)
+
+        for output in recording['outputs']:
+            target = files.get_output_path(output['arg'], output['name'])
+            if target is not None:
+                shutil.copyfile(os.path.join(self.path, key, output['file']), target)
+
+        lines = []
+        fatal_line = None
+        for line in recording['out'].splitlines(keepends=True):
+            lines.append(line)
+            if log is not None:
+                log.write(line)
+            if on_line is not None:
+                on_line(line)
+            if fatal_patterns and any(pattern in line for pattern in fatal_patterns):
+                fatal_line = line
+                break
+
+        out = b"".join(lines)
+
+        if fatal_line is not None:
+            raise ToolAbortedError(-1, cmdline, output=out, line=fatal_line.decode("utf-8", "ignore").strip())
+
+        if recording['returncode'] != 0:
+            raise subprocess.CalledProcessError(recording['returncode'], cmdline, output=out)
+
+        return out, cmdline
+
+
+class ToolFiles:
+    """The files a tool call reads and writes, as far as they can be told from its command line. Arguments can be paths or
+    options with a path, e.g. '/s:<path>'. A '/m:' option is a file mask for the directories passed."""
+
+    def __init__(self, cmdline: list):
+        self.tool = os.path.splitext(os.path.basename(cmdline[0]))[0].lower()
+        self.args = list(cmdline[1:])
+        self.paths = [get_arg_path(arg) for arg in self.args]
+
+        self.mask = None
+        for arg in self.args:
+            if arg.lower().startswith('/m:'):
+                self.mask = arg[3:]
+
+        self.output_args = set(OUTPUT_ARGS.get(self.tool, []))
+        self.output_type = DEFAULT_OUTPUT_TYPE
+        self.input_stems = None
+        for idx, arg in enumerate(self.args[:-1]):
+            if arg in OUTPUT_OPTIONS:
+                self.output_args.add(idx + 1)
+            elif arg.lower() == OUTPUT_TYPE_OPTION:
+                self.output_type = self.args[idx + 1].lower()
+
+
+    def get_inputs(self) -> list:
+        inputs = []
+        for idx, path in enumerate(self.paths):
+            if path is None:
+                continue
+
+            # The Havok filter converts its source in place, so it is also passed as a regular argument.
+            if idx in self.output_args:
+                continue
+
+            if os.path.isfile(path):
+                inputs.append(path)
+
+            elif os.path.isdir(path) and self.mask is not None:
+                for f in sorted(glob.glob(os.path.join(glob.escape(path), self.mask))):
+                    inputs.append(f)
+
+                    # MwmBuilder also reads the XML and HKT of each model.
+                    stem = os.path.splitext(f)[0]
+                    inputs += [stem + ext for ext in ['.xml', '.hkt'] if os.path.isfile(stem + ext)]
+
+        return inputs
+
+
+    def get_key(self) -> str:
+        """Returns a hash of the tool, its arguments and the content of its inputs. Paths are reduced to their names, so the
+        key does not depend on where the files are."""
+
+        hasher = hashlib.sha1()
+        hasher.update(f"{RECORDING_VERSION}\0{self.tool}\0".encode('utf-8'))
+
+        for arg, path in zip(self.args, self.paths):
+            hasher.update(arg.encode('utf-8') if path is None else get_key_name(path).encode('utf-8'))
+            hasher.update(b'\0')
+
+        for f in self.get_inputs():
+            hasher.update(get_key_name(f).encode('utf-8'))
+            with open(f, 'rb') as input_file:
+                for chunk in iter(lambda: input_file.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+
+        return hasher.hexdigest()
+
+
+    def get_output_dirs(self) -> dict:
+        """Returns the directories the tool may write to by the index of the argument they come from."""
+
+        dirs = {}
+        for idx, path in enumerate(self.paths):
+            if path is None:
+                continue
+            if os.path.isdir(path):
+                dirs[idx] = path
+            elif os.path.isdir(os.path.dirname(path)):
+                dirs[idx] = os.path.dirname(path)
+
+        return dirs
+
+
+    def get_input_stems(self) -> set:
+        """Returns the names without extension of the files passed to the tool directly."""
+
+        if self.input_stems is None:
+            self.input_stems = set()
+            for idx, path in enumerate(self.paths):
+                if path is not None and idx not in self.output_args and os.path.isfile(path):
+                    self.input_stems.add(os.path.splitext(os.path.basename(path))[0].lower())
+
+        return self.input_stems
+
+
+    def is_output(self, idx: int, name: str) -> bool:
+        """Returns whether a file the tool wrote is its output. Other files may be written to the same folders meanwhile,
+        e.g. by other texconv batches, so a file in an output folder only counts if it is named after one of the inputs."""
+
+        if name.endswith('.log'):
+            return False
+
+        path = self.paths[idx]
+        if not os.path.isdir(path):
+            return name == os.path.basename(path)
+
+        if self.mask is not None:
+            return fnmatch.fnmatch(name, os.path.splitext(self.mask)[0] + '.*')
+
+        if idx not in self.output_args:
+            return False
+
+        stem, ext = os.path.splitext(name)
+        return stem.lower() in self.get_input_stems() and ext[1:].lower() == self.output_type
+
+
+    def snapshot(self) -> dict:
+        result = {}
+        for idx, path in self.get_output_dirs().items():
+            result[idx] = get_file_stats(path)
+
+        return result
+
+
+    def get_outputs(self, before: dict) -> list:
+        """Returns the outputs written since the snapshot as tuples of argument index, file name and path."""
+
+        outputs = []
+        for idx, path in self.get_output_dirs().items():
+            old = before.get(idx, {})
+            for name, stats in get_file_stats(path).items():
+                if old.get(name) != stats and self.is_output(idx, name) and not any(o[1] == name for o in outputs):
+                    outputs.append((idx, name, os.path.join(path, name)))
+
+        return outputs
+
+
+    def get_output_path(self, idx: int, name: str) -> str:
+        dirs = self.get_output_dirs()
+        if idx not in dirs:
+            return None
+
+        return os.path.join(dirs[idx], name)
+
+
+def get_arg_path(arg: str) -> str:
+    """Returns the absolute path in an argument or None if there is none."""
+
+    match = re.match(r"^/[a-zA-Z]:(.+)$", arg)
+    if match is not None:
+        arg = match.group(1)
+
+    if not os.path.isabs(arg) or os.path.dirname(os.path.normpath(arg)) in ['/', '']:
+        return None
+
+    return arg
+
+
+def get_key_name(path: str) -> str:
+    """Returns the name of a path for a key. Temporary files have random names, so only their extension is used."""
+
+    path = os.path.normpath(path)
+    if os.path.dirname(path) == os.path.normpath(tempfile.gettempdir()):
+        return os.path.splitext(path)[1]
+
+    return os.path.basename(path)
+
+
+def get_file_stats(path: str) -> dict:
+    stats = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    stats[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        pass
+
+    return stats
+
+
+def get_native_tool(path: str) -> str:
+    """Returns the path of a native build of a Windows tool, or None if there is none."""
+
+    if not path.lower().endswith('.exe'):
+        return None
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    names = NATIVE_TOOL_NAMES.get(stem.lower(), [stem])
+
+    dirs = [os.path.dirname(path)]
+    if os.environ.get('SEUT_NATIVE_TOOL_DIR', "") != "":
+        dirs.insert(0, os.environ['SEUT_NATIVE_TOOL_DIR'])
+
+    for name in names:
+        for d in dirs:
+            candidate = os.path.join(d, name)
+            if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+                return candidate
+
+        candidate = shutil.which(name)
+        if candidate is not None:
+            return candidate
+
+    return None
+
+
+def save_recording(path: str, key: str, cmdline: list, returncode: int, out: bytes, outputs: list):
+    directory = os.path.join(path, key)
+    os.makedirs(directory, exist_ok=True)
+
+    entries = []
+    for idx, (arg, name, source) in enumerate(outputs):
+        stored = f"output_{idx}"
+        shutil.copyfile(source, os.path.join(directory, stored))
+        entries.append({'arg': arg, 'name': name, 'file': stored})
+
+    with open(os.path.join(directory, 'output.bin'), 'wb') as out_file:
+        out_file.write(out if out is not None else b"")
+
+    with open(os.path.join(directory, 'recording.json'), 'w') as recording_file:
+        json.dump({'version': RECORDING_VERSION, 'cmdline': list(cmdline), 'returncode': returncode, 'outputs': entries}, recording_file, indent = 4)
+
+
+def load_recording(path: str, key: str) -> dict:
+    directory = os.path.join(path, key)
+
+    try:
+        with open(os.path.join(directory, 'recording.json'), 'r') as recording_file:
+            recording = json.load(recording_file)
+        with open(os.path.join(directory, 'output.bin'), 'rb') as out_file:
+            recording['out'] = out_file.read()
+    except (OSError, ValueError):
+        return None
+
+    if recording.get('version') != RECORDING_VERSION:
+        return None
+
+    return recording
+
+
+def get_recordings_dir() -> str:
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'seut', 'tool-recordings')
+
+
+def get_tool_runner() -> ToolRunner:
+    """Returns the runner set in the preferences. Reads them only once, so worker threads do not need to access them."""
+
+    with lock:
+        if settings['runner'] is not None:
+            return settings['runner']
+
+        mode = os.environ.get('SEUT_TOOL_RUNNER', "").upper()
+        path = os.environ.get('SEUT_TOOL_RECORDINGS', "")
+        timeout = 0
+
+        try:
+            preferences = get_preferences()
+            if mode == "":
+                mode = preferences.tool_runner
+            if path == "":
+                path = get_abs_path(preferences.tool_recordings_path)
+            timeout = int(preferences.tool_timeout)
+        except Exception:
+            pass
+
+        if path == "":
+            path = get_recordings_dir()
+
+        if mode == 'NATIVE':
+            runner = NativeToolRunner()
+        elif mode == 'RECORD':
+            runner = RecordingToolRunner(path)
+        elif mode == 'REPLAY':
+            runner = ReplayToolRunner(path)
+        else:
+            runner = WineToolRunner()
+
+        runner.timeout = timeout if timeout > 0 else None
+        settings['runner'] = runner
+        return runner
+
+
+def update_tool_runner(self, context):
+    """Applies a changed tool runner to the next tool call."""
+
+    with lock:
+        settings['runner'] = None
@@ -3,24 +3,214 @@ import os
 import subprocess
 import threading
 
-from ..seut_errors          import get_abs_path
-from ..seut_utils              import linux_path_to_wine_path
+from concurrent.futures     import ThreadPoolExecutor, Future, wait
 
-def call_tool(args: list, logfile=None) -> list:
-    # check if the tool ends with .exe, if it does run it with wine
-    if args[0].endswith('.exe'):
-        print(f"SEUT: Running Windows tool with Wine: {args[0]}")
-        args = ["wine"] + args
+from ..seut_errors         import get_abs_path
+from ..seut_utils           import get_preferences
+from .seut_wine             import load_settings
 
-        itterator = 2
-        while itterator < len(args):
-            if args[itterator].startswith('/home'):
-                args[itterator] = linux_path_to_wine_path(args[itterator])
-            itterator += 1
+# Processes of tools that are currently running, so they can be killed when the addon is unregistered.
+running_processes = set()
+process_lock = threading.Lock()
+tools_cancelled = threading.Event()
 
+# Tools and other background work run on one persistent pool shared by the export and the texture conversion. Each task is
+# picked up by whichever worker is free first. Tasks that have not started yet are dropped by kill_tool_group or kill_running_tools.
+executor = None
+executor_size = None
+queued_tasks = set()
+executor_lock = threading.Lock()
+
+# The group of tools the current worker thread runs a task for, see ToolGroup.
+current_group = threading.local()
+
+# Exit code reported for tools that were killed because of a fatal line in their output, see run_tool_process.
+TOOL_ABORTED = -1000
+
+
+class ToolAbortedError(subprocess.CalledProcessError):
+    """Raised if a tool was killed because its output showed that it failed."""
+
+    def __init__(self, returncode, cmd, output=None, line: str = ""):
+        super().__init__(returncode, cmd, output=output)
+        self.line = line
+
+
+class ToolTimeoutError(subprocess.CalledProcessError):
+    """Raised if a tool was killed because it ran longer than its timeout."""
+
+
+class ToolGroup:
+    """Tools started together, e.g. by an export or the texture conversion. They can be cancelled through kill_tool_group
+    without affecting the tools of other groups on the shared pool."""
+
+    def __init__(self):
+        self.futures = []
+        self.processes = set()
+        self.cancelled = threading.Event()
+
+
+def run_tool_process(args: list, cwd=None, env=None, log=None, fatal_patterns: list = None, on_line=None, timeout: float = None) -> bytes:
+    """Works like subprocess.check_output, but the process can be killed through kill_running_tools.
+    The output is written to the log file object and passed to on_line line by line as it arrives. If a line contains one
+    of the fatal patterns, the tool is killed right away and ToolAbortedError is raised. If it runs longer than the timeout
+    in seconds, it is killed and ToolTimeoutError is raised."""
+
+    group = get_tool_group()
+
+    with process_lock:
+        if tools_cancelled.is_set() or (group is not None and group.cancelled.is_set()):
+            raise subprocess.CalledProcessError(-1, args, output=b"Cancelled by user.")
+
+        process = subprocess.Popen(args, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False)
+        running_processes.add(process)
+        if group is not None:
+            group.processes.add(process)
+
+    lines = []
+    fatal_line = None
+
+    timed_out = threading.Event()
+    timer = None
+    if timeout is not None and timeout > 0:
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+
+    try:
+        # Reads until the pipe is closed, so the output that was written before a kill is still collected.
+        for line in process.stdout:
+            lines.append(line)
+
+            if log is not None:
+                log.write(line)
+                log.flush()
+
+            if on_line is not None:
+                on_line(line)
+
+            if fatal_patterns and fatal_line is None and any(pattern in line for pattern in fatal_patterns):
+                fatal_line = line
+                process.kill()
+
+        process.wait()
+
+    finally:
+        if timer is not None:
+            timer.cancel()
+        process.stdout.close()
+        with process_lock:
+            running_processes.discard(process)
+            if group is not None:
+                group.processes.discard(process)
+
+    out = b"".join(lines)
+
+    if timed_out.is_set():
+        raise ToolTimeoutError(process.returncode, args, output=out + f"\nSEUT: Stopped after {timeout}s.".encode('utf-8'))
+
+    if fatal_line is not None:
+        raise ToolAbortedError(process.returncode, args, output=out, line=fatal_line.decode("utf-8", "ignore").strip())
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args, output=out)
+
+    return out
+
+
+def kill_running_tools():
+    """Kills all running tools, drops the queued tasks and prevents new tools from being started until reset_tool_cancellation
+    is called. Only used when the addon is unregistered, as an export or a texture conversion only stops its own tools, see kill_tool_group."""
+
+    # Cancelling calls discard_tool_task, so it must happen outside the lock.
+    with executor_lock:
+        tasks = list(queued_tasks)
+    for future in tasks:
+        future.cancel()
+
+    with process_lock:
+        tools_cancelled.set()
+        for process in running_processes:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+
+def kill_tool_group(group: ToolGroup):
+    """Kills the running tools of the group and drops its queued ones. Other tools keep running."""
+
+    group.cancelled.set()
+    for future in group.futures:
+        future.cancel()
+
+    with process_lock:
+        for process in group.processes:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+
+def reset_tool_cancellation():
+    tools_cancelled.clear()
+
+
+def get_worker_count() -> int:
+    """Returns the size of the tool pool. Defaults to the CPU count, as the tools are mostly CPU bound."""
+
+    # Set when multiple Blender instances share the machine, see seut_farm.py.
+    if os.environ.get('SEUT_TOOL_WORKERS', "").isdigit():
+        return max(1, int(os.environ['SEUT_TOOL_WORKERS']))
+
+    try:
+        count = int(get_preferences().tool_workers)
+    except Exception:
+        count = 0
+
+    return count if count > 0 else max(2, os.cpu_count() or 2)
+
+
+def submit_tool_task(fn, *args, **kwargs) -> Future:
+    """Runs a function on the shared tool pool. It must not access Blender data. Can be called from worker threads, e.g. to
+    chain tasks, but only the main thread applies a changed pool size, as worker threads cannot access the preferences."""
+
+    global executor, executor_size
+
+    with executor_lock:
+        if executor is not None and threading.current_thread() is not threading.main_thread():
+            size = executor_size
+        else:
+            size = get_worker_count()
+
+        if executor is None or executor_size != size:
+            # Running tasks of a replaced pool still finish.
+            if executor is not None:
+                executor.shutdown(wait=False)
+            executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="SEUT_Tool")
+            executor_size = size
+
+        future = executor.submit(fn, *args, **kwargs)
+        queued_tasks.add(future)
+
+    future.add_done_callback(discard_tool_task)
+    return future
+
+
+def discard_tool_task(future: Future):
+    with executor_lock:
+        queued_tasks.discard(future)
+
+
+def call_tool(args: list, logfile=None, timeout: float = None) -> list:
+    # The runner decides how the tool is run, e.g. with Wine, see seut_tool_runner.
     try:
         print(f"SEUT: Executing command: {' '.join(args)}")
-        out = subprocess.check_output(args, cwd=None, stderr=subprocess.STDOUT, shell=False)
+        out, args = get_tool_runner().run(args, timeout=timeout)
         if logfile is not None:
             write_to_log(logfile, out, args=args)
         return [0, out, args]
@@ -29,62 +219,83 @@ def call_tool(args: list, logfile=None) -> list:
         print(f"SEUT: Command failed with return code {e.returncode}")
         print(f"SEUT: Error output: {e.output}")
         if logfile is not None:
-            write_to_log(logfile, e.output, args=args)
-        return [e.returncode, e.output, args]
+            write_to_log(logfile, e.output, args=e.cmd)
+        return [e.returncode, e.output, e.cmd]
 
     except Exception as e:
         print(f"SEUT: Exception occurred: {e}")
         print(e)
 
 
-def call_tool_threaded(commands: list, thread_count: int, logfile=None):
+def get_tool_runner():
+    from .seut_tool_runner import get_tool_runner
+    return get_tool_runner()
 
-    threads = []
-    results = []
-    commands_left = commands
 
-    for command in commands_left:
-        if command[0].endswith('.exe'):
-            print(f"SEUT: Running Windows tool with Wine: {command[0]}")
-            command = ["wine"] + command
+def call_tool_threaded(commands: list, logfile=None, timeout: float = None):
+    """Runs the commands on the shared tool pool, each killed after the timeout in seconds. Returns the results in the order of
+    the commands. Commands that were cancelled through kill_running_tools have None as result."""
 
-            itterator = 2
-            while itterator < len(command):
-                if command[itterator].startswith('/home'):
-                    command[itterator] = linux_path_to_wine_path(command[itterator])
-                itterator += 1
+    futures = start_tools(commands, timeout=timeout)
+    wait(futures)
 
-    while len(commands_left) > 0:
-        if len(threads) < thread_count:
-            c = commands_left[0]
-            t = threading.Thread(target=threaded_call, args=(c, results,))
-            threads.append(t)
-            commands_left.remove(c)
-            t.start()
-        else:
-            t = threads[0]
-            threads.remove(t)
-            t.join()
+    return collect_tool_results(futures, logfile)
 
-    for i in threads:
-        i.join()
+
+def start_tools(commands: list, timeout: float = None, group: ToolGroup = None) -> list:
+    """Submits the commands to the shared tool pool and returns their Futures. If a group is passed, the tools are added to
+    it, so they can be cancelled on their own. Must be called from the main thread."""
+
+    # Settings are read here, as the workers cannot access the preferences.
+    load_settings()
+    get_tool_runner()
+
+    return [submit_group_task(group, call_tool, c, timeout=timeout) for c in commands]
+
+
+def submit_group_task(group: ToolGroup, fn, *args, **kwargs) -> Future:
+    """Runs a function on the shared tool pool as part of the group, so the tools it runs are killed with it. Without a group, it works like submit_tool_task."""
+
+    if group is None:
+        return submit_tool_task(fn, *args, **kwargs)
+
+    future = submit_tool_task(run_in_group, group, fn, *args, **kwargs)
+    group.futures.append(future)
+    return future
+
+
+def run_in_group(group: ToolGroup, fn, *args, **kwargs):
+    """Calls the function with the group as the current one of the thread. Tasks and tools it starts belong to the group."""
+
+    previous = get_tool_group()
+    current_group.value = group
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        current_group.value = previous
+
+
+def get_tool_group() -> ToolGroup:
+    return getattr(current_group, 'value', None)
+
+
+def collect_tool_results(futures: list, logfile=None) -> list:
+    """Returns the results of the finished Futures of start_tools, None for cancelled ones, and writes their output to the logfile."""
+
+    results = [f.result() if not f.cancelled() else None for f in futures]
 
     if logfile is not None:
         output = ""
 
         for r in results:
-            output += r[1].decode("utf-8", "ignore") + '\n'
+            if r is not None and r[1] is not None:
+                output += r[1].decode("utf-8", "ignore") + '\n'
 
         write_to_log(logfile, output.encode())
 
     return results
 
 
-def threaded_call(c: list, results: list):
-    result = call_tool(c)
-    results.append(result)
-
-
 def write_to_log(logfile: str, content: str, args=None, cwd=None):
 
     with open(get_abs_path(logfile), 'wb') as log:
@@ -101,4 +312,6 @@ def write_to_log(logfile: str, content: str, args=None, cwd=None):
 
 
 def get_tool_dir() -> str:
-    return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tools')
\ No newline at end of file
+    """Returns the directory of the tools shipped with SEUT. Can be overridden through SEUT_TOOL_DIR, e.g. to use the stand-ins of the benchmark."""
+
+    return os.environ.get('SEUT_TOOL_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tools'))
\ No newline at end of file
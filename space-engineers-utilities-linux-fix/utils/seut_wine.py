@@ -0,0 +1,330 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import threading
+
+from contextlib     import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from ..seut_utils   import linux_path_to_wine_path, get_preferences
+
+
+# Both variables are also respected by Wine's own scripts.
+WINE = os.environ.get('WINE', 'wine')
+WINESERVER = os.environ.get('WINESERVER', 'wineserver')
+
+DEFAULT_IDLE_TIMEOUT = 300
+
+# Only these are copied into a cloned prefix. Everything else in drive_c is linked to the template, as it can be large.
+PREFIX_COPIED_FILES = ['system.reg', 'user.reg', 'userdef.reg', '.update-timestamp']
+PREFIX_COPIED_DIRS = ['dosdevices', os.path.join('drive_c', 'windows')]
+PREFIX_MARKER = ".seut_template"
+
+lock = threading.Lock()
+sessions = {}
+settings = {
+    'timeout': None,
+    'prefix_count': None,
+    'prefix_limit': None,
+}
+
+# Tool calls share the prefixes of the pool: each call gets the prefix with the fewest calls running in it. Calls only wait
+# for a prefix if a limit of calls per prefix is set.
+prefix_pool = {
+    'condition': threading.Condition(),
+    'prefixes': [],
+    'active': {},
+    'creating': 0,
+}
+
+
+def is_wine_needed(cmdline: list) -> bool:
+    return sys.platform != "win32" and cmdline[0].endswith('.exe')
+
+
+def get_wine_cmdline(cmdline: list) -> list:
+    """Returns the command line to run a Windows tool with Wine and converts Linux paths in its arguments to Wine paths."""
+
+    print(f"SEUT: Running Windows tool with Wine: {cmdline[0]}")
+    cmdline = [WINE] + list(cmdline)
+
+    itterator = 2
+    while itterator < len(cmdline):
+        if is_linux_path(cmdline[itterator]):
+            cmdline[itterator] = linux_path_to_wine_path(cmdline[itterator])
+        itterator += 1
+
+    return cmdline
+
+
+def is_linux_path(arg: str) -> bool:
+    """Returns whether an argument is an absolute path whose folder exists. Options like '/f' are not."""
+
+    if arg.startswith('/home'):
+        return True
+
+    folder = os.path.dirname(os.path.normpath(arg))
+    return os.path.isabs(arg) and folder != '/' and os.path.isdir(folder)
+
+
+def load_settings():
+    """Reads the Wine settings from the preferences once, so worker threads do not need to access them."""
+
+    if settings['timeout'] is not None:
+        return
+
+    try:
+        preferences = get_preferences()
+        timeout = int(preferences.wine_idle_timeout)
+        prefix_count = int(preferences.wine_prefix_count)
+        prefix_limit = int(preferences.wine_prefix_limit)
+    except Exception:
+        timeout = DEFAULT_IDLE_TIMEOUT
+        prefix_count = 1
+        prefix_limit = 0
+
+    # The timeout is set last, as it marks the settings as loaded.
+    settings['prefix_count'] = prefix_count
+    settings['prefix_limit'] = prefix_limit
+    settings['timeout'] = timeout
+
+
+def get_template_prefix() -> str:
+    return os.environ.get('WINEPREFIX', os.path.join(os.path.expanduser('~'), '.wine'))
+
+
+def get_prefix_pool_dir() -> str:
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'seut', 'wine-prefixes')
+
+
+@contextmanager
+def prefix_file_lock(prefix: str):
+    """Locks a prefix against other Blender instances, e.g. of a render farm, through a lock file next to it."""
+
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+
+    # Wine is only used on Linux, where fcntl is always available.
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{prefix}.lock", 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def is_prefix_cloned(template: str, prefix: str) -> bool:
+    marker = os.path.join(prefix, PREFIX_MARKER)
+    if not os.path.isfile(marker):
+        return False
+
+    with open(marker, 'r') as f:
+        return f.read() == template
+
+
+def clone_prefix(template: str, prefix: str):
+    """Creates a copy of the template prefix which shares the template's installed programs and user folders.
+    The copy is made in a temporary folder and renamed into place, so other processes never see a partial prefix."""
+
+    if is_prefix_cloned(template, prefix):
+        return
+
+    with prefix_file_lock(prefix):
+        # Another process may have cloned it while this one waited for the lock.
+        if is_prefix_cloned(template, prefix):
+            return
+
+        print(f"SEUT: Cloning Wine prefix '{template}' to '{prefix}'.")
+
+        parent = os.path.dirname(prefix)
+        temp = tempfile.mkdtemp(prefix=f".{os.path.basename(prefix)}-", dir=parent)
+
+        try:
+            os.makedirs(os.path.join(temp, 'drive_c'))
+
+            for name in PREFIX_COPIED_FILES:
+                if os.path.isfile(os.path.join(template, name)):
+                    shutil.copy2(os.path.join(template, name), os.path.join(temp, name))
+
+            for name in PREFIX_COPIED_DIRS:
+                if os.path.isdir(os.path.join(template, name)):
+                    shutil.copytree(os.path.join(template, name), os.path.join(temp, name), symlinks=True)
+
+            for name in os.listdir(os.path.join(template, 'drive_c')):
+                if not os.path.exists(os.path.join(temp, 'drive_c', name)):
+                    os.symlink(os.path.join(template, 'drive_c', name), os.path.join(temp, 'drive_c', name))
+
+            with open(os.path.join(temp, PREFIX_MARKER), 'w') as f:
+                f.write(template)
+
+            # An outdated clone is moved aside first, as a folder cannot be renamed onto a non-empty one.
+            if os.path.exists(prefix):
+                outdated = tempfile.mkdtemp(prefix=f".{os.path.basename(prefix)}-", dir=parent)
+                os.rename(prefix, os.path.join(outdated, 'prefix'))
+                shutil.rmtree(outdated, ignore_errors=True)
+
+            os.rename(temp, prefix)
+
+        except:
+            shutil.rmtree(temp, ignore_errors=True)
+            raise
+
+
+def acquire_prefix() -> str:
+    """Returns the Wine prefix with the fewest running SEUT tool calls. Additional prefixes are cloned from the template when
+    all existing ones are in use. Only waits for a prefix if a limit of calls per prefix is set."""
+
+    pool = prefix_pool
+    condition = pool['condition']
+    active = pool['active']
+
+    with condition:
+        # The first prefix is the template itself.
+        if pool['prefixes'] == []:
+            template = get_template_prefix()
+            pool['prefixes'].append(template)
+            active[template] = 0
+
+        while True:
+            limit = settings['prefix_limit']
+            available = [p for p in pool['prefixes'] if limit <= 0 or active[p] < limit]
+            prefix = min(available, key=lambda p: active[p]) if available != [] else None
+
+            if (prefix is None or active[prefix] > 0) and len(pool['prefixes']) + pool['creating'] < max(1, settings['prefix_count']):
+                index = len(pool['prefixes']) + pool['creating']
+                pool['creating'] += 1
+                break
+
+            if prefix is not None:
+                active[prefix] += 1
+                return prefix
+
+            condition.wait()
+
+    template = get_template_prefix()
+    prefix = os.path.join(get_prefix_pool_dir(), f"prefix_{index}")
+    try:
+        clone_prefix(template, prefix)
+
+    except (OSError, shutil.Error) as e:
+        print(f"SEUT: Could not clone Wine prefix: {e}")
+        # Do not attempt to clone any further prefixes this session.
+        with condition:
+            pool['creating'] -= 1
+            settings['prefix_count'] = len(pool['prefixes'])
+            condition.notify_all()
+        return acquire_prefix()
+
+    with condition:
+        pool['creating'] -= 1
+        pool['prefixes'].append(prefix)
+        active[prefix] = 1
+        condition.notify_all()
+
+    return prefix
+
+
+def release_prefix(prefix: str):
+    condition = prefix_pool['condition']
+    with condition:
+        prefix_pool['active'][prefix] -= 1
+        condition.notify()
+
+
+def get_wine_env(prefix: str) -> dict:
+    env = os.environ.copy()
+    env['WINEPREFIX'] = prefix
+    return env
+
+
+def ensure_wine_session(prefix: str):
+    """Starts a persistent wineserver for the prefix, so that consecutive tool calls do not each pay for a cold Wine start.
+    The server shuts itself down once no Wine process has been running for the idle timeout."""
+
+    timeout = settings['timeout']
+    if timeout <= 0:
+        return
+
+    with lock:
+        session = sessions.setdefault(prefix, {'process': None, 'last_check': 0.0})
+
+        # While the server SEUT started is alive, there is no need to start it again.
+        process = session['process']
+        if process is not None and process.poll() is None:
+            return
+
+        # A server that was already running, e.g. one of the user's, is only checked for again after a while.
+        now = time.monotonic()
+        if now - session['last_check'] < timeout / 2:
+            return
+
+        if shutil.which(WINESERVER) is None:
+            return
+
+        try:
+            # The server runs in the foreground, so the process is the server itself. If a server for this prefix is
+            # already running, it exits immediately and the running one is left alone.
+            session['process'] = subprocess.Popen([WINESERVER, "-f", f"-p{timeout}"], env=get_wine_env(prefix), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            session['last_check'] = now
+
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"SEUT: Could not start persistent wineserver: {e}")
+
+
+@contextmanager
+def wine_session(cmdline: list):
+    """Yields the command line and environment to run a tool with. Windows tools are spread across the Wine prefixes of the pool."""
+
+    if not is_wine_needed(cmdline):
+        yield cmdline, None
+        return
+
+    load_settings()
+    prefix = acquire_prefix()
+
+    try:
+        ensure_wine_session(prefix)
+        yield get_wine_cmdline(cmdline), get_wine_env(prefix)
+
+    finally:
+        release_prefix(prefix)
+
+
+def shutdown_wine_session():
+    """Shuts down the wineservers started by SEUT. Servers that were already running are left alone."""
+
+    with lock:
+        for prefix, session in sessions.items():
+            process = session['process']
+            if process is None or process.poll() is not None:
+                continue
+
+            try:
+                # Only the server SEUT started can be running for the prefix while its process is alive.
+                subprocess.run([WINESERVER, "-k"], env=get_wine_env(prefix), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+                process.wait(timeout=30)
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f"SEUT: Could not shut down wineserver: {e}")
+
+        sessions.clear()
+        settings['timeout'] = None
+
+
+def update_wine_settings(self, context):
+    """Applies changed Wine settings to the next tool call."""
+
+    with lock:
+        settings['timeout'] = None
+        for session in sessions.values():
+            session['last_check'] = 0.0
@@ -0,0 +1,61 @@
+import os
+import sys
+import importlib.util
+
+import pytest
+
+
+# The addon folder is not a valid module name, so it is loaded as the package 'seut'. Everything in it needs bpy, which
+# is available through the bpy module from PyPI or Blender's own Python.
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'space-engineers-utilities-linux-fix')
+
+try:
+    import bpy
+except ImportError:
+    collect_ignore_glob = ['test_*.py']
+    bpy = None
+
+
+def load_addon():
+    if 'seut' in sys.modules:
+        return sys.modules['seut']
+
+    spec = importlib.util.spec_from_file_location('seut', os.path.join(ADDON_DIR, '__init__.py'), submodule_search_locations=[ADDON_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['seut'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+if bpy is not None:
+    load_addon()
+
+
+@pytest.fixture(scope='session')
+def seut_props():
+    """Registers the SEUT classes and properties without the rest of the addon, e.g. its timers and handlers."""
+
+    addon = load_addon()
+
+    for cls in addon.classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.seut = bpy.props.PointerProperty(type=addon.SEUT_Scene)
+    bpy.types.Collection.seut = bpy.props.PointerProperty(type=addon.SEUT_Collection)
+    bpy.types.Object.seut = bpy.props.PointerProperty(type=addon.SEUT_Object)
+
+    yield addon
+
+    # Blender does not exit while the classes are still registered.
+    del bpy.types.Scene.seut
+    del bpy.types.Collection.seut
+    del bpy.types.Object.seut
+    for cls in reversed(addon.classes):
+        bpy.utils.unregister_class(cls)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Points the caches of SEUT in the user's cache directory to a temporary folder."""
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
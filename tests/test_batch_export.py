@@ -0,0 +1,120 @@
+import json
+
+import bpy
+import pytest
+
+from seut.export import seut_batch_export
+
+
+def get_summary(output: str) -> dict:
+    lines = [line for line in output.splitlines() if line.startswith(seut_batch_export.SUMMARY_PREFIX)]
+    assert len(lines) == 1
+    return json.loads(lines[0][len(seut_batch_export.SUMMARY_PREFIX):])
+
+
+@pytest.fixture
+def blend_files(tmp_path, monkeypatch):
+    """Two BLEND files whose export is replaced by returning the given results per scene."""
+
+    files = {}
+    for name in ['a', 'b']:
+        path = tmp_path / f"{name}.blend"
+        path.write_bytes(b"")
+        files[str(path)] = []
+
+    def export_file(filepath, scene_names):
+        result = files[filepath]
+        if isinstance(result, Exception):
+            raise result
+        return [{'file': filepath, 'scene': scene, 'success': success, 'issues': []} for scene, success in result
+                if scene_names == [] or scene in scene_names]
+
+    monkeypatch.setattr(seut_batch_export, 'export_file', export_file)
+    return files
+
+
+@pytest.mark.parametrize('argv', [['--unknown'], ['--report'], ['missing.blend']])
+def test_invalid_arguments(capsys, argv):
+    assert seut_batch_export.main(argv) == seut_batch_export.EXIT_USAGE
+    assert seut_batch_export.SUMMARY_PREFIX not in capsys.readouterr().out
+
+
+def test_no_file_to_export(capsys):
+    # Blender was started without a file.
+    assert bpy.data.filepath == ""
+
+    assert seut_batch_export.main([]) == seut_batch_export.EXIT_USAGE
+    assert "No BLEND file to export." in capsys.readouterr().out
+
+
+def test_arguments_are_read_after_the_separator(monkeypatch, capsys):
+    monkeypatch.setattr('sys.argv', ['blender', '-b', '--python', 'seut_batch.py', '--', '--unknown'])
+    assert seut_batch_export.main() == seut_batch_export.EXIT_USAGE
+
+
+def test_all_scenes_exported(blend_files, tmp_path, capsys):
+    a, b = blend_files
+    blend_files[a] = [('Block', True), ('Door', True)]
+    blend_files[b] = [('Turret', True)]
+    report = tmp_path / 'report.json'
+
+    assert seut_batch_export.main([a, b, '--report', str(report)]) == seut_batch_export.EXIT_SUCCESS
+
+    summary = get_summary(capsys.readouterr().out)
+    assert summary['success'] is True
+    assert (summary['exported'], summary['failed']) == (3, 0)
+    assert [(e['file'], e['scene']) for e in summary['scenes']] == [(a, 'Block'), (a, 'Door'), (b, 'Turret')]
+    assert json.loads(report.read_text()) == summary
+
+
+def test_failed_scene(blend_files, capsys):
+    a, b = blend_files
+    blend_files[a] = [('Block', True), ('Door', False)]
+    blend_files[b] = RuntimeError("File is broken")
+
+    assert seut_batch_export.main([a, b]) == seut_batch_export.EXIT_FAILED
+
+    summary = get_summary(capsys.readouterr().out)
+    assert summary['success'] is False
+    assert (summary['exported'], summary['failed']) == (1, 2)
+    assert summary['scenes'][2] == {'file': b, 'scene': None, 'success': False, 'error': "File is broken", 'issues': []}
+
+
+def test_scene_missing_from_files(blend_files, capsys):
+    a, b = blend_files
+    blend_files[a] = [('Block', True)]
+    blend_files[b] = [('Door', True)]
+
+    assert seut_batch_export.main([a, b, '--scene', 'Block', '-s', 'Turret']) == seut_batch_export.EXIT_FAILED
+
+    summary = get_summary(capsys.readouterr().out)
+    assert [(e['scene'], e['success']) for e in summary['scenes']] == [('Block', True), ('Turret', False)]
+    assert summary['scenes'][1]['error'] == "Scene not found."
+
+
+def test_file_without_exported_scenes(blend_files, capsys):
+    a = list(blend_files)[0]
+
+    assert seut_batch_export.main([a]) == seut_batch_export.EXIT_FAILED
+    assert get_summary(capsys.readouterr().out)['scenes'] == []
+
+
+def test_only_selected_scenes_are_exported(seut_props, monkeypatch):
+    scenes = []
+    for name in ['Block', 'Door']:
+        scene = bpy.data.scenes.new(name)
+        scene.view_layers.new('SEUT')
+        scene.seut.sceneType = 'mainScene'
+        scenes.append(scene)
+
+    exported = []
+    monkeypatch.setattr(seut_batch_export, 'export_scene', lambda scene, mwm_queue: exported.append(scene.name) or {'scene': scene.name, 'success': True, 'issues': []})
+
+    try:
+        entries = seut_batch_export.export_file(None, ['Door', 'Turret'])
+    finally:
+        for scene in scenes:
+            bpy.data.scenes.remove(scene)
+
+    assert exported == ['Door']
+    assert entries == [{'scene': 'Door', 'success': True, 'issues': []}]
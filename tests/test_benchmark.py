@@ -0,0 +1,56 @@
+import sys
+import types
+
+import bpy
+import pytest
+
+from seut.benchmark import seut_benchmark
+from seut.utils import seut_wine
+
+
+calls = []
+
+
+def record_update(self, context):
+    calls.append(self)
+
+
+class BenchmarkPreferences(bpy.types.PropertyGroup):
+    mwmb_path: bpy.props.StringProperty(update=record_update)
+    havok_path: bpy.props.StringProperty(update=record_update)
+    asset_path: bpy.props.StringProperty(update=record_update)
+    wine_idle_timeout: bpy.props.IntProperty(default=300, update=record_update)
+    wine_prefix_count: bpy.props.IntProperty(default=1, update=record_update)
+
+
+@pytest.fixture
+def preferences(monkeypatch):
+    bpy.utils.register_class(BenchmarkPreferences)
+    bpy.types.Scene.seut_benchmark_test = bpy.props.PointerProperty(type=BenchmarkPreferences)
+    prefs = bpy.context.scene.seut_benchmark_test
+    monkeypatch.setattr(seut_benchmark, 'get_preferences', lambda: prefs)
+    calls.clear()
+
+    yield prefs
+
+    del bpy.types.Scene.seut_benchmark_test
+    bpy.utils.unregister_class(BenchmarkPreferences)
+
+
+def test_standin_tools_leave_preferences_alone(preferences, tmp_path):
+    preferences['asset_path'] = "/user/assets"
+    args = types.SimpleNamespace(delay=0.0, delay_per_mb=0.0)
+
+    with seut_benchmark.standin_tools(str(tmp_path / 'Tools'), str(tmp_path / 'Assets'), args):
+        assert preferences.mwmb_path == str(tmp_path / 'Tools' / 'MwmBuilder.exe')
+        assert preferences.asset_path == str(tmp_path / 'Assets')
+        assert preferences.wine_idle_timeout == 0
+        assert seut_wine.WINE == sys.executable
+
+    # No update callback ran, so nothing was relocated or saved.
+    assert calls == []
+    assert preferences.asset_path == "/user/assets"
+    assert preferences.mwmb_path == ""
+    assert 'mwmb_path' not in preferences.keys()
+    assert preferences.wine_idle_timeout == 300
+    assert seut_wine.WINE != sys.executable
@@ -0,0 +1,94 @@
+import math
+
+import bpy
+import pytest
+
+from mathutils import Matrix
+from bpy_extras.io_utils import axis_conversion
+
+from seut.export.seut_export_utils import compensate_bone_parent_drift
+
+
+@pytest.fixture
+def rig():
+    """An armature with a bone along Z and an empty parented to it, plus an empty without a parent."""
+
+    armature = bpy.data.objects.new("Armature", bpy.data.armatures.new("Armature"))
+    armature.matrix_world = Matrix.Translation((0.0, 1.0, 0.0)) @ Matrix.Rotation(math.radians(30), 4, 'Z')
+    bpy.context.scene.collection.objects.link(armature)
+    bpy.context.view_layer.objects.active = armature
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    bone = armature.data.edit_bones.new("SE_RigHead")
+    bone.head = (0.0, 0.0, 1.0)
+    bone.tail = (0.0, 0.0, 3.0)
+    bone.roll = math.radians(45)
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    empty = bpy.data.objects.new("camera_head", None)
+    bpy.context.scene.collection.objects.link(empty)
+    empty.parent = armature
+    empty.parent_type = 'BONE'
+    empty.parent_bone = "SE_RigHead"
+    empty.matrix_world = Matrix.Translation((0.5, 1.5, 2.5)) @ Matrix.Rotation(math.radians(60), 4, 'X')
+
+    loose = bpy.data.objects.new("dummy", None)
+    bpy.context.scene.collection.objects.link(loose)
+    loose.location = (1.0, 2.0, 3.0)
+
+    bpy.context.view_layer.update()
+
+    yield armature, empty, loose
+
+    for obj in [empty, loose, armature]:
+        bpy.data.objects.remove(obj)
+
+
+def get_fbx_world_matrix(armature, empty, primary_bone_axis='X', secondary_bone_axis='Y') -> Matrix:
+    """Returns where a model loaded from the FBX places the empty: The exporter writes the bone with the axis correction
+    applied and the empty relative to the bone's head, using the empty's local matrix relative to the bone's tail."""
+
+    bone = armature.data.bones[empty.parent_bone]
+    correction = axis_conversion(from_forward=secondary_bone_axis, from_up=primary_bone_axis, to_forward='X', to_up='Y').to_4x4()
+    to_tail = Matrix.Translation((0.0, (bone.tail_local - bone.head_local).length, 0.0))
+
+    return armature.matrix_world @ bone.matrix_local @ correction @ to_tail @ empty.matrix_local
+
+
+def assert_matrix_equal(a: Matrix, b: Matrix):
+    for row_a, row_b in zip(a, b):
+        assert list(row_a) == pytest.approx(list(row_b), abs=1e-5)
+
+
+def test_empties_parented_to_bones_keep_their_place(rig):
+    armature, empty, loose = rig
+    world = empty.matrix_world.copy()
+
+    # Without the compensation, the empty would drift.
+    assert not all(list(a) == pytest.approx(list(b), abs=1e-3) for a, b in zip(get_fbx_world_matrix(armature, empty), world))
+
+    with compensate_bone_parent_drift(bpy.context, [armature, empty, loose]):
+        assert_matrix_equal(get_fbx_world_matrix(armature, empty), world)
+        assert tuple(loose.location) == (1.0, 2.0, 3.0)
+
+    assert_matrix_equal(empty.matrix_world, world)
+
+
+def test_empties_are_restored_after_errors(rig):
+    armature, empty, loose = rig
+    basis = empty.matrix_basis.copy()
+
+    with pytest.raises(RuntimeError):
+        with compensate_bone_parent_drift(bpy.context, [empty]):
+            raise RuntimeError("Export failed")
+
+    assert_matrix_equal(empty.matrix_basis, basis)
+
+
+def test_blender_bone_axes_need_no_compensation(rig):
+    armature, empty, loose = rig
+    basis = empty.matrix_basis.copy()
+
+    with compensate_bone_parent_drift(bpy.context, [empty], primary_bone_axis='Y', secondary_bone_axis='X'):
+        assert empty.matrix_basis == basis
+        assert_matrix_equal(get_fbx_world_matrix(armature, empty, 'Y', 'X'), empty.matrix_world)
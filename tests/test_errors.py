@@ -0,0 +1,197 @@
+import bpy
+import pytest
+
+from mathutils import Vector
+
+from seut import seut_errors
+
+
+@pytest.fixture
+def reports(monkeypatch):
+    reports = []
+    monkeypatch.setattr(seut_errors, 'seut_report', lambda self, context, report_type, can_report, code, *args: reports.append((code,) + args))
+    return reports
+
+
+@pytest.fixture
+def objects():
+    objects = []
+
+    def add(name: str, verts: list, faces: list, uvs: list = None):
+        mesh = bpy.data.meshes.new(name)
+        mesh.from_pydata(verts, [], faces)
+        if uvs is not None:
+            layer = mesh.uv_layers.new()
+            for loop in mesh.loops:
+                layer.data[loop.index].uv = uvs[loop.index]
+        obj = bpy.data.objects.new(name, mesh)
+        objects.append(obj)
+        return obj
+
+    yield add
+
+    for obj in objects:
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+
+def get_grid(size: int) -> tuple:
+    """Returns the vertices and quads of a connected grid of size x size faces."""
+
+    verts = [(x, y, 0.0) for y in range(size + 1) for x in range(size + 1)]
+    faces = [(y * (size + 1) + x, y * (size + 1) + x + 1, (y + 1) * (size + 1) + x + 1, (y + 1) * (size + 1) + x) for y in range(size) for x in range(size)]
+    return verts, faces
+
+
+def get_grid_uvs(verts: list, faces: list, size: int) -> list:
+    return [(verts[v][0] / size, verts[v][1] / size) for face in faces for v in face]
+
+
+def check_uvms_loop(obj) -> list:
+    """The UV check before it was vectorised, without the UV island check."""
+
+    codes = []
+    if len(obj.data.uv_layers) < 1:
+        return ['E032']
+
+    at_zero = 0
+    obj_total = len(obj.data.uv_layers.active.data)
+    for loop in obj.data.loops:
+        uv = obj.data.uv_layers.active.data[loop.index].uv
+        if uv == Vector((0.0, 0.0)):
+            at_zero += 1
+
+    if obj_total <= 0:
+        return ['W013']
+
+    if (at_zero / obj_total) > 0.25 and at_zero > 10:
+        return ['E042']
+    elif (at_zero / obj_total) > 0.005 and at_zero > 10:
+        codes.append('W002')
+
+    return codes
+
+
+def get_meshes(objects) -> dict:
+    verts, faces = get_grid(4)
+    uvs = get_grid_uvs(verts, faces, 4)
+
+    big_verts, big_faces = get_grid(30)
+    big_uvs = get_grid_uvs(big_verts, big_faces, 30)
+
+    # A few percent of the loops at the origin of the UV square.
+    some_at_zero = list(big_uvs)
+    for idx in range(0, 80, 4):
+        some_at_zero[idx] = (0.0, 0.0)
+
+    # A face without area, in 3D and UV, that shares its edges and their UVs with the rest of the grid.
+    sliver_faces = faces + [(0, 1, 2)]
+    sliver_uvs = get_grid_uvs(verts, sliver_faces, 4)
+
+    return {
+        'no_uv_layer': objects("NoUVLayer", verts, faces),
+        'no_loops': objects("NoLoops", verts, [], uvs=[]),
+        'grid': objects("Grid", verts, faces, uvs),
+        'mostly_at_zero': objects("MostlyAtZero", verts, faces, [(0.0, 0.0)] * len(uvs)),
+        'some_at_zero': objects("SomeAtZero", big_verts, big_faces, some_at_zero),
+        'zero_area_face': objects("ZeroAreaFace", verts, sliver_faces, sliver_uvs),
+    }
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('no_uv_layer', ['E032']),
+    ('no_loops', ['W013']),
+    ('grid', []),
+    ('mostly_at_zero', ['E042']),
+    ('some_at_zero', ['W002']),
+    ('zero_area_face', []),
+])
+def test_check_uvms_matches_loop(reports, objects, name, expected):
+    obj = get_meshes(objects)[name]
+    assert check_uvms_loop(obj) == expected
+
+    result = seut_errors.check_uvms(None, bpy.context, obj)
+
+    assert [r[0] for r in reports] == expected
+    assert result == ({'CANCELLED'} if any(code.startswith('E') for code in expected) else {'CONTINUE'})
+
+
+def test_zero_area_island_is_reported(reports, objects):
+    # Two quads that do not share an edge. The second one has all its UVs on one point.
+    verts = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (2, 0, 0), (3, 0, 0), (3, 1, 0), (2, 1, 0)]
+    faces = [(0, 1, 2, 3), (4, 5, 6, 7)]
+    uvs = [(0.0, 0.0), (0.5, 0.0), (0.5, 0.5), (0.0, 0.5)] + [(0.75, 0.75)] * 4
+    obj = objects("Islands", verts, faces, uvs)
+
+    assert seut_errors.check_uvms(None, bpy.context, obj) == {'CONTINUE'}
+    assert reports == [('W022', "Islands", 1, 2)]
+
+
+def get_weights(obj) -> list:
+    return [{obj.vertex_groups[g.group].name: round(g.weight, 4) for g in v.groups} for v in obj.data.vertices]
+
+
+@pytest.fixture
+def rigged(objects):
+    """Four vertices: one in six groups, two in one group each and one without weight."""
+
+    obj = objects("Rigged", [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], [(0, 1, 2, 3)])
+    for i in range(6):
+        obj.vertex_groups.new(name=f"Bone{i}").add([0], (i + 1) / 10, 'REPLACE')
+    obj.vertex_groups['Bone0'].add([1, 2], 0.5, 'REPLACE')
+    obj.vertex_groups['Bone1'].add([3], 0.0, 'REPLACE')
+    return obj
+
+
+def test_vertices_in_more_than_four_groups_are_left_alone(reports, rigged):
+    rigged.vertex_groups['Bone1'].add([3], 0.5, 'REPLACE')
+    weights = get_weights(rigged)
+
+    assert seut_errors.check_weights(bpy.context, rigged) is True
+    assert reports == []
+    assert get_weights(rigged) == weights
+
+
+def test_weights_above_one_are_clamped_and_reported(reports, rigged, monkeypatch):
+    rigged.vertex_groups['Bone1'].add([3], 0.5, 'REPLACE')
+
+    # Blender clamps weights set through Python, but e.g. importers can write larger ones, so they are added to the read.
+    get_vertex_weights = seut_errors.get_vertex_weights
+
+    def get_overweighted(mesh):
+        vertices, groups, weights = get_vertex_weights(mesh)
+        weights[4] = 1.5
+        weights[7] = 2.0
+        return vertices, groups, weights
+
+    monkeypatch.setattr(seut_errors, 'get_vertex_weights', get_overweighted)
+    expected = get_weights(rigged)
+    expected[0]['Bone4'] = 1.0
+    expected[2]['Bone0'] = 1.0
+
+    assert seut_errors.check_weights(bpy.context, rigged) is True
+    assert reports == [('W028', "Rigged", 2)]
+    assert get_weights(rigged) == expected
+
+
+def test_unweighted_and_ungrouped_vertices_are_marked(reports, rigged):
+    rigged.vertex_groups['Bone0'].remove([1])
+    weights = get_weights(rigged)
+
+    assert seut_errors.check_weights(bpy.context, rigged) is False
+    assert [r[0] for r in reports] == ['E051']
+    assert "Problematic - Ungrouped" in reports[0][2]
+
+    after = get_weights(rigged)
+    assert after[1] == {"Problematic - Ungrouped": 0.0, "Problematic - Unweighted": 0.0}
+    assert after[3] == dict(weights[3], **{"Problematic - Unweighted": 0.0})
+    assert after[0] == weights[0] and after[2] == weights[2]
+
+    # Once painted, the vertices are no longer marked and the marker groups are removed.
+    rigged.vertex_groups['Bone0'].add([1, 3], 0.5, 'REPLACE')
+    reports.clear()
+
+    assert seut_errors.check_weights(bpy.context, rigged) is True
+    assert reports == []
+    assert [grp.name for grp in rigged.vertex_groups] == [f"Bone{i}" for i in range(6)]
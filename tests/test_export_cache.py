@@ -0,0 +1,105 @@
+import os
+import types
+
+import bpy
+import pytest
+
+from seut.export import seut_export_cache, seut_export_utils
+from seut.export.seut_export_utils import ExportContext, export_collection
+
+
+@pytest.fixture
+def scene(seut_props, tmp_path, monkeypatch):
+    """A scene with a main collection holding a mesh and the kinds of empties the export changes."""
+
+    monkeypatch.setattr(seut_export_utils, 'export_xml', lambda *args: {'FINISHED'})
+    monkeypatch.setattr(seut_export_utils, 'export_to_fbxfile', lambda *args, **kwargs: None)
+    monkeypatch.setattr(seut_export_utils, 'seut_report', lambda *args: None)
+
+    scene = bpy.context.scene
+    scene.seut['subtypeId'] = "Block"
+    scene.seut['export_exportPath'] = str(tmp_path)
+    scene.seut.export_incremental = True
+
+    subpart_scene = bpy.data.scenes.new("Subpart")
+    subpart_scene.seut['subtypeId'] = "Block_Door"
+
+    seut = bpy.data.collections.new("SEUT (Test)")
+    scene.collection.children.link(seut)
+    main = bpy.data.collections.new("Main (Test)")
+    main.seut.scene = scene
+    main.seut.col_type = 'main'
+    seut.children.link(main)
+
+    mesh = bpy.data.objects.new("Block", bpy.data.meshes.new("Block"))
+    mesh.data.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+    main.objects.link(mesh)
+
+    bpy.data.objects.new("subpart_door", None)
+    subpart = bpy.data.objects.new("subpart_door.001", None)
+    subpart.parent = mesh
+    subpart['file'] = "Block_Door"
+    subpart.seut.linkedScene = subpart_scene
+    main.objects.link(subpart)
+
+    highlight = bpy.data.objects.new("dummy_terminal", None)
+    highlight.parent = mesh
+    highlight['highlight'] = ""
+    highlight.seut.highlight_objects.add().obj = mesh
+    main.objects.link(highlight)
+
+    yield scene
+
+    bpy.data.collections.remove(main)
+    bpy.data.collections.remove(seut)
+    for obj in [mesh, subpart, highlight, bpy.data.objects.get("subpart_door.001")]:
+        if obj is not None and obj.name in bpy.data.objects:
+            bpy.data.objects.remove(obj)
+    bpy.data.scenes.remove(subpart_scene)
+
+
+def export(scene) -> ExportContext:
+    """Exports the main collection and, as a successful MWM build would, commits its cache entry."""
+
+    export_context = ExportContext(scene, 'large')
+    main = seut_export_utils.get_collections(scene)['main'][0]
+    export_collection(types.SimpleNamespace(), bpy.context, [export_context], main)
+
+    for filename in export_context.pending:
+        with open(os.path.join(export_context.export_path, f"{filename}.mwm"), 'w') as mwm:
+            mwm.write(filename)
+    seut_export_cache.commit_export_cache(export_context.export_path, export_context.pending)
+
+    return export_context
+
+
+def test_unchanged_collection_is_skipped(scene):
+    assert export(scene).skipped == set()
+
+    for i in range(2):
+        export_context = export(scene)
+        assert export_context.skipped == {"Main (Test)"}
+        assert export_context.pending == {}
+
+
+def test_changed_collection_is_exported(scene):
+    export(scene)
+    bpy.data.objects["Block"].location.x += 1.0
+    bpy.context.view_layer.update()
+
+    assert export(scene).skipped == set()
+
+
+def test_missing_mwm_is_rebuilt(scene):
+    export_context = export(scene)
+    os.remove(os.path.join(export_context.export_path, "Block.mwm"))
+
+    assert export(scene).skipped == set()
+
+
+def test_outdated_manifest_is_ignored(tmp_path):
+    manifest_path = seut_export_cache.get_manifest_path(str(tmp_path))
+    with open(manifest_path, 'w') as manifest_file:
+        manifest_file.write('{"version": 0, "collections": {"Block": {}}}')
+
+    assert seut_export_cache.load_manifest(str(tmp_path))['collections'] == {}
@@ -0,0 +1,67 @@
+import types
+
+import pytest
+
+from seut.export.seut_export_utils import ExportContext
+
+
+def get_scene(grid_scale: str, path: str, large=True, small=True, medium=False):
+    seut = types.SimpleNamespace(gridScale=grid_scale, subtypeId="Block", export_exportPath=path, export_largeGrid=large,
+                                 export_smallGrid=small, export_medium_grid=medium)
+    return types.SimpleNamespace(seut=seut)
+
+
+@pytest.mark.parametrize('grid_scale, grid_size, medium, subtype_id, rescale_factor, path', [
+    ('large', 'large', False, "LG_Block", 1.0, "/mod/Models/Cubes/large"),
+    ('large', 'small', False, "SG_Block", 0.2, "/mod/Models/Cubes/small"),
+    ('large', 'small', True, "SG_Block", 0.6, "/mod/Models/Cubes/small"),
+    ('small', 'large', False, "LG_Block", 5.0, "/mod/Models/Cubes/large"),
+    ('small', 'large', True, "LG_Block", 3.0, "/mod/Models/Cubes/large"),
+    ('small', 'small', False, "SG_Block", 1.0, "/mod/Models/Cubes/small"),
+])
+def test_export_context(grid_scale, grid_size, medium, subtype_id, rescale_factor, path):
+    scene = get_scene(grid_scale, f"\\mod\\Models\\Cubes\\{grid_scale}", medium=medium)
+    export_context = ExportContext(scene, grid_size)
+
+    assert export_context.grid_scale == grid_size
+    assert export_context.subtype_id == subtype_id
+    assert export_context.rescale_factor == rescale_factor
+    assert export_context.export_path.replace("\\", "/").endswith(path)
+
+
+def test_export_context_leaves_scene_alone():
+    scene = get_scene('large', "/mod/Models/Cubes/large", small=False)
+    export_context = ExportContext(scene, 'small')
+
+    assert export_context.subtype_id == "Block"
+    assert scene.seut.gridScale == 'large'
+    assert scene.seut.subtypeId == "Block"
+    assert scene.seut.export_exportPath == "/mod/Models/Cubes/large"
+
+
+def test_subpart_references_are_restored_after_export(seut_props):
+    import bpy
+    from seut.export.seut_export_utils import prepare_empties, keep_subpart_references
+
+    scene = bpy.context.scene
+    subpart_scene = bpy.data.scenes.new("Door")
+    subpart_scene.seut.subtypeId = "Block_Door_LG"
+
+    collection = bpy.data.collections.new("Main (Test)")
+    scene.collection.children.link(collection)
+    empty = bpy.data.objects.new("subpart_door", None)
+    collection.objects.link(empty)
+    empty['file'] = "Block_Door_LG"
+    empty.seut.linkedScene = subpart_scene
+
+    try:
+        with keep_subpart_references(scene):
+            prepare_empties(bpy.context, ExportContext(scene, 'small'), collection)
+            assert empty['file'] == "Block_Door_SG"
+
+        assert empty['file'] == "Block_Door_LG"
+
+    finally:
+        bpy.data.objects.remove(empty)
+        bpy.data.collections.remove(collection)
+        bpy.data.scenes.remove(subpart_scene)
@@ -0,0 +1,102 @@
+import bpy
+import pytest
+
+from mathutils import Matrix
+
+from seut.export import seut_export_utils
+from seut.export import seut_custom_fbx_exporter as exporter
+from seut.export.seut_export_utils import ExportContext
+
+
+class Operator:
+    def report(self, *args):
+        pass
+
+
+def write(path, obj, scale: float):
+    exporter.save_single(Operator(), bpy.context.scene, bpy.context.evaluated_depsgraph_get(), filepath=str(path), context_objects=[obj],
+                         object_types={'MESH'}, use_mesh_modifiers=True, global_matrix=Matrix.Scale(scale, 4), axis_forward='Z', axis_up='Y', use_metadata=False)
+
+
+def read_vertices(path) -> list:
+    """Imports an FBX and returns the world positions of the vertices of its mesh."""
+
+    existing = set(bpy.data.objects)
+    bpy.ops.import_scene.fbx(filepath=str(path))
+    imported = [obj for obj in bpy.data.objects if obj not in existing]
+
+    try:
+        obj = next(obj for obj in imported if obj.type == 'MESH')
+        return [tuple(round(c, 5) for c in obj.matrix_world @ v.co) for v in obj.data.vertices]
+    finally:
+        for obj in imported:
+            bpy.data.objects.remove(obj)
+
+
+@pytest.fixture
+def mesh():
+    bpy.ops.mesh.primitive_monkey_add(location=(1, 2, 3), rotation=(0.3, 0, 0.5))
+    obj = bpy.context.object
+
+    yield obj
+
+    bpy.data.objects.remove(obj)
+
+
+def test_geometry_is_extracted_once_for_all_grid_sizes(tmp_path, mesh, monkeypatch):
+    extracted = []
+    original = exporter._original_fbx_data_mesh_elements
+
+    def extract(*args):
+        extracted.append(args[1])
+        return original(*args)
+
+    monkeypatch.setattr(exporter, '_original_fbx_data_mesh_elements', extract)
+
+    with exporter.use_geometry_cache():
+        write(tmp_path / "large.fbx", mesh, 1.0)
+        write(tmp_path / "small.fbx", mesh, 0.2)
+
+    assert len(extracted) == 1
+
+    # A file with reused geometry matches one written on its own.
+    write(tmp_path / "small_fresh.fbx", mesh, 0.2)
+    assert len(extracted) == 2
+    assert read_vertices(tmp_path / "small.fbx") == read_vertices(tmp_path / "small_fresh.fbx")
+    assert read_vertices(tmp_path / "small.fbx") != read_vertices(tmp_path / "large.fbx")
+
+
+def test_collection_is_written_once_per_changed_grid_size(seut_props, monkeypatch):
+    scene = bpy.context.scene
+    scene.seut.subtypeId = "Block"
+    scene.seut.gridScale = 'large'
+    scene.seut.export_largeGrid = True
+    scene.seut.export_smallGrid = True
+
+    collection = bpy.data.collections.new("Main (Block)")
+    scene.collection.children.link(collection)
+    collection.seut.scene = scene
+    collection.seut.col_type = 'main'
+
+    written = []
+    monkeypatch.setattr(seut_export_utils, 'prepare_empties', lambda context, export_context, collection: written.append(('prepare', export_context.grid_scale)))
+    # The large grid files are unchanged since the last export.
+    monkeypatch.setattr(seut_export_utils, 'check_collection_cache', lambda context, export_context, collection, filename: export_context.grid_scale == 'large')
+    monkeypatch.setattr(seut_export_utils, 'export_xml', lambda self, context, export_context, collection: written.append(('xml', export_context.subtype_id)) or {'FINISHED'})
+    monkeypatch.setattr(seut_export_utils, 'export_fbx', lambda self, context, export_context, collection: written.append(('fbx', exporter.geometry_cache is not None)) or {'FINISHED'})
+
+    try:
+        export_contexts = [ExportContext(scene, 'large'), ExportContext(scene, 'small')]
+        results = seut_export_utils.export_collection(None, bpy.context, export_contexts, collection)
+
+        assert results == [{'FINISHED'}, {'FINISHED'}]
+        assert written == [('prepare', 'large'), ('prepare', 'small'), ('xml', "SG_Block"), ('fbx', True)]
+
+        # Nothing is written if both are unchanged.
+        written.clear()
+        monkeypatch.setattr(seut_export_utils, 'check_collection_cache', lambda *args: True)
+        assert seut_export_utils.export_collection(None, bpy.context, export_contexts, collection) == [{'FINISHED'}]
+        assert written == [('prepare', 'large'), ('prepare', 'small')]
+
+    finally:
+        bpy.data.collections.remove(collection)
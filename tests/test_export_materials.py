@@ -0,0 +1,113 @@
+import bpy
+import pytest
+
+from mathutils import Matrix
+
+from seut.export import seut_export_utils
+from seut.export import seut_custom_fbx_exporter as exporter
+from seut.export.seut_export_utils import export_material_session, get_export_materials
+
+
+class Operator:
+    def report(self, *args):
+        pass
+
+
+def get_nodes(material) -> list:
+    return sorted((node.name, node.type) for node in material.node_tree.nodes)
+
+
+def get_links(material) -> list:
+    return sorted((link.from_node.name, link.to_node.name) for link in material.node_tree.links)
+
+
+@pytest.fixture
+def reports(monkeypatch):
+    reports = []
+    monkeypatch.setattr(seut_export_utils, 'seut_report', lambda self, context, report_type, can_report, code, *args: reports.append((code,) + args))
+    return reports
+
+
+@pytest.fixture
+def mesh_objects():
+    """Two meshes sharing a material, one of them with a second one whose output is not connected and an empty slot."""
+
+    shared = bpy.data.materials.new("Shared")
+    shared.use_nodes = True
+    unlinked = bpy.data.materials.new("Unlinked")
+    unlinked.use_nodes = True
+    for link in list(unlinked.node_tree.links):
+        unlinked.node_tree.links.remove(link)
+
+    objects = []
+    for name, materials in [("Block", [shared, unlinked, None]), ("Door", [shared])]:
+        mesh = bpy.data.meshes.new(name)
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+        mesh.uv_layers.new()
+        obj = bpy.data.objects.new(name, mesh)
+        for material in materials:
+            obj.data.materials.append(material)
+        bpy.context.scene.collection.objects.link(obj)
+        objects.append(obj)
+
+    yield objects, shared, unlinked
+
+    for obj in objects:
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+    bpy.data.materials.remove(shared)
+    bpy.data.materials.remove(unlinked)
+
+
+def test_materials_are_exported_as_stand_ins(reports, mesh_objects):
+    objects, shared, unlinked = mesh_objects
+    nodes, links = get_nodes(shared), get_links(shared)
+
+    wrappers = get_export_materials(None, bpy.context, objects)
+
+    assert set(wrappers) == {shared, unlinked}
+    assert wrappers[shared].material == shared
+    assert wrappers[shared].base_color_texture.image == bpy.data.images['DUMMY']
+    assert reports == [('I005', "Unlinked")]
+
+    # The materials themselves are left alone.
+    assert get_nodes(shared) == nodes
+    assert get_links(shared) == links
+    assert get_links(unlinked) == []
+
+
+def test_stand_ins_are_shared_within_a_session(reports, mesh_objects):
+    objects, shared, unlinked = mesh_objects
+
+    with export_material_session():
+        first = get_export_materials(None, bpy.context, objects[:1])
+
+        # E.g. the FBX of another collection, or the same collection for the other grid size.
+        with export_material_session():
+            second = get_export_materials(None, bpy.context, objects[1:])
+
+        third = get_export_materials(None, bpy.context, objects)
+
+    assert second[shared] is first[shared]
+    assert third[unlinked] is first[unlinked]
+    assert [r[0] for r in reports] == ['I005']
+
+    # Outside of a session, every export builds its own.
+    assert get_export_materials(None, bpy.context, objects)[shared] is not first[shared]
+
+
+def test_fbx_uses_stand_ins_without_changing_materials(reports, mesh_objects, tmp_path):
+    objects, shared, unlinked = mesh_objects
+    nodes = get_nodes(shared)
+    path = tmp_path / "Block.fbx"
+
+    with exporter.use_material_wrappers(get_export_materials(None, bpy.context, objects[:1])):
+        exporter.save_single(Operator(), bpy.context.scene, bpy.context.evaluated_depsgraph_get(), filepath=str(path), context_objects=objects[:1],
+                             object_types={'MESH'}, use_mesh_modifiers=True, global_matrix=Matrix.Identity(4), axis_forward='Z', axis_up='Y', use_metadata=False)
+
+    content = path.read_bytes()
+    assert b"Shared" in content and b"Unlinked" in content
+    assert b"DUMMY" in content
+    assert get_nodes(shared) == nodes
+    assert exporter.material_wrappers == {}
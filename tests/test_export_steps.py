@@ -0,0 +1,124 @@
+import sys
+import time
+import types
+import threading
+import subprocess
+
+import pytest
+
+from concurrent.futures import Future
+
+from seut.export import seut_export_steps
+from seut.utils import seut_tool_utils
+from seut.utils.seut_tool_utils import run_tool_process, reset_tool_cancellation
+
+
+def get_context():
+    return types.SimpleNamespace(
+        window_manager=types.SimpleNamespace(event_timer_remove=lambda timer: None, windows=[]),
+        workspace=types.SimpleNamespace(status_text_set=lambda text: None),
+    )
+
+
+def export_steps():
+    yield "Stage"
+    yield Future()
+
+
+@pytest.fixture
+def operator(seut_props, monkeypatch):
+    monkeypatch.setattr(seut_export_steps, 'seut_report', lambda *args: None)
+    reset_tool_cancellation()
+
+    operator = types.SimpleNamespace(timer=None)
+    operator.job = seut_export_steps.ExportJob(export_steps(), 1, [])
+    seut_export_steps.progress['running'] = True
+    return operator
+
+
+@pytest.mark.parametrize('end', ['escape', 'changed'])
+def test_tools_run_again_after_cancelled_export(operator, monkeypatch, end):
+    context = get_context()
+
+    if end == 'escape':
+        result = seut_export_steps.update_export_job(operator, context, types.SimpleNamespace(type='ESC', value='PRESS'))
+    else:
+        monkeypatch.setattr(operator.job, 'check_data', lambda context: "scene 'Test' was removed")
+        result = seut_export_steps.update_export_job(operator, context, types.SimpleNamespace(type='TIMER', value='NOTHING'))
+
+    assert result == {'CANCELLED'}
+    assert not seut_export_steps.is_export_running()
+
+    # E.g. the texture conversion or the FBX import.
+    assert run_tool_process([sys.executable, "-c", "print('ok')"]).strip() == b"ok"
+
+
+def start_sleeping_tool(seconds: int) -> Future:
+    script = f"import time; print('Started', flush=True); time.sleep({seconds})"
+    started = threading.Event()
+    future = seut_export_steps.run_in_background(run_tool_process, [sys.executable, "-c", script], on_line=lambda line: started.set())
+    assert started.wait(10)
+    return future
+
+
+def test_failed_export_stops_its_tools(operator, monkeypatch):
+    tools = []
+
+    def steps():
+        # E.g. the Havok conversion of a collection, still running when a later step raises.
+        tools.append(start_sleeping_tool(30))
+        yield tools[0]
+
+    operator.job = seut_export_steps.ExportJob(steps(), 1, [])
+    assert operator.job.advance() is False
+
+    def advance():
+        raise RuntimeError("Step failed")
+
+    monkeypatch.setattr(operator.job, 'check_data', lambda context: None)
+    monkeypatch.setattr(operator.job, 'advance', advance)
+    result = seut_export_steps.update_export_job(operator, get_context(), types.SimpleNamespace(type='TIMER', value='NOTHING'))
+
+    assert result == {'CANCELLED'}
+    assert isinstance(tools[0].exception(10), subprocess.CalledProcessError)
+    assert not seut_export_steps.is_export_running()
+
+
+def test_cancelled_export_leaves_other_tools_running(operator, monkeypatch):
+    script = "import sys, time; print('Started', flush=True); time.sleep(float(sys.argv[1])); print('Done')"
+    started = threading.Semaphore(0)
+
+    def call_tool(args, timeout=None):
+        return run_tool_process([sys.executable, "-c", script] + args, on_line=lambda line: started.release())
+
+    monkeypatch.setattr(seut_tool_utils, 'call_tool', call_tool)
+
+    def steps():
+        yield start_sleeping_tool(30)
+
+    operator.job = seut_export_steps.ExportJob(steps(), 1, [])
+    assert operator.job.advance() is False
+    exporting = operator.job.waiting
+
+    # E.g. a texture conversion that runs while the export is cancelled.
+    group = seut_tool_utils.ToolGroup()
+    converting = seut_tool_utils.start_tools([["1"]], group=group)
+    assert started.acquire(timeout=10)
+
+    result = seut_export_steps.update_export_job(operator, get_context(), types.SimpleNamespace(type='ESC', value='PRESS'))
+
+    assert result == {'CANCELLED'}
+    assert isinstance(exporting.exception(10), subprocess.CalledProcessError)
+    assert converting[0].result(timeout=10).split() == [b"Started", b"Done"]
+
+    # Batches the conversion starts afterwards still run.
+    assert seut_tool_utils.start_tools([["0"]], group=group)[0].result(timeout=10).split() == [b"Started", b"Done"]
+    assert not seut_tool_utils.tools_cancelled.is_set()
+
+
+def test_editing_events_are_blocked(operator):
+    event = types.SimpleNamespace(type='Z', value='PRESS')
+    assert seut_export_steps.update_export_job(operator, get_context(), event) == {'RUNNING_MODAL'}
+
+    event = types.SimpleNamespace(type='WHEELUPMOUSE', value='PRESS')
+    assert seut_export_steps.update_export_job(operator, get_context(), event) == {'PASS_THROUGH'}
@@ -0,0 +1,158 @@
+import sys
+import json
+import time
+import types
+
+import bpy
+import pytest
+
+from mathutils import Matrix
+
+from seut.export import seut_export_utils
+from seut.export import seut_custom_fbx_exporter as exporter
+from seut.export.seut_export_trace import trace_session, trace_span
+from seut.export.seut_export_utils import ExportSettings
+from seut.export.seut_mwmbuilder import MwmBuildJob, MwmBuildQueue
+from seut.utils.seut_tool_runner import ToolRunner
+from seut.utils.seut_tool_utils import run_tool_process, reset_tool_cancellation
+
+
+# A stand-in for MWM Builder: waits until the file 'go' is in its source folder and exits with the code written to it.
+TOOL = f"""#!{sys.executable}
+import os
+import sys
+import time
+
+go = os.path.join(sys.argv[2][3:], 'go')
+while not os.path.exists(go):
+    time.sleep(0.01)
+time.sleep(0.05)
+print("Done")
+with open(go) as f:
+    sys.exit(int(f.read()))
+"""
+
+
+class Operator:
+    def report(self, *args):
+        pass
+
+
+class LocalToolRunner(ToolRunner):
+
+    def run(self, cmdline: list, cwd=None, log=None, fatal_patterns: list = None, on_line=None, on_start=None, timeout: float = None) -> tuple:
+        return run_tool_process(cmdline, cwd=cwd, log=log, fatal_patterns=fatal_patterns, on_line=on_line), cmdline
+
+
+@pytest.fixture
+def tool(seut_props, tmp_path, monkeypatch):
+    monkeypatch.setenv('SEUT_TRACE', "1")
+    monkeypatch.setattr(seut_export_utils, 'get_tool_runner', lambda: LocalToolRunner())
+    reset_tool_cancellation()
+
+    path = tmp_path / 'MwmBuilder.exe'
+    path.write_text(TOOL)
+    path.chmod(0o755)
+
+    yield str(path)
+
+    # Stops the stand-ins a failed test left waiting.
+    for folder in tmp_path.iterdir():
+        if folder.is_dir() and not (folder / 'go').exists():
+            (folder / 'go').write_text("1")
+
+
+def start_mwmbuilder(queue: MwmBuildQueue, tool: str, path) -> MwmBuildJob:
+    path.mkdir()
+    settings = ExportSettings(bpy.context.scene, None)
+    settings._mwmbuilder = tool
+
+    job = MwmBuildJob(bpy.context, types.SimpleNamespace(subtype_id="Block"), str(path), str(path), settings, str(path))
+    queue.submit(job)
+    return job
+
+
+def load_spans(path) -> dict:
+    # The trace is written by whichever is done last, the session or a job's done-callback, which may run after its result was returned.
+    deadline = time.time() + 10
+    while True:
+        try:
+            with open(path) as trace_file:
+                events = json.load(trace_file)['traceEvents']
+            break
+        except (OSError, ValueError):
+            if time.time() > deadline:
+                raise
+            time.sleep(0.01)
+
+    spans = {}
+    for event in events:
+        if event['ph'] == 'X':
+            spans.setdefault(event['name'], []).append(event)
+    return spans
+
+
+def assert_within(child: dict, parent: dict):
+    assert parent['ts'] <= child['ts']
+    assert child['ts'] + child['dur'] <= parent['ts'] + parent['dur']
+
+
+def test_spans_of_the_export_are_nested(tool, tmp_path):
+    bpy.ops.mesh.primitive_cube_add()
+    obj = bpy.context.object
+    trace_path = tmp_path / 'Block.trace.json'
+    queue = MwmBuildQueue(max_workers=1)
+
+    try:
+        with trace_session(str(trace_path)), exporter.fbx_write_session():
+            with trace_span("Export Scene", scene="Block"):
+                with trace_span("Main", scene="Block"):
+                    fbx_path = str(tmp_path / 'Block.fbx')
+                    with trace_span("FBX", category='fbx', file='Block.fbx'):
+                        exporter.save_single(Operator(), bpy.context.scene, bpy.context.evaluated_depsgraph_get(), filepath=fbx_path, context_objects=[obj],
+                                             object_types={'MESH'}, use_mesh_modifiers=True, global_matrix=Matrix.Identity(4), axis_forward='Z', axis_up='Y', use_metadata=False)
+                    exporter.finish_fbx_write(fbx_path)
+
+                with trace_span("MWM", scene="Block"):
+                    job = start_mwmbuilder(queue, tool, tmp_path / 'Models')
+                    (tmp_path / 'Models' / 'go').write_text("3")
+                    assert job.future.result(timeout=10)[0] == 3
+    finally:
+        bpy.data.objects.remove(obj)
+
+    spans = load_spans(trace_path)
+    scene, main, fbx, fbx_write, mwm, mwmbuilder = [spans[name][0] for name in ["Export Scene", "Main", "FBX", "FBX Write", "MWM", "MwmBuilder.exe"]]
+
+    assert_within(main, scene)
+    assert_within(fbx, main)
+    assert_within(fbx_write, main)
+    assert_within(mwm, scene)
+    assert_within(mwmbuilder, mwm)
+
+    assert (fbx['cat'], fbx_write['cat'], mwmbuilder['cat']) == ('fbx', 'fbx', 'tool')
+    assert mwmbuilder['args']['exit_code'] == 3
+    # MWM Builder and the FBX write run on the tool pool.
+    assert mwmbuilder['tid'] != scene['tid'] and fbx_write['tid'] != scene['tid']
+
+
+def test_queued_builds_are_recorded_in_the_trace_of_their_scene(tool, tmp_path):
+    queue = MwmBuildQueue(max_workers=2)
+
+    # As in Export All Scenes, the MWM Builder run of the first scene is still running while the next scene is exported.
+    with trace_session(str(tmp_path / 'Block.trace.json')):
+        block = start_mwmbuilder(queue, tool, tmp_path / 'Block')
+
+    assert not (tmp_path / 'Block.trace.json').exists()
+
+    with trace_session(str(tmp_path / 'Door.trace.json')):
+        door = start_mwmbuilder(queue, tool, tmp_path / 'Door')
+        (tmp_path / 'Door' / 'go').write_text("0")
+        (tmp_path / 'Block' / 'go').write_text("2")
+        assert door.future.result(timeout=10)[0] == 0
+        assert block.future.result(timeout=10)[0] == 2
+
+    block_spans = load_spans(tmp_path / 'Block.trace.json')
+    door_spans = load_spans(tmp_path / 'Door.trace.json')
+
+    assert [span['args']['exit_code'] for span in block_spans['MwmBuilder.exe']] == [2]
+    assert [span['args']['exit_code'] for span in door_spans['MwmBuilder.exe']] == [0]
@@ -0,0 +1,21 @@
+from seut import seut_farm
+
+
+def test_files_are_distributed_by_size(tmp_path):
+    files = []
+    for name, size in [('a', 5), ('b', 4), ('c', 3), ('d', 2)]:
+        path = tmp_path / f"{name}.blend"
+        path.write_bytes(b"0" * size)
+        files.append(str(path))
+
+    shares = seut_farm.distribute_files(files, 2)
+    assert [[f[-7:] for f in share] for share in shares] == [['a.blend', 'd.blend'], ['b.blend', 'c.blend']]
+
+    assert len(seut_farm.distribute_files(files[:1], 4)) == 1
+
+
+def test_workers_share_the_tool_pool(tmp_path):
+    worker = seut_farm.Worker(0, 'blender', ['a.blend'], [], str(tmp_path), 3)
+
+    assert worker.env['SEUT_TOOL_WORKERS'] == "3"
+    assert worker.env['SEUT_MWMB_WORKERS'] == "3"
@@ -0,0 +1,95 @@
+import os
+import threading
+
+from types import SimpleNamespace
+
+import bpy
+import pytest
+
+from mathutils import Matrix
+
+from seut.export import seut_custom_fbx_exporter as exporter
+from seut.utils.seut_tool_utils import reset_tool_cancellation
+
+
+class Operator:
+    def report(self, *args):
+        pass
+
+
+def write(path, obj):
+    exporter.save_single(Operator(), bpy.context.scene, bpy.context.evaluated_depsgraph_get(), filepath=str(path), context_objects=[obj],
+                         object_types={'MESH'}, use_mesh_modifiers=True, global_matrix=Matrix.Identity(4), axis_forward='Z', axis_up='Y', use_metadata=False)
+
+
+@pytest.fixture
+def meshes():
+    objects = []
+    for i in range(3):
+        bpy.ops.mesh.primitive_monkey_add(location=(i, 0, 0))
+        obj = bpy.context.object
+        bpy.ops.object.modifier_add(type='SUBSURF')
+        obj.modifiers[0].levels = 2
+        objects.append(obj)
+
+    yield objects
+
+    for obj in objects:
+        bpy.data.objects.remove(obj)
+
+
+def test_background_writes_survive_next_gather(tmp_path, meshes, monkeypatch):
+    reset_tool_cancellation()
+
+    for i, obj in enumerate(meshes):
+        write(tmp_path / f"fg_{i}.fbx", obj)
+
+    # The first file is only written once the second one is being gathered.
+    gathering = threading.Event()
+    written = threading.Event()
+    original_write = exporter._original_encode_bin.write
+    original_objects_elements = exporter._fbx.fbx_objects_elements
+
+    def slow_write(*args):
+        gathering.wait(5)
+        try:
+            original_write(*args)
+        finally:
+            written.set()
+
+    def objects_elements(*args):
+        if exporter.fbx_writes:
+            gathering.set()
+            written.wait(5)
+        return original_objects_elements(*args)
+
+    monkeypatch.setattr(exporter, '_original_encode_bin', SimpleNamespace(write=slow_write))
+    monkeypatch.setattr(exporter._fbx, 'fbx_objects_elements', objects_elements)
+
+    with exporter.fbx_write_session(True):
+        for i, obj in enumerate(meshes):
+            write(tmp_path / f"bg_{i}.fbx", obj)
+        writes = exporter.pop_fbx_writes()
+
+    assert [f.exception() for f in writes.values()] == [None] * len(meshes)
+    for i in range(len(meshes)):
+        assert os.path.getsize(tmp_path / f"bg_{i}.fbx") == os.path.getsize(tmp_path / f"fg_{i}.fbx")
+
+
+def test_write_without_session_is_synchronous(tmp_path, meshes):
+    write(tmp_path / "direct.fbx", meshes[0])
+
+    assert exporter.pop_fbx_writes() == {}
+    assert os.path.getsize(tmp_path / "direct.fbx") > 0
+
+
+def test_write_session_only_patches_the_clone_within_the_session(tmp_path, meshes):
+    from io_scene_fbx import encode_bin, export_fbx_bin
+
+    with exporter.fbx_write_session(True):
+        assert exporter._fbx.encode_bin is not encode_bin
+        assert export_fbx_bin.encode_bin is encode_bin
+        write(tmp_path / "session.fbx", meshes[0])
+
+    assert exporter._fbx.encode_bin is encode_bin
+    assert os.path.getsize(tmp_path / "session.fbx") > 0
@@ -0,0 +1,127 @@
+import os
+import types
+
+import bpy
+import pytest
+
+from seut.export import seut_export_utils
+from seut.export.havok import seut_havok_cache, seut_havok_hkt
+from seut.export.seut_export_utils import ExportSettings
+from seut.export.seut_export_steps import run_in_background, run_steps
+
+
+@pytest.fixture
+def hko(cache_dir):
+    yield seut_havok_hkt
+    seut_havok_hkt.clear_hko_files()
+
+
+def read(path: str) -> str:
+    with open(path) as file:
+        return file.read()
+
+
+def test_hko_files_are_shared_per_content(hko):
+    first = hko.get_hko_file("options A")
+    second = hko.get_hko_file("options B")
+
+    assert first != second
+    assert hko.get_hko_file("options A") == first
+    assert read(first) == "options A"
+    assert read(second) == "options B"
+
+
+def test_hko_file_is_not_overwritten_by_other_options(hko):
+    first = hko.get_hko_file("options A")
+    del hko.hko_files["options A"]
+
+    # Still in use by a running conversion.
+    second = hko.get_hko_file("options B")
+
+    assert second != first
+    assert read(first) == "options A"
+
+
+def test_cached_hkt_is_restored(cache_dir, tmp_path):
+    source = tmp_path / 'Block.hkt'
+    source.write_bytes(b"hkt")
+    target = tmp_path / 'Block_BS1.hkt'
+
+    assert not seut_havok_cache.restore_cached_hkt("ab12", str(target))
+
+    seut_havok_cache.store_cached_hkt("ab12", str(source))
+    assert seut_havok_cache.restore_cached_hkt("ab12", str(target))
+    assert target.read_bytes() == b"hkt"
+    assert os.listdir(os.path.dirname(seut_havok_cache.get_cached_hkt_path("ab12"))) == ["ab12.hkt"]
+
+
+def test_failed_store_leaves_no_files(cache_dir, tmp_path):
+    seut_havok_cache.store_cached_hkt("ab12", str(tmp_path / 'missing.hkt'))
+
+    assert not os.path.exists(seut_havok_cache.get_cached_hkt_path("ab12"))
+    assert os.listdir(os.path.dirname(seut_havok_cache.get_cached_hkt_path("ab12"))) == []
+
+
+def test_collision_key(seut_props, monkeypatch):
+    monkeypatch.setattr(seut_havok_cache, 'get_preferences', lambda: types.SimpleNamespace(havok_path="/havok"))
+
+    collection = bpy.data.collections.new("Collision - Main (Test)")
+    bpy.context.scene.collection.children.link(collection)
+    obj = bpy.data.objects.new("Collision", bpy.data.meshes.new("Collision"))
+    obj.data.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+    collection.objects.link(obj)
+
+    try:
+        def get_key(rescale_factor=1.0, havok_options="options"):
+            return seut_havok_cache.get_collision_key(bpy.context, collection, rescale_factor, havok_options)
+
+        key = get_key()
+        assert get_key() == key
+        assert get_key(rescale_factor=0.2) != key
+        assert get_key(havok_options="other") != key
+
+        obj.data.vertices[0].co.x = 0.5
+        assert get_key() != key
+
+    finally:
+        bpy.data.objects.remove(obj)
+        bpy.data.collections.remove(collection)
+
+
+class Settings:
+    """Runs the Havok tools as stand-ins that return the given results or raise the given errors."""
+
+    fbximporter = "FBXImporter.exe"
+    havokfilter = "hctStandAloneFilterManager.exe"
+
+    checkToolResult = ExportSettings.checkToolResult
+    reportToolErrors = ExportSettings.reportToolErrors
+
+    def __init__(self, filter_result):
+        self.filter_result = filter_result
+
+    def runTool(self, cmdline, logfile=None):
+        if cmdline[0] == self.fbximporter:
+            return 0, b"", cmdline
+        if isinstance(self.filter_result, Exception):
+            raise self.filter_result
+        return self.filter_result, b"", cmdline
+
+
+@pytest.mark.parametrize('filter_result', [FileNotFoundError("hctStandAloneFilterManager.exe"), 3])
+def test_failed_havok_filter_is_reported(hko, tmp_path, monkeypatch, filter_result):
+    reports = []
+    monkeypatch.setattr(seut_havok_hkt, 'seut_report', lambda *args: reports.append(args[4]))
+    monkeypatch.setattr(seut_export_utils, 'seut_report', lambda *args: reports.append(args[4]))
+    stored = []
+    monkeypatch.setattr(seut_havok_hkt, 'store_cached_hkt', lambda key, path: stored.append(key))
+
+    target = tmp_path / 'Block.hkt'
+    target.write_bytes(b"hkt")
+    job = seut_havok_hkt.HavokConversionJob(bpy.context, Settings(filter_result), str(tmp_path / 'Block.fbx'), str(target), "options", "ab12")
+    job.future = run_in_background(job.run)
+
+    run_steps(seut_havok_hkt.finish_havok_conversion(bpy.context, job))
+
+    assert 'E061' in reports
+    assert stored == []
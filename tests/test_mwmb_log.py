@@ -0,0 +1,71 @@
+import json
+
+from seut.export.seut_mwmb_log import MwmbLogParser, write_mwmb_report
+
+
+LOG = [
+    (0.0, b"MwmBuilder starting\n"),
+    (1.0, b"Processing file: C:\\export\\Block.fbx\n"),
+    (2.0, b"WARNING: Texture 'C:\\Textures\\Block_cm.dds' not found\n"),
+    (3.0, b"Writing C:\\export\\Block.mwm\n"),
+    (4.0, b"Processing file: C:\\export\\Block_LOD1.fbx\n"),
+    (6.0, b"Program.cs: ERROR: Material 'Missing' is not defined\n"),
+]
+
+
+def parse(tmp_path) -> dict:
+    (tmp_path / 'Block.fbx').write_bytes(b"fbx")
+    (tmp_path / 'Block.mwm').write_bytes(b"mwm")
+
+    parser = MwmbLogParser()
+    for timestamp, line in LOG:
+        parser.feed(line, timestamp)
+
+    return parser.get_result(str(tmp_path), str(tmp_path), expected=['Block', 'Block_LOD1', 'Block_BS1'])
+
+
+def test_lines_are_attributed_to_their_model(tmp_path):
+    result = parse(tmp_path)
+    block, lod, bs = result['models']
+
+    assert result['duration'] == 6.0
+    assert not result['success']
+
+    assert block['success']
+    assert block['duration'] == 3.0
+    assert block['fbx_size'] == 3
+    assert block['outputs'] == ["C:\\export\\Block.mwm"]
+    assert block['missing_textures'] == ["C:\\Textures\\Block_cm.dds"]
+    assert len(block['warnings']) == 1
+
+    assert not lod['success']
+    assert lod['duration'] == 2.0
+    assert lod['fbx_size'] is None
+    assert lod['missing_materials'] == ["Missing"]
+    assert len(lod['errors']) == 1
+
+
+def test_models_that_were_not_built_fail(tmp_path):
+    bs = parse(tmp_path)['models'][2]
+
+    assert bs['name'] == 'Block_BS1'
+    assert not bs['success']
+    assert bs['errors'] == ["Not processed by MwmBuilder."]
+
+
+def test_lines_before_the_first_model_are_general(tmp_path):
+    parser = MwmbLogParser()
+    parser.feed(b"Unhandled Exception: System.IO.IOException\n", 0.0)
+    result = parser.get_result(str(tmp_path), str(tmp_path))
+
+    assert result['models'] == []
+    assert result['errors'] == ["Unhandled Exception: System.IO.IOException"]
+    assert not result['success']
+
+
+def test_report_is_written_as_json(tmp_path):
+    result = parse(tmp_path)
+    report_path = write_mwmb_report(str(tmp_path), "Block", result)
+
+    with open(report_path) as report_file:
+        assert json.load(report_file) == result
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from seut.export.seut_mwmbuilder import MwmBuildQueue
+from seut.utils import seut_tool_utils
+
+
+class FakeJob:
+    def __init__(self, name: str, path: str = "/export"):
+        self.name = name
+        self.path = path
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.trace = None
+
+    def conflicts_with(self, job) -> bool:
+        return self.path == job.path and (self.name.startswith(job.name) or job.name.startswith(self.name))
+
+    def run(self):
+        self.started.set()
+        self.release.wait(5)
+        return self.name
+
+
+@pytest.fixture(autouse=True)
+def pool(monkeypatch):
+    monkeypatch.setattr(seut_tool_utils, 'get_worker_count', lambda: 2)
+    seut_tool_utils.reset_tool_cancellation()
+
+
+def test_queued_builds_do_not_hold_pool_workers():
+    queue = MwmBuildQueue(max_workers=1)
+    jobs = [FakeJob(f"Block_{i}", path=f"/export/{i}") for i in range(3)]
+    for job in jobs:
+        queue.submit(job)
+
+    assert jobs[0].started.wait(5)
+
+    # One build runs, the others wait in the queue instead of on a pool worker.
+    assert seut_tool_utils.submit_tool_task(lambda: 42).result(timeout=5) == 42
+    assert not jobs[1].started.is_set()
+
+    for job in jobs:
+        job.release.set()
+    assert [job.future.result(timeout=5) for job in jobs] == ["Block_0", "Block_1", "Block_2"]
+
+
+def test_conflicting_builds_run_one_after_another():
+    queue = MwmBuildQueue(max_workers=2)
+    first = FakeJob("Block")
+    second = FakeJob("Block_Small")
+    other = FakeJob("Other")
+    for job in [first, second, other]:
+        queue.submit(job)
+
+    assert first.started.wait(5)
+    assert other.started.wait(5)
+    assert not second.started.is_set()
+
+    first.release.set()
+    assert second.started.wait(5)
+    second.release.set()
+    other.release.set()
+    assert second.future.result(timeout=5) == "Block_Small"
+
+
+def test_cancel_drops_pending_builds():
+    queue = MwmBuildQueue(max_workers=1)
+    running = FakeJob("Block", path="/a")
+    pending = FakeJob("Other", path="/b")
+    queue.submit(running)
+    queue.submit(pending)
+    assert running.started.wait(5)
+
+    queue.cancel()
+    running.release.set()
+
+    assert pending.future.cancelled()
+    assert not pending.started.is_set()
+
+
+def test_builds_belong_to_the_tools_of_the_export():
+    queue = MwmBuildQueue(max_workers=1)
+    group = seut_tool_utils.ToolGroup()
+    first = FakeJob("Block", path="/a")
+    second = FakeJob("Other", path="/b")
+    for job in [first, second]:
+        job.run = lambda job=job: (job.started.set(), job.release.wait(5), seut_tool_utils.get_tool_group())[-1]
+
+    # As the steps of an ExportJob submit them.
+    seut_tool_utils.run_in_group(group, queue.submit, first)
+    seut_tool_utils.run_in_group(group, queue.submit, second)
+    assert first.started.wait(5)
+
+    # The second one is started from the worker that ran the first one.
+    first.release.set()
+    second.release.set()
+    assert first.future.result(timeout=5) is group
+    assert second.future.result(timeout=5) is group
+    assert second.task in group.futures
@@ -0,0 +1,132 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from seut.utils import seut_tool_runner
+from seut.utils.seut_tool_runner import ToolRunner, RecordingToolRunner, ReplayToolRunner
+from seut.utils.seut_tool_utils import ToolAbortedError, reset_tool_cancellation
+
+
+# A stand-in for texconv: converts the input to '<name>.dds' in the output folder, which holds the input reversed.
+TOOL = f"""#!{sys.executable}
+import os
+import sys
+
+source, output_dir = sys.argv[1], sys.argv[3]
+with open(source) as f:
+    content = f.read()
+if content == "fail":
+    print("ERROR: Conversion failed")
+    sys.exit(2)
+
+print("Reading", os.path.basename(source))
+with open(os.path.join(output_dir, os.path.splitext(os.path.basename(source))[0] + ".dds"), "w") as f:
+    f.write(content[::-1])
+print("Written")
+"""
+
+
+@pytest.fixture
+def files(tmp_path):
+    reset_tool_cancellation()
+
+    tool = tmp_path / 'tools' / 'texconv'
+    tool.parent.mkdir()
+    tool.write_text(TOOL)
+    tool.chmod(0o755)
+
+    (tmp_path / 'input').mkdir()
+    (tmp_path / 'output').mkdir()
+    source = tmp_path / 'input' / 'Block_cm.tif'
+    source.write_text("texture")
+
+    return tmp_path
+
+
+def get_cmdline(files) -> list:
+    return [str(files / 'tools' / 'texconv'), str(files / 'input' / 'Block_cm.tif'), '-o', str(files / 'output')]
+
+
+def test_tool_runner_is_abstract():
+    with pytest.raises(TypeError):
+        ToolRunner()
+
+
+def test_replay_restores_recorded_outputs(files):
+    recordings = str(files / 'recordings')
+    out, cmdline = RecordingToolRunner(recordings).run(get_cmdline(files))
+    assert (files / 'output' / 'Block_cm.dds').read_text() == "erutxet"
+
+    # The tool is not needed to replay its calls.
+    (files / 'output' / 'Block_cm.dds').unlink()
+    (files / 'tools' / 'texconv').unlink()
+
+    lines = []
+    replayed, replayed_cmdline = ReplayToolRunner(recordings).run(get_cmdline(files), on_line=lines.append)
+
+    assert replayed == out
+    assert replayed_cmdline == get_cmdline(files)
+    assert b"".join(lines) == out
+    assert (files / 'output' / 'Block_cm.dds').read_text() == "erutxet"
+
+
+def test_recordings_only_hold_outputs_of_their_own_inputs(files):
+    recordings = str(files / 'recordings')
+    other = files / 'input' / 'Other_cm.tif'
+    other.write_text("other")
+    other_cmdline = [str(files / 'tools' / 'texconv'), str(other), '-o', str(files / 'output')]
+
+    # Another batch finishes in the same folder while the first one runs, and a third one is still writing its file.
+    def run_other_batch(cmdline):
+        RecordingToolRunner(recordings).run(other_cmdline)
+        (files / 'output' / 'Partial_cm.dds').write_text("half")
+
+    RecordingToolRunner(recordings).run(get_cmdline(files), on_start=run_other_batch)
+
+    for f in (files / 'output').iterdir():
+        f.unlink()
+
+    ReplayToolRunner(recordings).run(get_cmdline(files))
+    assert sorted(f.name for f in (files / 'output').iterdir()) == ['Block_cm.dds']
+
+    ReplayToolRunner(recordings).run(other_cmdline)
+    assert (files / 'output' / 'Other_cm.dds').read_text() == "rehto"
+
+
+def test_replay_fails_for_changed_inputs(files):
+    recordings = str(files / 'recordings')
+    RecordingToolRunner(recordings).run(get_cmdline(files))
+    (files / 'input' / 'Block_cm.tif').write_text("changed")
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        ReplayToolRunner(recordings).run(get_cmdline(files))
+    assert b"No recording" in error.value.output
+
+
+def test_replay_reproduces_failures(files):
+    recordings = str(files / 'recordings')
+    (files / 'input' / 'Block_cm.tif').write_text("fail")
+
+    with pytest.raises(subprocess.CalledProcessError) as recorded:
+        RecordingToolRunner(recordings).run(get_cmdline(files))
+
+    with pytest.raises(subprocess.CalledProcessError) as replayed:
+        ReplayToolRunner(recordings).run(get_cmdline(files))
+    assert replayed.value.returncode == recorded.value.returncode == 2
+    assert replayed.value.output == recorded.value.output
+
+    with pytest.raises(ToolAbortedError) as aborted:
+        ReplayToolRunner(recordings).run(get_cmdline(files), fatal_patterns=[b"ERROR:"])
+    assert aborted.value.line == "ERROR: Conversion failed"
+
+
+def test_runner_is_taken_from_the_environment(files, monkeypatch):
+    monkeypatch.setenv('SEUT_TOOL_RUNNER', 'replay')
+    monkeypatch.setenv('SEUT_TOOL_RECORDINGS', str(files / 'recordings'))
+    monkeypatch.setitem(seut_tool_runner.settings, 'runner', None)
+
+    runner = seut_tool_runner.get_tool_runner()
+    assert isinstance(runner, ReplayToolRunner)
+    assert runner.path == str(files / 'recordings')
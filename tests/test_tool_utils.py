@@ -0,0 +1,127 @@
+import io
+import sys
+import time
+import threading
+import subprocess
+
+import pytest
+
+from seut.utils import seut_tool_utils
+
+
+get_worker_count = seut_tool_utils.get_worker_count
+
+
+@pytest.fixture(autouse=True)
+def pool(monkeypatch):
+    monkeypatch.setattr(seut_tool_utils, 'get_worker_count', lambda: 2)
+    monkeypatch.setattr(seut_tool_utils, 'load_settings', lambda: None)
+    monkeypatch.setattr(seut_tool_utils, 'get_tool_runner', lambda: None)
+    seut_tool_utils.reset_tool_cancellation()
+    yield
+    seut_tool_utils.reset_tool_cancellation()
+
+
+def test_cancelled_tools_have_no_result(monkeypatch):
+    release = threading.Event()
+    started = []
+
+    def call_tool(args, timeout=None):
+        started.append(args)
+        release.wait(5)
+        return [0, "", args]
+
+    monkeypatch.setattr(seut_tool_utils, 'call_tool', call_tool)
+    futures = seut_tool_utils.start_tools([[str(i)] for i in range(6)])
+
+    seut_tool_utils.kill_running_tools()
+    release.set()
+    seut_tool_utils.wait(futures)
+
+    results = seut_tool_utils.collect_tool_results(futures)
+    assert len(started) < 6
+    assert results.count(None) == 6 - len(started)
+    assert all(r == [0, "", args] for r, args in zip(results, [[str(i)] for i in range(6)]) if r is not None)
+
+
+def test_worker_count_is_taken_from_the_environment(monkeypatch):
+    monkeypatch.setenv('SEUT_TOOL_WORKERS', "3")
+    assert get_worker_count() == 3
+
+    monkeypatch.setenv('SEUT_TOOL_WORKERS', "0")
+    assert get_worker_count() == 1
+
+
+def test_tool_is_stopped_at_fatal_output():
+    script = "import time; print('Building', flush=True); print('Main.cs: ERROR: Broken', flush=True); time.sleep(30)"
+    log = io.BytesIO()
+    lines = []
+
+    start = time.time()
+    with pytest.raises(seut_tool_utils.ToolAbortedError) as error:
+        seut_tool_utils.run_tool_process([sys.executable, "-c", script], log=log, on_line=lines.append, fatal_patterns=[b": ERROR:"])
+
+    assert time.time() - start < 10
+    assert error.value.line == "Main.cs: ERROR: Broken"
+    assert error.value.output.splitlines() == [b"Building", b"Main.cs: ERROR: Broken"]
+    assert log.getvalue() == b"".join(lines) == error.value.output
+
+
+def test_failing_tool_raises_with_its_output():
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        seut_tool_utils.run_tool_process([sys.executable, "-c", "print('failed'); raise SystemExit(3)"])
+
+    assert error.value.returncode == 3
+    assert error.value.output.strip() == b"failed"
+
+
+def test_tool_is_stopped_after_its_timeout():
+    script = "import time; print('Started', flush=True); time.sleep(30)"
+
+    start = time.time()
+    with pytest.raises(seut_tool_utils.ToolTimeoutError) as error:
+        seut_tool_utils.run_tool_process([sys.executable, "-c", script], timeout=0.5)
+
+    assert time.time() - start < 10
+    assert error.value.output.startswith(b"Started")
+    assert b"Stopped after 0.5s" in error.value.output
+
+
+def test_running_tools_are_killed_on_cancel():
+    script = "import time; print('Started', flush=True); time.sleep(30)"
+    started = threading.Event()
+
+    future = seut_tool_utils.submit_tool_task(seut_tool_utils.run_tool_process, [sys.executable, "-c", script], on_line=lambda line: started.set())
+    assert started.wait(10)
+
+    seut_tool_utils.kill_running_tools()
+    with pytest.raises(subprocess.CalledProcessError):
+        future.result(timeout=10)
+
+    # Nothing new is started until the cancellation is reset.
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        seut_tool_utils.run_tool_process([sys.executable, "-c", "print('ok')"])
+    assert error.value.output == b"Cancelled by user."
+
+
+def test_killing_a_group_leaves_other_tools_running(monkeypatch):
+    script = "import sys, time; print('Started', flush=True); time.sleep(float(sys.argv[1])); print('Done')"
+    started = threading.Semaphore(0)
+
+    def call_tool(args, timeout=None):
+        return seut_tool_utils.run_tool_process([sys.executable, "-c", script] + args, on_line=lambda line: started.release())
+
+    monkeypatch.setattr(seut_tool_utils, 'call_tool', call_tool)
+
+    # E.g. an export that runs while the texture conversion is cancelled.
+    other = seut_tool_utils.start_tools([["1"]])
+    group = seut_tool_utils.ToolGroup()
+    converting = seut_tool_utils.start_tools([["30"]], group=group)
+    assert started.acquire(timeout=10) and started.acquire(timeout=10)
+
+    seut_tool_utils.kill_tool_group(group)
+    with pytest.raises(subprocess.CalledProcessError):
+        converting[0].result(timeout=10)
+
+    assert other[0].result(timeout=10).split() == [b"Started", b"Done"]
+    assert not seut_tool_utils.tools_cancelled.is_set()
@@ -0,0 +1,70 @@
+import os
+import threading
+
+import pytest
+
+from seut.utils import seut_wine
+
+
+@pytest.fixture
+def template(tmp_path):
+    template = tmp_path / 'template'
+    (template / 'dosdevices').mkdir(parents=True)
+    (template / 'drive_c' / 'windows').mkdir(parents=True)
+    (template / 'drive_c' / 'users').mkdir()
+    (template / 'system.reg').write_text("registry")
+    return str(template)
+
+
+def test_clone_shares_drive_c(template, tmp_path):
+    prefix = str(tmp_path / 'pool' / 'prefix_1')
+    seut_wine.clone_prefix(template, prefix)
+
+    assert seut_wine.is_prefix_cloned(template, prefix)
+    assert os.path.isfile(os.path.join(prefix, 'system.reg'))
+    assert not os.path.islink(os.path.join(prefix, 'drive_c', 'windows'))
+    assert os.path.realpath(os.path.join(prefix, 'drive_c', 'users')) == os.path.join(template, 'drive_c', 'users')
+
+
+def test_concurrent_clones_do_not_interfere(template, tmp_path, monkeypatch):
+    prefix = str(tmp_path / 'pool' / 'prefix_1')
+    clones = []
+    copy2 = seut_wine.shutil.copy2
+
+    def slow_copy2(*args, **kwargs):
+        clones.append(args[1])
+        threading.Event().wait(0.05)
+        return copy2(*args, **kwargs)
+
+    monkeypatch.setattr(seut_wine.shutil, 'copy2', slow_copy2)
+
+    errors = []
+    def clone():
+        try:
+            seut_wine.clone_prefix(template, prefix)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=clone) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(clones) == 1
+    assert seut_wine.is_prefix_cloned(template, prefix)
+    assert sorted(os.listdir(tmp_path / 'pool')) == ['prefix_1', 'prefix_1.lock']
+
+
+def test_outdated_clone_is_replaced(template, tmp_path):
+    prefix = tmp_path / 'pool' / 'prefix_1'
+    prefix.mkdir(parents=True)
+    (prefix / seut_wine.PREFIX_MARKER).write_text("/old/template")
+    (prefix / 'leftover').write_text("")
+
+    seut_wine.clone_prefix(template, str(prefix))
+
+    assert seut_wine.is_prefix_cloned(template, str(prefix))
+    assert not (prefix / 'leftover').exists()
+    assert sorted(os.listdir(tmp_path / 'pool')) == ['prefix_1', 'prefix_1.lock']